@@ -34,7 +34,7 @@ def calculate_cumulative_profitability(
 
     # Calculate profitability
     cumulative_return = metrics_obj.get_cumulative_profitability(
-        request.ticker_nm, request.init_date, request.end_date
+        request.ticker_nm, request.init_date, request.end_date, request.compute_engine
     )
 
     return cumulative_return
@@ -59,7 +59,7 @@ def calculate_monthly_profitability(
 
     # Calculate monthly profitability and convert to list of dictionaries
     monthly_returns = metrics_obj.get_monthly_cumulative_profitability(
-        request.ticker_nm, request.init_date, request.end_date
+        request.ticker_nm, request.init_date, request.end_date, request.compute_engine
     )
 
     return {
@@ -2,7 +2,6 @@
 CRUD operations for financial database tables.
 """
 
-import hashlib
 from typing import Optional
 
 from models.financial.dim_ticker import Ticker
@@ -10,11 +9,6 @@ from models.financial.dim_ticker_type import TickerType
 from sqlalchemy.orm import Session
 
 
-def generate_ticker_id(ticker_nm):
-    """Generate a unique ID for new ticker records."""
-    return hashlib.md5(ticker_nm.encode("utf-8")).hexdigest()
-
-
 class TickerService:
     """Service for ticker-related operations."""
 
@@ -104,9 +98,8 @@ class TickerService:
         if not ticker_type:
             raise ValueError(f"Ticker type '{ticker_type_nm}' not found")
 
-        # Create ticker object
+        # Create ticker object (ticker_id is assigned by the database)
         ticker = Ticker(
-            ticker_id=generate_ticker_id(ticker_nm),
             ticker_nm=ticker_nm,
             ticker_type_id=ticker_type.ticker_type_id,
             annual_tax=annual_tax,
@@ -202,13 +195,8 @@ class TickerService:
         Returns:
             Created TickerType object
         """
-        # Generate unique ID for the ticker type
-        ticker_type_id = (generate_ticker_id(ticker_type_nm),)
-
-        # Create TickerType object
-        ticker_type = TickerType(
-            ticker_type_id=ticker_type_id, ticker_type_nm=ticker_type_nm, is_src=True
-        )
+        # Create TickerType object (ticker_type_id is assigned by the database)
+        ticker_type = TickerType(ticker_type_nm=ticker_type_nm, is_src=True)
 
         # Add to database and commit
         db.add(ticker_type)
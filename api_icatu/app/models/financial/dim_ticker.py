@@ -4,7 +4,7 @@ SQLAlchemy model for dim_ticker_tb table.
 
 from db.session import Base
 from models.financial.dim_ticker_type import TickerType
-from sqlalchemy import Column, ForeignKey, Numeric, String
+from sqlalchemy import Column, ForeignKey, Identity, Integer, Numeric, SmallInteger, String
 from sqlalchemy.orm import relationship
 
 
@@ -13,7 +13,7 @@ class Ticker(Base):
     SQLAlchemy model for dim_ticker_tb table.
 
     Attributes:
-        ticker_id: Primary key
+        ticker_id: Primary key (identity assigned by the database)
         ticker_nm: Name of the ticker
         ticker_type_id: Foreign key to TickerType
         annual_tax: Annual tax rate
@@ -23,9 +23,11 @@ class Ticker(Base):
     __tablename__ = "dim_ticker_tb"
     __table_args__ = {"schema": "financial_s"}
 
-    ticker_id = Column(String, primary_key=True, index=True)
+    ticker_id = Column(Integer, Identity(), primary_key=True, index=True)
     ticker_nm = Column(String, index=True)
-    ticker_type_id = Column(String, ForeignKey("financial_s.dim_ticker_type_tb.ticker_type_id"))
+    ticker_type_id = Column(
+        SmallInteger, ForeignKey("financial_s.dim_ticker_type_tb.ticker_type_id")
+    )
     annual_tax = Column(Numeric)
 
     # Relationship with TickerType model
@@ -4,7 +4,7 @@ Pydantic schemas for request and response validation.
 
 from datetime import date
 from decimal import Decimal
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -31,7 +31,7 @@ class TickerTypeCreate(BaseModel):
 class TickerTypeResponse(TickerTypeBase):
     """Schema for ticker type in responses."""
 
-    ticker_type_id: str
+    ticker_type_id: int
 
     class Config:
         """Pydantic configuration."""
@@ -65,7 +65,7 @@ class TickerUpdate(BaseModel):
 class TickerResponse(TickerBase):
     """Schema for ticker in responses."""
 
-    ticker_id: str
+    ticker_id: int
     ticker_type: TickerTypeResponse
 
     class Config:
@@ -81,6 +81,9 @@ class ProfitabilityRequest(BaseModel):
     ticker_nm: str
     init_date: date
     end_date: date
+    compute_engine: Literal["pandas", "sql"] = Field(
+        "pandas", description="Where returns are compounded: 'pandas' or 'sql' (in PostgreSQL)"
+    )
 
 
 class MonthlyProfitability(BaseModel):
@@ -110,7 +113,7 @@ class MonthlyProfitabilityResponse(BaseModel):
 class TickerTypeResponse(BaseModel):
     """Schema for ticker type in responses."""
 
-    ticker_type_id: str
+    ticker_type_id: int
     ticker_type_nm: str
     is_src: bool
 
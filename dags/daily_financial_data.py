@@ -8,21 +8,37 @@ market data from:
 
 Steps:
 1. Query the database for all active ticker types
-2. Fetch financial data based on the source (SGS or Yahoo)
-3. Load the raw data into PostgreSQL
-4. Run DBT transformations and tests
+2. Wait, deferred on the triggerer, for SGS to publish data newer than what is loaded
+3. Fetch financial data based on the source (SGS or Yahoo), one mapped task per ticker
+   rate limited by a per-source Airflow pool (SGS only for series with new data)
+4. Archive the extraction to the bronze Parquet archive, validate it, quarantining
+   the tickers that fail a check, and load the rest into PostgreSQL, in one load task
+   per source, so Yahoo Finance data is loaded without waiting for the SGS sensor
+5. Update the raw_market_data dataset, which triggers the financial_data_transform
+   DAG; a load that writes no new rows skips itself and emits no dataset event
+
+Every fetch and load task records its row counts, payload sizes and stage timings to
+the etl_metrics table (and StatsD when enabled), see libs.metrics.
 """
 
 from datetime import date, timedelta
+from typing import Optional
 
-import pandas as pd
 from airflow.decorators import dag, task
-from airflow.operators.bash import BashOperator
+from airflow.exceptions import AirflowSkipException
 from airflow.utils.dates import days_ago
 
+from libs.datasets import RAW_MARKET_DATA_DATASET
+from libs.triggers import SgsPublicationSensor
+
 # Constants for database and file paths
 RAW_TABLE_NAME = "raw_market_data"  # Target table for raw financial data
-DBT_PROJECT_DIR = "/usr/local/airflow/datawarehouse"  # Path to DBT project directory
+
+SGS_REVISION_POINTS = 5  # Latest SGS points re-fetched daily to catch revised values
+
+# Airflow pools limiting concurrent requests per source (see airflow_settings.yaml)
+YAHOO_POOL = "yahoo_finance_pool"
+SGS_POOL = "sgs_pool"
 
 # DAG configuration parameters
 default_args = {
@@ -58,171 +74,160 @@ def daily_financial_data_update():
         Raises:
             ValueError: If no tickers are found in the dimension table
         """
-        from libs.database import create_postgres_engine, read_from_table
+        from libs.database import create_postgres_engine
+        from libs.raw_market_data import read_ticker_types
 
         print("Retrieving ticker list from financial_s.dim_ticker_type_tb...")
-
-        # Create database engine connection
-        engine = create_postgres_engine()
-
-        # SQL query to fetch active tickers
-        query = """
-            SELECT
-                ticker_type_nm,
-                is_src
-            FROM
-                financial_s.dim_ticker_type_tb
-        """
-
-        df = read_from_table(
-            table_name="dim_ticker_type_tb", engine=engine, schema="financial_s", query=query
-        )
-
-        # Validate we got results
-        if df is None or df.empty:
-            raise ValueError("No active tickers found in dim_ticker_type_tb")
-
-        print(f"Found {len(df)} active tickers to process")
-
-        # Convert DataFrame to list of dictionaries
-        return df.to_dict(orient="records")
+        tickers = read_ticker_types(create_postgres_engine())
+        print(f"Found {len(tickers)} active tickers to process")
+        return tickers
 
     @task()
-    def get_yahoo_data(tickers: list) -> list:
+    def filter_tickers(tickers: list, is_src: bool) -> list:
         """
-        Fetch data for tickers from Yahoo Finance.
+        Select the ticker names of one source, to be expanded into mapped fetch tasks.
 
         Args:
             tickers (list): List of dictionaries with ticker_type_nm and is_src
+            is_src (bool): True to select SGS tickers, False for Yahoo Finance tickers
 
         Returns:
-            list: List of JSON strings containing Yahoo Finance data
+            list: Ticker names of the selected source
         """
-        from libs.financial_data import get_yahoo_finance_data
+        selected = [row["ticker_type_nm"] for row in tickers if row["is_src"] == is_src]
+        print(f"Selected {len(selected)} {'SGS' if is_src else 'Yahoo Finance'} tickers")
+        return selected
 
-        # Set date range for data retrieval
-        today = date.today()
-        date_init = today - timedelta(days=4)
+    @task(pool=YAHOO_POOL)
+    def get_yahoo_data(ticker: str) -> str:
+        """
+        Fetch recent data for one ticker from Yahoo Finance.
 
-        # Filter tickers for Yahoo Finance sources
-        yahoo_tickers = [row for row in tickers if not row["is_src"]]
+        Runs as one mapped task instance per ticker, rate limited by the Yahoo pool.
 
-        print(f"Processing {len(yahoo_tickers)} Yahoo Finance tickers...")
+        Args:
+            ticker (str): Yahoo Finance ticker symbol
 
-        # Return empty list if no Yahoo tickers
-        if not yahoo_tickers:
-            print("No Yahoo Finance tickers to process")
-            return []
+        Returns:
+            str: JSON string containing Yahoo Finance data
+        """
+        from libs.loader import fetch_yahoo_batch
+        from libs.metrics import MetricsRecorder
 
-        result = []
+        # Set date range for data retrieval
+        today = date.today()
+        with MetricsRecorder.from_context() as metrics:
+            return fetch_yahoo_batch(ticker, today - timedelta(days=4), today, metrics)
 
-        # Process each Yahoo Finance ticker
-        for idx, row in enumerate(yahoo_tickers):
-            ticker = row["ticker_type_nm"]
-            print(f"[{idx + 1}/{len(yahoo_tickers)}] Fetching data for {ticker}")
-            data = get_yahoo_finance_data(ticker, date_init, today)
-            result.append(data)
+    @task(pool=SGS_POOL)
+    def get_sgs_data(ticker: str) -> Optional[str]:
+        """
+        Fetch the latest data points of one SGS series (CDI and similar series).
 
-        return result
+        A few points are re-fetched on every run so that values revised by the
+        Central Bank after publication are picked up by the load.
 
-    @task()
-    def get_sgs_data(tickers: list) -> list:
-        """
-        Fetch latest data from SGS for CDI and similar series.
+        Runs as one mapped task instance per series, rate limited by the SGS pool.
+        The series are not batched into a single get_sgs_last_data_many call on
+        purpose: the sensor only maps the series with new data (a handful a day), each
+        one retries on its own instead of re-fetching every series when one fails, and
+        the pool bounds the requests in flight across DAG runs, which the in-process
+        concurrency limit of a single call cannot do.
 
         Args:
-            tickers (list): List of dictionaries with ticker_type_nm and is_src
+            ticker (str): SGS series code
 
         Returns:
-            list: List of JSON strings containing SGS data
+            Optional[str]: JSON string containing SGS data, or None if the series is empty
         """
-        from libs.financial_data import get_sgs_last_data
-
-        # Filter tickers for SGS sources
-        sgs_tickers = [row for row in tickers if row["is_src"]]
-
-        print(f"Processing {len(sgs_tickers)} Brazilian Central Bank SGS tickers...")
-
-        # Return empty list if no SGS tickers
-        if not sgs_tickers:
-            print("No SGS tickers to process")
-            return []
-
-        result = []
+        from libs.loader import fetch_sgs_batch
+        from libs.metrics import MetricsRecorder
 
-        # Process each SGS ticker
-        for idx, row in enumerate(sgs_tickers):
-            ticker = row["ticker_type_nm"]
-            print(f"[{idx + 1}/{len(sgs_tickers)}] Fetching latest data for SGS series {ticker}")
-            data = get_sgs_last_data(ticker)
-            result.append(data)
+        with MetricsRecorder.from_context() as metrics:
+            return fetch_sgs_batch(ticker, metrics, last_n=SGS_REVISION_POINTS)
 
-        return result
-
-    @task()
-    def load_financial_data(yahoo_data: list, sgs_data: list) -> bool:
+    @task(trigger_rule="none_failed", outlets=[RAW_MARKET_DATA_DATASET])
+    def load_financial_data(data: list, source: str, outlet_events=None) -> dict:
         """
-        Loads all financial data into the raw table in PostgreSQL.
-
-        This task combines data from both sources into a single DataFrame,
-        performs necessary data type conversions, and loads it into the
-        database in a single operation for efficiency.
+        Loads the financial data of one source into the raw table in PostgreSQL.
+
+        This task fans in the outputs of the mapped fetch tasks of its source (a
+        source without tickers is skipped, hence the none_failed trigger rule),
+        combines them into a single DataFrame, performs necessary data type
+        conversions, validates it, and upserts it into the database on the (ticker,
+        date, source) natural key. Overlapping re-fetched days are hash-compared with
+        the stored rows first, so only new and revised rows are written. Tickers
+        failing a validation check are written to raw_market_data_quarantine instead
+        of the raw table.
+
+        Each source has its own load task, so Yahoo Finance data is loaded as soon
+        as it is fetched instead of waiting for the SGS sensor, which can defer for
+        hours until the Central Bank publishes. The two loads write disjoint keys
+        (the source is part of the natural key). The tradeoff is up to two dataset
+        events a day, which the transform DAG merges into a single build when they
+        are queued together.
+
+        The load summary is attached to the raw_market_data dataset event consumed by
+        the transform DAG. When nothing new was written the task skips itself, so no
+        dataset event is emitted.
 
         Args:
-            yahoo_data (list): List of Yahoo Finance data in JSON
-            sgs_data (list): List of SGS data in JSON
+            data (list): List of the source's data in JSON
+            source (str): Name of the source, for the logs
+            outlet_events: Dataset event accessor from the task context
 
         Returns:
-            bool: True if data loaded successfully
+            dict: 'rows_written' (inserted or changed rows), 'loaded_since' (earliest
+                written date, ISO format) and 'revised_from' (earliest revised date per
+                ticker whose stored values changed)
+
+        Raises:
+            AirflowSkipException: If the load wrote no new rows
         """
-        from libs.database import create_postgres_engine, write_dataframe_to_table
+        from libs.database import create_postgres_engine
+        from libs.loader import load_market_batches
+        from libs.metrics import MetricsRecorder
+        from libs.raw_market_data import create_raw_market_data_table
 
         # Create database connection
         engine = create_postgres_engine()
 
-        # Combine data from both sources
-        all_data = yahoo_data + sgs_data
-
-        # Convert JSON data to DataFrames
-        dfs = [pd.read_json(batch) for batch in all_data]
-
-        # Concatenate all DataFrames
-        combined_df = pd.concat(dfs, ignore_index=True)
-
-        # Convert date columns to proper formats
-        combined_df["date"] = pd.to_datetime(combined_df["date"]).dt.date
-        combined_df["extracted_date"] = pd.to_datetime(combined_df["extracted_date"])
-
-        # Write DataFrame to database
-        return write_dataframe_to_table(
-            df=combined_df, table_name=RAW_TABLE_NAME, engine=engine, if_exists="append"
-        )
-
-    # DBT commands for data transformation and testing
-    dbt_run = BashOperator(
-        task_id="dbt_run",
-        bash_command=f"""
-        echo "Running DBT transformations..."
-        dbt run --profiles-dir {DBT_PROJECT_DIR} --project-dir {DBT_PROJECT_DIR}
-        """,
-    )
-
-    dbt_test = BashOperator(
-        task_id="dbt_test",
-        bash_command=f"""
-        echo "Running DBT tests..."
-        dbt test --profiles-dir {DBT_PROJECT_DIR} --project-dir {DBT_PROJECT_DIR}
-        """,
-    )
+        # Make sure the raw table and its natural key exist
+        create_raw_market_data_table(engine, table_name=RAW_TABLE_NAME)
+
+        with MetricsRecorder.from_context() as metrics:
+            # Combine data from all mapped fetch tasks and upsert it (last write wins)
+            batches = [batch for batch in data or [] if batch]
+            metrics.record("xcom_payload_bytes", sum(len(b.encode()) for b in batches), "bytes")
+            counts = load_market_batches(batches, engine, metrics, table_name=RAW_TABLE_NAME)
+        print(f"{source} rows inserted: {counts['inserted']}, updated: {counts['updated']}")
+
+        rows_written = counts["inserted"] + counts["updated"]
+        if not rows_written:
+            raise AirflowSkipException("No new rows loaded, not updating the dataset")
+
+        load_summary = {
+            "rows_written": rows_written,
+            "loaded_since": counts["loaded_since"],
+            "revised_from": counts["revised_from"],
+        }
+        outlet_events[RAW_MARKET_DATA_DATASET].extra = load_summary
+        return load_summary
 
     # DAG flow definition
     tickers = get_ticker_list()
-    yahoo_data = get_yahoo_data(tickers)
-    sgs_data = get_sgs_data(tickers)
-    loading_success = load_financial_data(yahoo_data, sgs_data)
-
-    # Execute DBT pipeline after data is loaded
-    loading_success >> dbt_run >> dbt_test
+    yahoo_tickers = filter_tickers.override(task_id="get_yahoo_tickers")(tickers, is_src=False)
+    sgs_tickers = filter_tickers.override(task_id="get_sgs_tickers")(tickers, is_src=True)
+
+    # Wait on the triggerer (no worker slot) until SGS publishes new data points
+    sgs_published = SgsPublicationSensor(task_id="wait_for_sgs_publication", codes=sgs_tickers)
+
+    # One mapped fetch task per ticker, fanned back in by the load task of its source,
+    # which updates the dataset consumed by the transform DAG
+    yahoo_data = get_yahoo_data.expand(ticker=yahoo_tickers)
+    sgs_data = get_sgs_data.expand(ticker=sgs_published.output)
+    load_financial_data.override(task_id="load_yahoo_data")(yahoo_data, source="Yahoo Finance")
+    load_financial_data.override(task_id="load_sgs_data")(sgs_data, source="SGS")
 
 
 # Instantiate the DAG
@@ -0,0 +1,209 @@
+"""
+DAG: Financial Data Backfill
+
+Parameterized, parallel historical backfill for any set of series from:
+- Yahoo Finance (e.g., Bovespa and other stock indices/prices)
+- Brazilian Central Bank's SGS system (e.g., CDI and other interest rates)
+
+Steps:
+1. Create the raw table and the backfill checkpoint table if not exists
+2. Resolve the ticker universe: the tickers given as params, or every ticker type
+   in financial_s.dim_ticker_type_tb
+3. Split each ticker's history into date chunks, skipping chunks already checkpointed
+4. Fetch and load every chunk as an independent mapped task (rate limited by the
+   per-source pools); each loaded chunk is checkpointed so a failed chunk reruns alone
+5. Update the raw_market_data dataset, which triggers the financial_data_transform
+   DAG, unless no chunk wrote new rows
+
+Trigger with e.g. {"sgs_tickers": ["433"], "start_date": "2000-01-01"} to onboard a
+new series without reloading the others.
+"""
+
+from datetime import date, timedelta
+
+from airflow.decorators import dag, task
+from airflow.exceptions import AirflowSkipException
+from airflow.models.param import Param
+from airflow.utils.dates import days_ago
+
+from libs.datasets import RAW_MARKET_DATA_DATASET
+
+# Constants
+RAW_TABLE_NAME = "raw_market_data"  # Target table for raw financial data
+YAHOO_POOL = "yahoo_finance_pool"  # Pools shared with the daily DAG
+SGS_POOL = "sgs_pool"
+
+default_args = {
+    "owner": "Astro",
+    "retries": 2,
+    "retry_delay": timedelta(minutes=3),
+}
+
+
+@dag(
+    default_args=default_args,
+    schedule=None,
+    dag_id="financial_data_backfill",
+    start_date=days_ago(1),
+    tags=["financial_data", "backfill"],
+    catchup=False,
+    params={
+        "yahoo_tickers": Param([], type="array", description="Yahoo Finance tickers"),
+        "sgs_tickers": Param([], type="array", description="SGS series codes"),
+        "start_date": Param("2000-01-01", type="string", format="date"),
+        "end_date": Param(None, type=["null", "string"], description="Defaults to today"),
+        "chunk_months": Param(12, type="integer", minimum=1, maximum=120),
+        "resume": Param(True, type="boolean", description="Skip checkpointed chunks"),
+    },
+)
+def financial_data_backfill():
+    """
+    DAG to backfill the history of many series in parallel, resumable chunks.
+    """
+
+    @task()
+    def prepare_tables() -> bool:
+        """
+        Create the raw table and the checkpoint table if they don't exist.
+
+        Returns:
+            bool: True if both tables are ready
+        """
+        from libs.backfill import create_checkpoint_table
+        from libs.database import create_postgres_engine
+        from libs.raw_market_data import create_raw_market_data_table
+
+        engine = create_postgres_engine()
+        create_raw_market_data_table(engine, table_name=RAW_TABLE_NAME)
+        return create_checkpoint_table(engine)
+
+    @task()
+    def get_backfill_tickers(tables_ready: bool, params: dict = None) -> list:
+        """
+        Resolve the tickers to backfill.
+
+        Args:
+            tables_ready (bool): Flag from prepare_tables (only used for ordering)
+            params (dict): DAG run params
+
+        Returns:
+            list: Records with 'ticker_type_nm' and 'is_src'
+
+        Raises:
+            ValueError: If no tickers are given and none are found in the dimension table
+        """
+        tickers = [{"ticker_type_nm": t, "is_src": False} for t in params["yahoo_tickers"]]
+        tickers += [{"ticker_type_nm": t, "is_src": True} for t in params["sgs_tickers"]]
+        if tickers:
+            print(f"Backfilling {len(tickers)} tickers given as params")
+            return tickers
+
+        from libs.database import create_postgres_engine
+        from libs.raw_market_data import read_ticker_types
+
+        tickers = read_ticker_types(create_postgres_engine())
+        print(f"Backfilling all {len(tickers)} tickers from dim_ticker_type_tb")
+        return tickers
+
+    @task()
+    def plan_chunks(tickers: list, is_src: bool, params: dict = None) -> list:
+        """
+        Split the history of one source's tickers into chunks still to be loaded.
+
+        Args:
+            tickers (list): Records with 'ticker_type_nm' and 'is_src'
+            is_src (bool): True to plan SGS tickers, False for Yahoo Finance tickers
+            params (dict): DAG run params
+
+        Returns:
+            list: Chunks with 'ticker', 'is_src', 'source', 'chunk_start' and 'chunk_end'
+        """
+        from libs.backfill import filter_completed_chunks, plan_backfill_chunks
+        from libs.database import create_postgres_engine
+
+        # Without an end date the last chunk keeps its full length, see plan_backfill_chunks
+        date_end = date.fromisoformat(params["end_date"]) if params["end_date"] else None
+        chunks = plan_backfill_chunks(
+            [row for row in tickers if row["is_src"] == is_src],
+            date.fromisoformat(params["start_date"]),
+            date_end,
+            params["chunk_months"],
+        )
+        if params["resume"]:
+            chunks = filter_completed_chunks(chunks, create_postgres_engine())
+
+        print(f"Planned {len(chunks)} {'SGS' if is_src else 'Yahoo Finance'} chunks")
+        return chunks
+
+    @task()
+    def backfill_chunk(chunk: dict) -> int:
+        """
+        Fetch, archive, validate, load and checkpoint one chunk.
+
+        Runs as one mapped task instance per chunk, rate limited by the pool of the
+        chunk's source.
+
+        Args:
+            chunk (dict): Chunk with 'ticker', 'is_src', 'source', 'chunk_start' and
+                'chunk_end'
+
+        Returns:
+            int: Number of rows written
+        """
+        from libs.backfill import load_backfill_chunk
+        from libs.database import create_postgres_engine
+        from libs.metrics import MetricsRecorder
+
+        with MetricsRecorder.from_context() as metrics:
+            return load_backfill_chunk(
+                chunk, create_postgres_engine(), metrics, table_name=RAW_TABLE_NAME
+            )
+
+    @task(trigger_rule="none_failed", outlets=[RAW_MARKET_DATA_DATASET])
+    def summarize_backfill(
+        yahoo_rows: list, sgs_rows: list, params: dict = None, outlet_events=None
+    ) -> dict:
+        """
+        Report the number of rows written by all chunks and update the dataset.
+
+        Args:
+            yahoo_rows (list): Rows written by each Yahoo Finance chunk
+            sgs_rows (list): Rows written by each SGS chunk
+            params (dict): DAG run params
+            outlet_events: Dataset event accessor from the task context
+
+        Returns:
+            dict: 'rows_written' (total over all chunks) and 'loaded_since' (backfill start)
+
+        Raises:
+            AirflowSkipException: If no chunk wrote new rows
+        """
+        total = sum(yahoo_rows or []) + sum(sgs_rows or [])
+        print(f"Backfill wrote {total} rows into {RAW_TABLE_NAME}")
+        if not total:
+            raise AirflowSkipException("No new rows loaded, not updating the dataset")
+
+        load_summary = {"rows_written": total, "loaded_since": params["start_date"]}
+        outlet_events[RAW_MARKET_DATA_DATASET].extra = load_summary
+        return load_summary
+
+    # DAG flow definition
+    tables_ready = prepare_tables()
+    tickers = get_backfill_tickers(tables_ready)
+    yahoo_chunks = plan_chunks.override(task_id="plan_yahoo_chunks")(tickers, is_src=False)
+    sgs_chunks = plan_chunks.override(task_id="plan_sgs_chunks")(tickers, is_src=True)
+
+    # One mapped task per chunk: fetched, loaded and checkpointed independently
+    yahoo_rows = backfill_chunk.override(task_id="backfill_yahoo_chunk", pool=YAHOO_POOL).expand(
+        chunk=yahoo_chunks
+    )
+    sgs_rows = backfill_chunk.override(task_id="backfill_sgs_chunk", pool=SGS_POOL).expand(
+        chunk=sgs_chunks
+    )
+
+    # Updates the dataset consumed by the transform DAG, only if rows were written
+    summarize_backfill(yahoo_rows, sgs_rows)
+
+
+# Instantiate the DAG
+financial_data_backfill_dag = financial_data_backfill()
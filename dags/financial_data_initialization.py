@@ -6,23 +6,25 @@ This DAG initializes the financial database and loads historical market data fro
 2. Brazilian Central Bank SGS system (CDI rates) - Brazil's interbank lending rate
 
 Flow:
-1. Creates the database if not exists
+1. Creates the database and the raw table if not exists
 2. Fetches historical Bovespa data from Yahoo Finance
 3. Fetches historical CDI rates from SGS
-4. Stores both datasets in PostgreSQL
+4. Stores both datasets in PostgreSQL and in the bronze Parquet archive
 5. Runs DBT workflows to transform raw data into analytics-ready models
 
 Dependencies:
 - libs.database: Custom module for database operations
 - libs.financial_data: Custom module with financial data fetching functions
+- libs.async_financial_data: Concurrent SGS fetching on top of libs.financial_data
+- libs.raw_market_data: Raw table DDL and deduplicating upsert
+- libs.archive: Append-only Parquet archive of every extraction
 - Pandas: For data manipulation before database insertion
-- dbt: For data transformation and testing after initial load
+- libs.dbt: In-process dbt invocation for transformation and testing after initial load
 """
 
 from datetime import date, timedelta
 
 from airflow.decorators import dag, task
-from airflow.operators.bash_operator import BashOperator
 from airflow.utils.dates import days_ago
 
 # Constants
@@ -52,37 +54,39 @@ def financial_data_initialization():
     DAG to initialize financial database and load historical data.
 
     Workflow:
-    1. Create database if not exists
+    1. Create database and raw table if not exists
     2. Fetch Bovespa historical data from Yahoo Finance
     3. Fetch CDI historical data from Brazilian Central Bank
     4. Store both datasets in PostgreSQL
     5. Execute dbt operations:
-       - Install dependencies (dbt deps)
-       - Run transformations (dbt run)
-       - Execute tests (dbt test)
+       - Install dependencies (dbt deps) when package-lock.yml changed
+       - Run transformations and tests (dbt build)
     """
 
     @task()
     def create_database_task() -> bool:
         """
-        Create the financial database if it doesn't exist
+        Create the financial database and the raw table if they don't exist
 
         This task checks if the target database exists and creates it if needed.
-        The actual implementation is in the libs.database module.
+        The raw market data table is then created with its (ticker, date, source)
+        natural key, so both load tasks can upsert into it in parallel.
+        The actual implementation is in the libs.database and libs.raw_market_data
+        modules.
 
         Returns:
-            bool: True if database exists or was created successfully
+            bool: True if the database and the raw table are ready
 
         Raises:
             ValueError: If database creation fails
         """
-        from libs.database import create_database
+        from libs.database import create_database, create_postgres_engine
+        from libs.raw_market_data import create_raw_market_data_table
 
         print("Creating database if not exists...")
-        success = create_database()
-        if not success:
+        if not create_database():
             raise ValueError("Failed to create database")
-        return success
+        return create_raw_market_data_table(create_postgres_engine(), table_name=RAW_TABLE_NAME)
 
     @task()
     def get_bovespa_data(db_created: bool) -> list:
@@ -122,89 +126,46 @@ def financial_data_initialization():
         if not db_created:
             raise ValueError("Database not created - cannot fetch data")
 
-        from libs.financial_data import get_sgs_data
+        from libs.async_financial_data import get_sgs_data_many
 
         print("Fetching CDI historical data...")
-        return get_sgs_data(CDI_CODE, INITIAL_DATE, date.today())
 
-    @task()
-    def load_bovespa_data(bovespa_data: list) -> bool:
-        """
-        Load Bovespa data into PostgreSQL
-
-        Converts the JSON data to a pandas DataFrame, performs necessary
-        date formatting, and inserts it into the database table.
-
-        Args:
-            bovespa_data (list): The Bovespa data returned by get_bovespa_data
-
-        Returns:
-            bool: True if data was successfully loaded
-
-        Raises:
-            ValueError: If data loading fails
-        """
-        import pandas as pd
-        from libs.database import create_postgres_engine, write_dataframe_to_table
-
-        print("Loading Bovespa data to database...")
-        # Convert JSON to DataFrame
-        df = pd.read_json(bovespa_data)
-
-        # Format dates for PostgreSQL compatibility
-        df["date"] = pd.to_datetime(df["date"]).dt.date
-        df["extracted_date"] = pd.to_datetime(df["extracted_date"])
-
-        # Get database engine and write data
-        engine = create_postgres_engine()
-        success = write_dataframe_to_table(
-            df=df, table_name=RAW_TABLE_NAME, engine=engine, if_exists="append"
-        )
-
-        if not success:
-            raise ValueError("Failed to load Bovespa data")
-        return success
+        # Fetch all 10-year windows of the series concurrently
+        result = get_sgs_data_many([CDI_CODE], INITIAL_DATE, date.today())
+        if not result:
+            raise ValueError(f"No data available for SGS code {CDI_CODE}")
+        return result[0]
 
     @task()
-    def load_cdi_data(cdi_data: list) -> bool:
+    def load_market_data(data: str, series_name: str) -> bool:
         """
-        Load CDI data into PostgreSQL
+        Load Bovespa or CDI data into PostgreSQL
 
         Converts the JSON data to a pandas DataFrame, performs necessary
-        type conversions and date formatting, and inserts it into the database table.
+        type conversions and date formatting, and bulk upserts it into the database
+        table via COPY. Used by both load tasks, which only differ by the series they load.
 
         Args:
-            cdi_data (list): The CDI data returned by get_cdi_data
+            data (str): The data returned by get_bovespa_data or get_cdi_data
+            series_name (str): Name of the series, used in logs and errors
 
         Returns:
             bool: True if data was successfully loaded
-
-        Raises:
-            ValueError: If data loading fails
         """
-        import pandas as pd
-        from libs.database import create_postgres_engine, write_dataframe_to_table
+        from libs.archive import archive_market_data
+        from libs.database import create_postgres_engine
+        from libs.raw_market_data import parse_market_data, upsert_market_data
 
-        print("Loading CDI data to database...")
-        # Convert JSON to DataFrame
-        df = pd.read_json(cdi_data)
+        print(f"Loading {series_name} data to database...")
+        # Convert JSON to a typed DataFrame
+        df = parse_market_data([data])
+        archive_market_data(df)
 
-        # Ensure proper data types for database compatibility
-        df["ticker"] = df["ticker"].astype(str)
+        # Bulk upsert data through COPY
+        counts = upsert_market_data(df, create_postgres_engine(), table_name=RAW_TABLE_NAME)
 
-        # Format dates for PostgreSQL compatibility
-        df["date"] = pd.to_datetime(df["date"]).dt.date
-        df["extracted_date"] = pd.to_datetime(df["extracted_date"])
-
-        # Get database engine and write data
-        engine = create_postgres_engine()
-        success = write_dataframe_to_table(
-            df=df, table_name=RAW_TABLE_NAME, engine=engine, if_exists="append"
-        )
-
-        if not success:
-            raise ValueError("Failed to load CDI data")
-        return success
+        print(f"{series_name} rows inserted: {counts['inserted']}, updated: {counts['updated']}")
+        return True
 
     @task()
     def completion_notification(bovespa_success: bool, cdi_success: bool) -> None:
@@ -226,49 +187,39 @@ def financial_data_initialization():
         else:
             raise ValueError("Data loading completed with errors")
 
-    # DBT tasks for data transformation pipeline
-    dbt_deps = BashOperator(
-        task_id="dbt_deps",
-        bash_command=f"""
-        echo "Installing DBT dependencies..."
-        dbt deps --profiles-dir {DBT_PROJECT_DIR} --project-dir {DBT_PROJECT_DIR}
-        """,
-    )
-
-    dbt_run = BashOperator(
-        task_id="dbt_run",
-        bash_command=f"""
-        echo "Running DBT run..."
-        dbt run --profiles-dir {DBT_PROJECT_DIR} --project-dir {DBT_PROJECT_DIR}
-        """,
-    )
+    @task()
+    def dbt_build() -> None:
+        """
+        Install DBT packages when package-lock.yml changed, then build (run and test)
+        every model in process, saving the manifest as state.
+        """
+        from libs.dbt import install_dbt_deps_if_needed, run_dbt_build
 
-    dbt_test = BashOperator(
-        task_id="dbt_test",
-        bash_command=f"""
-        echo "Running DBT test..."
-        dbt test --profiles-dir {DBT_PROJECT_DIR} --project-dir {DBT_PROJECT_DIR}
-        """,
-    )
+        print("Running DBT build...")
+        install_dbt_deps_if_needed(DBT_PROJECT_DIR)
+        run_dbt_build(DBT_PROJECT_DIR)
 
     # Define task dependencies
-    # Step 1: Create database
+    # Step 1: Create database and raw table
     db_created = create_database_task()
 
-    # Step 2: Fetch data after database is created (parallel tasks)
+    # Step 2: Fetch data after database and raw table are created (parallel tasks)
     bovespa_data = get_bovespa_data(db_created)
     cdi_data = get_cdi_data(db_created)
 
     # Step 3: Load data after fetching (parallel tasks)
-    bovespa_loaded = load_bovespa_data(bovespa_data)
-    cdi_loaded = load_cdi_data(cdi_data)
+    bovespa_loaded = load_market_data.override(task_id="load_bovespa_data")(
+        bovespa_data, series_name="Bovespa"
+    )
+    cdi_loaded = load_market_data.override(task_id="load_cdi_data")(cdi_data, series_name="CDI")
 
     # Step 4: Notify completion of data loading
     loading_complete = completion_notification(bovespa_loaded, cdi_loaded)
 
-    # Step 5: Run DBT workflow in sequence - first install dependencies,
-    # then run models, finally test data quality
-    loading_complete >> dbt_deps >> dbt_run >> dbt_test
+    # Step 5: Run DBT workflow - install dependencies if needed, then build (run and
+    # test) every model, saving the manifest for later state comparison by the
+    # selective builds
+    loading_complete >> dbt_build()
 
 
 # Instantiate the DAG
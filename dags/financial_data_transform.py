@@ -0,0 +1,128 @@
+"""
+DAG: Financial Data Transform
+
+This DAG is scheduled on the raw_market_data dataset instead of a clock: it runs only
+after an extraction/load DAG (daily update or backfill) actually wrote new rows into
+the raw table. Only one run is active at a time, since the daily, backfill and replay
+DAGs all update the dataset and concurrent builds would race on the same tables.
+
+Steps:
+1. Merge the load summaries attached to the dataset events received since the last run
+2. Run a DBT build (models and tests) limited to what changed
+3. VACUUM (ANALYZE) the fact and serving table partitions the build rewrote, one at
+   a time
+"""
+
+from datetime import timedelta
+from typing import Optional
+
+from airflow.decorators import dag, task
+from airflow.utils.dates import days_ago
+
+from libs.datasets import RAW_MARKET_DATA_DATASET
+
+# Constants
+DBT_PROJECT_DIR = "/usr/local/airflow/datawarehouse"  # Path to DBT project directory
+WAREHOUSE_SCHEMA = "financial_s"  # Schema the DBT models are built in
+PARTITIONED_TABLE_NAMES = ["fct_serie_tb", "srv_serie_tb"]  # Month-partitioned models
+
+default_args = {
+    "owner": "Astro",
+    "retries": 2,
+    "retry_delay": timedelta(minutes=3),
+    "email_on_failure": True,
+    "email_on_retry": False,
+}
+
+
+@dag(
+    default_args=default_args,
+    schedule=[RAW_MARKET_DATA_DATASET],
+    dag_id="financial_data_transform",
+    start_date=days_ago(1),
+    tags=["financial_data", "transform"],
+    catchup=False,
+    # Builds share the dbt target/state directories and the incremental tables; dataset
+    # events arriving during a build queue the next run
+    max_active_runs=1,
+)
+def financial_data_transform():
+    """
+    DAG to build the warehouse whenever new raw market data is loaded.
+    """
+
+    @task.short_circuit()
+    def plan_dbt_build(triggering_dataset_events=None) -> Optional[dict]:
+        """
+        Plan a dbt build covering every load that triggered this run.
+
+        A run triggered by hand, without dataset events, plans a full build.
+
+        Args:
+            triggering_dataset_events: Dataset events from the task context
+
+        Returns:
+            Optional[dict]: dbt arguments and environment, or None to skip the dbt build
+        """
+        from libs.datasets import merge_load_summaries
+        from libs.dbt import plan_dbt_build as plan_build
+
+        events = (triggering_dataset_events or {}).get(RAW_MARKET_DATA_DATASET.uri, [])
+        if not events:
+            print("No dataset events, running a full dbt build")
+            return {"args": ["build"], "env": {}}
+
+        load_summary = merge_load_summaries([event.extra for event in events])
+        print(f"Triggered by {len(events)} loads: {load_summary}")
+
+        return plan_build(
+            DBT_PROJECT_DIR,
+            load_summary["rows_written"],
+            load_summary["loaded_since"],
+            load_summary["revised_from"],
+        )
+
+    @task()
+    def dbt_build(build_plan: dict) -> None:
+        """
+        Run the planned selective dbt build (models and tests) in process.
+
+        Args:
+            build_plan (dict): Output of plan_dbt_build
+        """
+        from libs.dbt import run_dbt_build
+
+        run_dbt_build(DBT_PROJECT_DIR, build_plan["args"], env=build_plan["env"])
+
+    @task()
+    def vacuum_model_partitions(build_plan: dict) -> list:
+        """
+        VACUUM (ANALYZE) the fact and serving partitions rewritten by the build.
+
+        dbt runs its hooks inside a transaction, where VACUUM is not allowed, so the
+        partitions are vacuumed here. Only the months from the load bound onwards are
+        touched when the build was bounded.
+
+        Args:
+            build_plan (dict): Output of plan_dbt_build
+
+        Returns:
+            list: Names of the partitions vacuumed
+        """
+        from libs.database import create_postgres_engine, vacuum_partitions
+
+        engine = create_postgres_engine()
+        since = build_plan["env"].get("DBT_RAW_START_DATE")
+
+        vacuumed = []
+        for table_name in PARTITIONED_TABLE_NAMES:
+            vacuumed += vacuum_partitions(engine, table_name, schema=WAREHOUSE_SCHEMA, since=since)
+        return vacuumed
+
+    # Selective DBT build (models and tests) planned from what was loaded
+    build_plan = plan_dbt_build()
+    dbt_build(build_plan) >> vacuum_model_partitions(build_plan)
+
+
+# Instantiate the DAG
+financial_data_transform_dag = financial_data_transform()
@@ -0,0 +1,185 @@
+"""
+Bronze Archive Module
+
+This module keeps an append-only Parquet copy of every extraction, so the raw table
+and the warehouse can be rebuilt from local files without calling Yahoo Finance or
+SGS again.
+
+Extractions are written exactly as fetched (before validation and revision
+detection) to a Hive-partitioned dataset:
+
+    <BRONZE_ARCHIVE_DIR>/source=<source>/extracted_on=<YYYY-MM-DD>/<writer>-<n>.parquet
+
+Files are named after the writing task instance (run, task and map index), so a
+retried task overwrites its own files instead of appending duplicates. The archive
+directory defaults to the project's include/ folder and can be moved (e.g., to a
+mounted volume or object store mount) with the BRONZE_ARCHIVE_DIR environment variable.
+"""
+
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+from urllib.parse import unquote
+
+import pandas as pd
+
+from libs.raw_market_data import RAW_MARKET_DATA_COLUMNS
+
+# Constants
+DEFAULT_ARCHIVE_DIR = "/usr/local/airflow/include/bronze"
+PARTITION_COLUMNS = ["source", "extracted_on"]
+PARTITION_PATTERN = re.compile(r"source=(?P<source>[^/]+)/extracted_on=(?P<day>\d{4}-\d{2}-\d{2})")
+
+
+def get_archive_dir() -> Path:
+    """
+    Return the root directory of the bronze archive.
+
+    Returns:
+        Path: BRONZE_ARCHIVE_DIR, or the default include/bronze directory
+    """
+    return Path(os.getenv("BRONZE_ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR))
+
+
+def archive_market_data(
+    df: pd.DataFrame, writer_id: Optional[str] = None, archive_dir: Optional[Path] = None
+) -> int:
+    """
+    Append an extracted batch to the bronze archive.
+
+    Args:
+        df: Raw market data frame as fetched
+        writer_id: Identifier used to name the files (defaults to the run, task and map
+            index of the current task instance)
+        archive_dir: Root directory of the archive (defaults to get_archive_dir())
+
+    Returns:
+        int: Number of rows archived
+    """
+    if df.empty:
+        return 0
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if writer_id is None:
+        from airflow.operators.python import get_current_context
+
+        ti = get_current_context()["ti"]
+        writer_id = f"{ti.run_id}-{ti.task_id}-{ti.map_index}"
+
+    archive_dir = archive_dir or get_archive_dir()
+    df = df[RAW_MARKET_DATA_COLUMNS].assign(
+        extracted_on=pd.to_datetime(df["extracted_date"]).dt.strftime("%Y-%m-%d")
+    )
+
+    pq.write_to_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        root_path=str(archive_dir),
+        partition_cols=PARTITION_COLUMNS,
+        basename_template=re.sub(r"[^\w.-]", "_", writer_id) + "-{i}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+    print(f"Archived {len(df)} rows to {archive_dir}")
+    return len(df)
+
+
+def list_archive_chunks(
+    archive_dir: Optional[Path] = None,
+    since: Optional[str] = None,
+    sources: Optional[list[str]] = None,
+) -> list[dict]:
+    """
+    Group the archived files by source and extraction month for parallel replay.
+
+    Args:
+        archive_dir: Root directory of the archive (defaults to get_archive_dir())
+        since: Only include extractions on or after this ISO date
+        sources: Only include these sources (e.g., ['SGS'])
+
+    Returns:
+        list[dict]: Chunks with 'source', 'month' (YYYY-MM) and 'files' (paths)
+    """
+    archive_dir = archive_dir or get_archive_dir()
+    chunks = defaultdict(list)
+
+    for path in sorted(archive_dir.glob("source=*/extracted_on=*/*.parquet")):
+        match = PARTITION_PATTERN.search(path.relative_to(archive_dir).as_posix())
+        if not match:
+            continue
+
+        source, day = unquote(match["source"]), match["day"]
+        if (since and day < since) or (sources and source not in sources):
+            continue
+        chunks[(source, day[:7])].append(str(path))
+
+    print(f"Found {sum(len(f) for f in chunks.values())} archived files in {len(chunks)} chunks")
+    return [
+        {"source": source, "month": month, "files": files}
+        for (source, month), files in sorted(chunks.items())
+    ]
+
+
+def read_archive_files(files: list[str], archive_dir: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Read archived files back into the raw market data schema.
+
+    Args:
+        files: Parquet file paths, as listed by list_archive_chunks
+        archive_dir: Root directory of the archive (defaults to get_archive_dir())
+
+    Returns:
+        pd.DataFrame: Frame with the raw market data columns
+    """
+    import pyarrow.dataset as ds
+
+    if not files:
+        return pd.DataFrame(columns=RAW_MARKET_DATA_COLUMNS)
+
+    dataset = ds.dataset(
+        files,
+        format="parquet",
+        partitioning="hive",
+        partition_base_dir=str(archive_dir or get_archive_dir()),
+    )
+    df = dataset.to_table(columns=RAW_MARKET_DATA_COLUMNS).to_pandas()
+
+    df["ticker"] = df["ticker"].astype(str)
+    df["source"] = df["source"].astype(str)
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    df["extracted_date"] = pd.to_datetime(df["extracted_date"])
+    return df
+
+
+def read_validated_archive_files(
+    files: list[str], archive_dir: Optional[Path] = None
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Read archived files back and validate them as they were validated when loaded.
+
+    Extractions are archived before validation, so replaying them as is would load rows
+    that were quarantined at load time. Each file holds part of one extracted batch and
+    is validated on its own, since overlapping windows of different extractions would
+    otherwise look like dates going backwards.
+
+    Args:
+        files: Parquet file paths, as listed by list_archive_chunks
+        archive_dir: Root directory of the archive (defaults to get_archive_dir())
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: Valid rows, and quarantined rows with a
+            'failed_checks' column, as returned by validate_market_data
+    """
+    from libs.validation import validate_market_data
+
+    if not files:
+        return validate_market_data(pd.DataFrame(columns=RAW_MARKET_DATA_COLUMNS))
+
+    results = [validate_market_data(read_archive_files([f], archive_dir)) for f in files]
+    return (
+        pd.concat([valid for valid, _ in results], ignore_index=True),
+        pd.concat([quarantined for _, quarantined in results], ignore_index=True),
+    )
@@ -0,0 +1,335 @@
+"""
+Concurrent SGS Fetcher Module
+
+This module fetches many series from the Brazilian Central Bank's SGS system (e.g., CDI,
+Selic, IPCA and IGP-M) concurrently using asyncio and httpx. Every (series, window) request
+runs under a global concurrency limit and a per-host rate limit, and the results are
+normalized to the same schema produced by libs.financial_data.
+
+The synchronous wrappers at the bottom of the module can be called directly from
+TaskFlow tasks.
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date
+from urllib.parse import urlsplit
+
+import httpx
+import pandas as pd
+
+from libs.financial_data import normalize_sgs_frame, split_sgs_windows
+
+# Constants
+SGS_SERIES_URL = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.{code}/dados"
+SGS_DATE_FORMAT = "%d/%m/%Y"
+DEFAULT_MAX_CONCURRENCY = 8  # Requests in flight across all series and windows
+DEFAULT_REQUESTS_PER_SECOND = 4.0  # Requests started per second against a single host
+DEFAULT_TIMEOUT_SECONDS = 30.0
+DEFAULT_MAX_RETRIES = 3
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+@dataclass(frozen=True)
+class FetchLimits:
+    """
+    Tuning knobs shared by the concurrent fetchers.
+
+    Attributes:
+        max_concurrency (int): Maximum number of requests in flight.
+        requests_per_second (float): Maximum request rate per host.
+        timeout (float): Per-request timeout in seconds.
+        max_retries (int): Maximum number of attempts per request.
+    """
+
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND
+    timeout: float = DEFAULT_TIMEOUT_SECONDS
+    max_retries: int = DEFAULT_MAX_RETRIES
+
+
+DEFAULT_LIMITS = FetchLimits()
+
+
+class HostRateLimiter:
+    """
+    Per-host rate limiter that spaces out request start times.
+
+    Each host gets its own schedule of slots `1 / requests_per_second` apart, so
+    concurrent coroutines targeting the same host are released one slot at a time
+    while requests to other hosts are not delayed.
+    """
+
+    def __init__(self, requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND):
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+
+        self.interval = 1.0 / requests_per_second
+        self._next_slot: dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host: str) -> None:
+        """
+        Sleep until the next free slot for the given host.
+
+        Args:
+            host (str): Network location (host[:port]) of the request.
+        """
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RequestThrottle:
+    """
+    Global concurrency limit combined with the per-host rate limit.
+
+    A request holds one of `max_concurrency` slots while it runs, and only starts once
+    its host's rate limiter releases it.
+    """
+
+    def __init__(self, limits: FetchLimits = DEFAULT_LIMITS):
+        self.max_retries = limits.max_retries
+        self._semaphore = asyncio.Semaphore(limits.max_concurrency)
+        self._limiter = HostRateLimiter(limits.requests_per_second)
+
+    @asynccontextmanager
+    async def slot(self, host: str) -> AsyncIterator[None]:
+        """
+        Hold a concurrency slot for a request to the given host.
+
+        Args:
+            host (str): Network location (host[:port]) of the request.
+        """
+        async with self._semaphore:
+            await self._limiter.wait(host)
+            yield
+
+
+async def _fetch_json(
+    client: httpx.AsyncClient, throttle: RequestThrottle, url: str, params: dict
+) -> list:
+    """
+    Perform a single GET request under the concurrency and rate limits, with retries.
+
+    Transport errors, 429 and 5xx responses are retried with exponential backoff;
+    any other HTTP error is raised immediately.
+
+    Args:
+        client (httpx.AsyncClient): Shared HTTP client.
+        throttle (RequestThrottle): Concurrency and per-host rate limits.
+        url (str): Request URL.
+        params (dict): Query string parameters.
+
+    Returns:
+        list: Decoded JSON records.
+
+    Raises:
+        RuntimeError: If the request keeps failing after all retries.
+    """
+    host = urlsplit(url).netloc
+
+    max_retries = throttle.max_retries
+    for attempt in range(1, max_retries + 1):
+        async with throttle.slot(host):
+            try:
+                response = await client.get(url, params=params)
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in RETRYABLE_STATUS_CODES or attempt == max_retries:
+                    raise RuntimeError(f"API request error for {url} {params}: {e}") from e
+            except httpx.TransportError as e:
+                if attempt == max_retries:
+                    raise RuntimeError(f"API request error for {url} {params}: {e}") from e
+
+        # Back off outside the semaphore so other requests can proceed
+        print(f"Retrying {url} {params} (attempt {attempt + 1}/{max_retries})")
+        await asyncio.sleep(2**attempt)
+
+    return []
+
+
+def _records_to_frame(records: list, code: str) -> pd.DataFrame:
+    """
+    Normalize raw SGS records for one series, returning an empty frame when there is no data.
+    """
+    if not records:
+        return pd.DataFrame(columns=["date", "close", "ticker", "source", "extracted_date"])
+
+    return normalize_sgs_frame(pd.DataFrame(records), code)
+
+
+async def fetch_sgs_frames(
+    codes: list[str],
+    date_init: date,
+    date_end: date,
+    limits: FetchLimits = DEFAULT_LIMITS,
+) -> dict[str, pd.DataFrame]:
+    """
+    Fetch several SGS series over a date range concurrently.
+
+    The range is split into the windows accepted by the SGS API and every
+    (series, window) pair is requested concurrently.
+
+    Args:
+        codes (list[str]): SGS series codes (e.g., ['12', '11', '433']).
+        date_init (date): Start date for data retrieval.
+        date_end (date): End date for data retrieval.
+        limits (FetchLimits): Concurrency, rate, timeout and retry limits.
+
+    Returns:
+        dict[str, pd.DataFrame]: Normalized frame per series code, in window order.
+
+    Raises:
+        ValueError: If date_init is after date_end.
+        RuntimeError: If any request fails after retries.
+    """
+    if date_init > date_end:
+        raise ValueError("Start date must be before end date")
+
+    windows = split_sgs_windows(date_init, date_end)
+    throttle = RequestThrottle(limits)
+
+    print(f"Fetching {len(codes)} SGS series in {len(codes) * len(windows)} concurrent requests")
+
+    async with httpx.AsyncClient(timeout=limits.timeout) as client:
+        requests_by_code = {
+            code: [
+                _fetch_json(
+                    client,
+                    throttle,
+                    SGS_SERIES_URL.format(code=code),
+                    {
+                        "formato": "json",
+                        "dataInicial": start.strftime(SGS_DATE_FORMAT),
+                        "dataFinal": end.strftime(SGS_DATE_FORMAT),
+                    },
+                )
+                for start, end in windows
+            ]
+            for code in codes
+        }
+        results = await asyncio.gather(
+            *(asyncio.gather(*window_requests) for window_requests in requests_by_code.values())
+        )
+
+    return {
+        code: _records_to_frame([record for chunk in chunks for record in chunk], code)
+        for code, chunks in zip(requests_by_code, results)
+    }
+
+
+async def fetch_sgs_last_frames(
+    codes: list[str],
+    last_n: int = 1,
+    limits: FetchLimits = DEFAULT_LIMITS,
+) -> dict[str, pd.DataFrame]:
+    """
+    Fetch the most recent data points of several SGS series concurrently.
+
+    Args:
+        codes (list[str]): SGS series codes.
+        last_n (int): Number of most recent data points to fetch per series.
+        limits (FetchLimits): Concurrency, rate, timeout and retry limits.
+
+    Returns:
+        dict[str, pd.DataFrame]: Normalized frame per series code.
+
+    Raises:
+        RuntimeError: If any request fails after retries.
+    """
+    throttle = RequestThrottle(limits)
+
+    async with httpx.AsyncClient(timeout=limits.timeout) as client:
+        results = await asyncio.gather(
+            *(
+                _fetch_json(
+                    client,
+                    throttle,
+                    f"{SGS_SERIES_URL.format(code=code)}/ultimos/{last_n}",
+                    {"formato": "json"},
+                )
+                for code in codes
+            )
+        )
+
+    return {code: _records_to_frame(records, code) for code, records in zip(codes, results)}
+
+
+def _frames_to_json(frames: dict[str, pd.DataFrame]) -> list[str]:
+    """
+    Serialize non-empty frames to the JSON records format passed between tasks.
+    """
+    result = []
+    for code, df in frames.items():
+        if df.empty:
+            print(f"No data available for SGS code {code}")
+            continue
+        result.append(df.to_json(orient="records", date_format="iso"))
+    return result
+
+
+def get_sgs_data_many(
+    codes: list[str],
+    date_init: date,
+    date_end: date,
+    limits: FetchLimits = DEFAULT_LIMITS,
+) -> list[str]:
+    """
+    Synchronous wrapper around fetch_sgs_frames for use inside TaskFlow tasks.
+
+    Args:
+        codes (list[str]): SGS series codes.
+        date_init (date): Start date for data retrieval.
+        date_end (date): End date for data retrieval.
+        limits (FetchLimits): Concurrency, rate, timeout and retry limits.
+
+    Returns:
+        list[str]: One JSON string per series that returned data, in the same format as
+            libs.financial_data.get_sgs_data.
+    """
+    frames = asyncio.run(
+        fetch_sgs_frames(
+            codes,
+            date_init,
+            date_end,
+            limits=limits,
+        )
+    )
+    return _frames_to_json(frames)
+
+
+def get_sgs_last_data_many(
+    codes: list[str],
+    last_n: int = 1,
+    limits: FetchLimits = DEFAULT_LIMITS,
+) -> list[str]:
+    """
+    Synchronous wrapper around fetch_sgs_last_frames for use inside TaskFlow tasks.
+
+    Args:
+        codes (list[str]): SGS series codes.
+        last_n (int): Number of most recent data points to fetch per series.
+        limits (FetchLimits): Concurrency, rate, timeout and retry limits.
+
+    Returns:
+        list[str]: One JSON string per series that returned data, in the same format as
+            libs.financial_data.get_sgs_last_data.
+    """
+    frames = asyncio.run(
+        fetch_sgs_last_frames(
+            codes,
+            last_n=last_n,
+            limits=limits,
+        )
+    )
+    return _frames_to_json(frames)
@@ -0,0 +1,224 @@
+"""
+Backfill Planning Module
+
+This module splits historical loads into independent date chunks, fetches and loads
+each chunk, and keeps a checkpoint table of the chunks already loaded, so a backfill
+can be fetched and loaded in parallel and a failed or interrupted run only redoes the
+missing chunks.
+"""
+
+from datetime import date, timedelta
+from typing import Optional
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from libs.async_financial_data import get_sgs_data_many
+from libs.financial_data import get_yahoo_finance_window
+from libs.loader import load_market_batches
+from libs.metrics import MetricsRecorder
+from libs.raw_market_data import RAW_TABLE_NAME
+
+# Constants
+CHECKPOINT_TABLE_NAME = "backfill_checkpoint"
+
+
+def plan_backfill_chunks(
+    tickers: list[dict], date_init: date, date_end: Optional[date], chunk_months: int
+) -> list[dict]:
+    """
+    Split the history of each ticker into consecutive date chunks.
+
+    Without an end date the backfill runs up to today, but the last chunk still ends
+    on its full chunk length instead of today, so its checkpoint key doesn't move from
+    one run to the next (it is only checkpointed once it is over, see
+    load_backfill_chunk).
+
+    Args:
+        tickers: Records with 'ticker_type_nm' and 'is_src'
+        date_init: First date of the backfill
+        date_end: Last date of the backfill (None for an open-ended backfill)
+        chunk_months: Length of each chunk in months
+
+    Returns:
+        list[dict]: Chunks with 'ticker', 'is_src', 'source', 'chunk_start' and
+            'chunk_end' (ISO dates, inclusive)
+
+    Raises:
+        ValueError: If the date range or chunk length is invalid
+    """
+    last_start = date_end or date.today()
+    if date_init > last_start:
+        raise ValueError("Start date cannot be after end date")
+    if chunk_months < 1:
+        raise ValueError("chunk_months must be at least 1")
+
+    chunks = []
+    for row in tickers:
+        chunk_start = date_init
+        while chunk_start <= last_start:
+            chunk_end = chunk_start + relativedelta(months=chunk_months) - timedelta(days=1)
+            if date_end is not None:
+                chunk_end = min(date_end, chunk_end)
+            chunks.append(
+                {
+                    "ticker": str(row["ticker_type_nm"]),
+                    "is_src": bool(row["is_src"]),
+                    "source": "SGS" if row["is_src"] else "Yahoo Finance",
+                    "chunk_start": chunk_start.isoformat(),
+                    "chunk_end": chunk_end.isoformat(),
+                }
+            )
+            chunk_start = chunk_end + timedelta(days=1)
+
+    return chunks
+
+
+def create_checkpoint_table(engine: Engine, schema: str = "public") -> bool:
+    """
+    Create the backfill checkpoint table if it doesn't exist.
+
+    Args:
+        engine: SQLAlchemy Engine instance
+        schema: Database schema name (default: 'public')
+
+    Returns:
+        bool: True if the table exists after the call
+    """
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE IF NOT EXISTS {schema}.{CHECKPOINT_TABLE_NAME} (
+                    source TEXT NOT NULL,
+                    ticker TEXT NOT NULL,
+                    chunk_start DATE NOT NULL,
+                    chunk_end DATE NOT NULL,
+                    rows_loaded INTEGER NOT NULL,
+                    loaded_at TIMESTAMP NOT NULL DEFAULT now(),
+                    PRIMARY KEY (source, ticker, chunk_start, chunk_end)
+                )
+                """
+            )
+        )
+    return True
+
+
+def filter_completed_chunks(
+    chunks: list[dict], engine: Engine, schema: str = "public"
+) -> list[dict]:
+    """
+    Drop the chunks that already have a checkpoint.
+
+    Args:
+        chunks: Chunks as returned by plan_backfill_chunks
+        engine: SQLAlchemy Engine instance
+        schema: Database schema name (default: 'public')
+
+    Returns:
+        list[dict]: Chunks still to be loaded
+    """
+    with engine.connect() as connection:
+        completed = {
+            (source, ticker, chunk_start.isoformat(), chunk_end.isoformat())
+            for source, ticker, chunk_start, chunk_end in connection.execute(
+                text(
+                    f"""
+                    SELECT source, ticker, chunk_start, chunk_end
+                    FROM {schema}.{CHECKPOINT_TABLE_NAME}
+                    """
+                )
+            )
+        }
+
+    pending = [
+        chunk
+        for chunk in chunks
+        if (chunk["source"], chunk["ticker"], chunk["chunk_start"], chunk["chunk_end"])
+        not in completed
+    ]
+    print(f"{len(chunks) - len(pending)} of {len(chunks)} chunks already loaded")
+    return pending
+
+
+def mark_chunk_completed(
+    chunk: dict, rows_loaded: int, engine: Engine, schema: str = "public"
+) -> None:
+    """
+    Record a loaded chunk in the checkpoint table.
+
+    Args:
+        chunk: Chunk as returned by plan_backfill_chunks
+        rows_loaded: Number of rows written for the chunk
+        engine: SQLAlchemy Engine instance
+        schema: Database schema name (default: 'public')
+    """
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                f"""
+                INSERT INTO {schema}.{CHECKPOINT_TABLE_NAME}
+                    (source, ticker, chunk_start, chunk_end, rows_loaded)
+                VALUES (:source, :ticker, :chunk_start, :chunk_end, :rows_loaded)
+                ON CONFLICT (source, ticker, chunk_start, chunk_end)
+                DO UPDATE SET rows_loaded = EXCLUDED.rows_loaded, loaded_at = now()
+                """
+            ),
+            {
+                "source": chunk["source"],
+                "ticker": chunk["ticker"],
+                "chunk_start": chunk["chunk_start"],
+                "chunk_end": chunk["chunk_end"],
+                "rows_loaded": rows_loaded,
+            },
+        )
+
+
+def fetch_backfill_chunk(chunk: dict) -> list[str]:
+    """
+    Fetch one chunk from its source (SGS or Yahoo Finance).
+
+    Args:
+        chunk: Chunk as returned by plan_backfill_chunks
+
+    Returns:
+        list[str]: JSON records strings of the chunk
+    """
+    date_init = date.fromisoformat(chunk["chunk_start"])
+    date_end = date.fromisoformat(chunk["chunk_end"])
+    if chunk["is_src"]:
+        return get_sgs_data_many([chunk["ticker"]], date_init, date_end)
+    return [get_yahoo_finance_window(chunk["ticker"], date_init, date_end)]
+
+
+def load_backfill_chunk(
+    chunk: dict, engine: Engine, metrics: MetricsRecorder, table_name: str = RAW_TABLE_NAME
+) -> int:
+    """
+    Fetch one chunk, upsert it into the raw table and checkpoint it.
+
+    A chunk with quarantined rows, or one that hasn't ended yet (the last chunk of an
+    open-ended backfill), is left uncheckpointed, so the next run fetches it again.
+
+    Args:
+        chunk: Chunk as returned by plan_backfill_chunks
+        engine: SQLAlchemy Engine instance
+        metrics: Recorder of the running task
+        table_name: Name of the raw table
+
+    Returns:
+        int: Number of rows written
+    """
+    ticker = chunk["ticker"]
+    with metrics.timer("fetch", ticker=ticker):
+        batches = fetch_backfill_chunk(chunk)
+
+    counts = load_market_batches(batches, engine, metrics, table_name=table_name, ticker=ticker)
+    metrics.record_payload("".join(batches), counts["parsed"], ticker=ticker)
+
+    rows_loaded = counts["inserted"] + counts["updated"]
+    metrics.record("rows_written", rows_loaded, ticker=ticker)
+    if not counts["quarantined"] and date.fromisoformat(chunk["chunk_end"]) < date.today():
+        mark_chunk_completed(chunk, rows_loaded, engine)
+    return rows_loaded
@@ -5,16 +5,27 @@ This module provides functions to connect to PostgreSQL and perform basic databa
 using SQLAlchemy and pandas.
 """
 
+import io
 import os
+from collections.abc import Iterator
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import pandas as pd
+import psycopg2
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import SQLAlchemyError
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Constants
+DEFAULT_CHUNK_SIZE = 50_000  # Rows fetched per round trip by the streaming readers
+COPY_CHUNK_SIZE = 50_000  # Rows rendered to CSV per COPY by the bulk loader
+
 # Load environment variables from the .env file in the project root
 env_path = Path(__file__).resolve().parents[2] / ".env"
 load_dotenv(dotenv_path=env_path)
@@ -124,6 +135,135 @@ def write_dataframe_to_table(
         return False
 
 
+@dataclass(frozen=True)
+class OnConflict:
+    """
+    Conflict handling of bulk_upsert_dataframe (INSERT ... ON CONFLICT).
+
+    Attributes:
+        columns: Columns of a unique constraint on the target used to detect existing rows
+        update_columns: Columns overwritten when a conflicting row exists (defaults to all
+            other columns of the frame; with no other column, conflicts are skipped)
+        update_condition: Optional SQL predicate restricting which conflicting rows are
+            updated; the existing row is aliased as 'target' and the new one as 'EXCLUDED'
+    """
+
+    columns: list[str]
+    update_columns: Optional[list[str]] = None
+    update_condition: Optional[str] = None
+
+
+def bulk_upsert_dataframe(
+    df: pd.DataFrame,
+    table_name: str,
+    engine: Engine,
+    schema: str = "public",
+    on_conflict: Optional[OnConflict] = None,
+) -> dict[str, int]:
+    """
+    Bulk load a pandas DataFrame into a PostgreSQL table using COPY and a staging table.
+
+    The frame is streamed through COPY FROM STDIN into a temporary staging table, in
+    CSV chunks of COPY_CHUNK_SIZE rows so memory does not grow with the batch, and then
+    merged into the target with INSERT ... ON CONFLICT, all in one transaction. The
+    target table is created from the frame's dtypes if it does not exist yet, with a
+    unique index on the conflict columns, which ON CONFLICT requires.
+
+    Args:
+        df: DataFrame to write to database
+        table_name: Name of the target table
+        engine: SQLAlchemy Engine instance
+        schema: Database schema name (default: 'public')
+        on_conflict: How to merge rows that already exist; when None, every staged row
+            is inserted
+
+    Returns:
+        dict[str, int]: Number of rows 'inserted' and 'updated'
+
+    Raises:
+        SQLAlchemyError, psycopg2.Error: If the load fails (the transaction is rolled back)
+    """
+    if df.empty:
+        print(f"No rows to load into {schema}.{table_name}")
+        return {"inserted": 0, "updated": 0}
+
+    columns = list(df.columns)
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    staging_table = f"_stg_{table_name}"
+
+    # Build the merge statement, counting inserted vs updated rows via xmax
+    merge_sql = f"""
+        INSERT INTO {schema}.{table_name} AS target ({column_list})
+        SELECT {column_list} FROM {staging_table}
+    """
+    if on_conflict:
+        update_columns = on_conflict.update_columns or [
+            c for c in columns if c not in on_conflict.columns
+        ]
+        conflict_list = ", ".join(f'"{column}"' for column in on_conflict.columns)
+        if update_columns:
+            assignments = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c in update_columns)
+            merge_sql += f" ON CONFLICT ({conflict_list}) DO UPDATE SET {assignments}"
+            if on_conflict.update_condition:
+                merge_sql += f" WHERE {on_conflict.update_condition}"
+        else:
+            merge_sql += f" ON CONFLICT ({conflict_list}) DO NOTHING"
+
+    count_sql = f"""
+        WITH merged AS ({merge_sql} RETURNING (xmax = 0) AS inserted)
+        SELECT
+            COUNT(*) FILTER (WHERE inserted) AS inserted,
+            COUNT(*) FILTER (WHERE NOT inserted) AS updated
+        FROM merged
+    """
+
+    try:
+        with engine.begin() as connection:
+            # Create the target from the frame's dtypes on first load, with the unique
+            # index ON CONFLICT needs to find existing rows
+            if not inspect(connection).has_table(table_name, schema=schema):
+                df.head(0).to_sql(name=table_name, con=connection, schema=schema, index=False)
+                if on_conflict:
+                    connection.execute(
+                        text(
+                            f"CREATE UNIQUE INDEX {table_name}_conflict_key_idx "
+                            f"ON {schema}.{table_name} ({conflict_list})"
+                        )
+                    )
+
+            connection.execute(
+                text(
+                    f"CREATE TEMP TABLE {staging_table} "
+                    f"(LIKE {schema}.{table_name} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+            )
+
+            # Stream rows into the staging table on the same transaction, one CSV chunk
+            # at a time
+            with connection.connection.cursor() as cursor:
+                for start in range(0, len(df), COPY_CHUNK_SIZE):
+                    buffer = io.StringIO()
+                    df.iloc[start : start + COPY_CHUNK_SIZE].to_csv(
+                        buffer, index=False, header=False
+                    )
+                    buffer.seek(0)
+                    cursor.copy_expert(
+                        f"COPY {staging_table} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+                        buffer,
+                    )
+
+            inserted, updated = connection.execute(text(count_sql)).one()
+
+        print(
+            f"Successfully loaded {len(df)} rows into {schema}.{table_name} "
+            f"({inserted} inserted, {updated} updated)"
+        )
+        return {"inserted": inserted, "updated": updated}
+    except (SQLAlchemyError, psycopg2.Error) as e:
+        print(f"Error bulk loading into table {schema}.{table_name}: {e}")
+        raise
+
+
 def read_from_table(
     table_name: str, engine: Engine, schema: str = "public", query: str = None
 ) -> Optional[pd.DataFrame]:
@@ -150,3 +290,146 @@ def read_from_table(
     except SQLAlchemyError as e:
         print(f"Error reading from table {schema}.{table_name}: {e}")
         return None
+
+
+def read_from_table_chunked(
+    table_name: str,
+    engine: Engine,
+    schema: str = "public",
+    query: str = None,
+    chunksize: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream data from a PostgreSQL table as pandas DataFrame chunks.
+
+    Uses a server-side cursor (SQLAlchemy `yield_per`, which enables `stream_results`),
+    so at most `chunksize` rows are held in memory at a time regardless of table size.
+
+    Args:
+        table_name: Name of the table to read from
+        engine: SQLAlchemy Engine instance
+        schema: Database schema name (default: 'public')
+        query: Optional SQL query to filter data (uses SELECT * if None)
+        chunksize: Number of rows per yielded DataFrame
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of the query result
+
+    Raises:
+        SQLAlchemyError: If the query fails
+    """
+    if query is None:
+        query = f"SELECT * FROM {schema}.{table_name}"
+
+    try:
+        with engine.connect() as connection:
+            result = connection.execution_options(yield_per=chunksize).execute(text(query))
+            columns = list(result.keys())
+
+            total_rows = 0
+            for rows in result.partitions():
+                total_rows += len(rows)
+                yield pd.DataFrame.from_records(rows, columns=columns)
+
+        print(f"Successfully streamed {total_rows} rows from table {schema}.{table_name}")
+    except SQLAlchemyError as e:
+        print(f"Error streaming from table {schema}.{table_name}: {e}")
+        raise
+
+
+def read_from_table_arrow(
+    table_name: str,
+    engine: Engine,
+    schema: str = "public",
+    query: str = None,
+    chunksize: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator["pa.RecordBatch"]:
+    """
+    Stream data from a PostgreSQL table as Arrow record batches.
+
+    Batches share the schema inferred from the first chunk, so they can be written
+    straight to a Parquet or IPC writer.
+
+    Args:
+        table_name: Name of the table to read from
+        engine: SQLAlchemy Engine instance
+        schema: Database schema name (default: 'public')
+        query: Optional SQL query to filter data (uses SELECT * if None)
+        chunksize: Number of rows per yielded record batch
+
+    Yields:
+        pyarrow.RecordBatch: Consecutive batches of the query result
+
+    Raises:
+        ImportError: If pyarrow is not installed
+        SQLAlchemyError: If the query fails
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("pyarrow is required to stream tables as Arrow batches") from e
+
+    arrow_schema = None
+    for df in read_from_table_chunked(table_name, engine, schema, query, chunksize):
+        batch = pa.RecordBatch.from_pandas(df, schema=arrow_schema, preserve_index=False)
+        arrow_schema = batch.schema
+        yield batch
+
+
+def vacuum_partitions(
+    engine: Engine,
+    table_name: str,
+    schema: str = "public",
+    since: Optional[str] = None,
+) -> list[str]:
+    """
+    VACUUM (ANALYZE) the monthly partitions of a table one at a time.
+
+    Keeps the visibility map of rewritten partitions current (so covering indexes answer
+    with index-only scans) without locking or scanning the whole table at once.
+    Partitions must follow the `<table>_YYYY_MM` naming.
+
+    Args:
+        engine: SQLAlchemy Engine instance
+        table_name: Name of the partitioned table
+        schema: Database schema name (default: 'public')
+        since: Only vacuum partitions for this ISO date's month and later (all if None)
+
+    Returns:
+        list[str]: Names of the partitions vacuumed
+
+    Raises:
+        SQLAlchemyError: If a VACUUM fails
+    """
+    since_month = since[:7].replace("-", "_") if since else ""
+    with engine.connect() as connection:
+        partitions = (
+            connection.execute(
+                text(
+                    """
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                JOIN pg_class p ON p.oid = i.inhparent
+                JOIN pg_namespace n ON n.oid = p.relnamespace
+                WHERE p.relname = :table_name AND n.nspname = :schema
+                ORDER BY c.relname
+                """
+                ),
+                {"table_name": table_name, "schema": schema},
+            )
+            .scalars()
+            .all()
+        )
+
+    # VACUUM cannot run inside a transaction block
+    vacuumed = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for partition in partitions:
+            if partition[len(table_name) + 1 :] < since_month:
+                continue
+            connection.execute(text(f"VACUUM (ANALYZE) {schema}.{partition}"))
+            vacuumed.append(partition)
+
+    print(f"Vacuumed {len(vacuumed)} partitions of {schema}.{table_name}")
+    return vacuumed
@@ -0,0 +1,60 @@
+"""
+Datasets Module
+
+This module declares the Airflow datasets shared between the DAGs that load raw data
+and the DAG that transforms it. Loading DAGs list the dataset as an outlet of the task
+that writes the raw table and attach a load summary to the dataset event; the
+transform DAG is scheduled on the dataset and merges the summaries of every event
+received since its previous run.
+
+A load task that writes no new rows skips itself, and a skipped task emits no dataset
+event, so the warehouse is only rebuilt when new data arrived.
+"""
+
+from typing import Optional
+
+from airflow.datasets import Dataset
+
+# Raw landing table written by the extraction/load DAGs. The "x-" scheme opts out of
+# provider URI normalization, which would load every installed provider at parse time
+RAW_MARKET_DATA_DATASET = Dataset("x-postgres://postgres:5432/icatu_db/public/raw_market_data")
+
+
+def merge_load_summaries(summaries: list[dict]) -> dict:
+    """
+    Merge the load summaries attached to several dataset events.
+
+    An event without a summary (e.g., created by hand from the UI) is treated as an
+    unbounded load, so the build it triggers is not scoped to recent dates. Likewise,
+    revised dates are only kept when every summary reports them (daily loads do,
+    backfills and replays don't), otherwise the build falls back to 'loaded_since'
+    for every ticker.
+
+    Args:
+        summaries: Dicts with 'rows_written', 'loaded_since' (ISO date or None) and
+            optionally 'revised_from' (earliest revised ISO date per ticker)
+
+    Returns:
+        dict: Total 'rows_written', earliest 'loaded_since' and earliest 'revised_from'
+            per ticker (None if a summary doesn't report its revisions)
+    """
+    if not summaries:
+        return {"rows_written": 0, "loaded_since": None, "revised_from": None}
+
+    starts = [summary.get("loaded_since") for summary in summaries]
+    loaded_since: Optional[str] = None if None in starts else min(starts)
+    rows_written = sum(summary.get("rows_written", 1) for summary in summaries)
+
+    revised_from: Optional[dict[str, str]] = {}
+    for summary in summaries:
+        if summary.get("revised_from") is None:
+            revised_from = None
+            break
+        for ticker, day in summary["revised_from"].items():
+            revised_from[ticker] = min(day, revised_from.get(ticker, day))
+
+    return {
+        "rows_written": rows_written,
+        "loaded_since": loaded_since,
+        "revised_from": revised_from,
+    }
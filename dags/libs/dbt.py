@@ -0,0 +1,221 @@
+"""
+DBT Helpers Module
+
+This module decides how much of the dbt project has to be built after a load and runs
+dbt in process through its programmatic API. Instead of a full `dbt run` followed by a
+full `dbt test`, the DAGs run a single `dbt build` restricted to the models downstream
+of the raw source plus the models changed since the previous successful build (state
+comparison against the manifest saved by that build), with generic tests scoped to data
+loaded since the earliest new date. When a load writes no new rows the build is skipped
+entirely.
+
+Invoking dbt in process avoids paying interpreter startup and adapter imports on every
+step: the project is parsed once per process and the parsed manifest is handed to the
+following commands, while dbt's partial parsing (target/partial_parse.msgpack) carries
+the parse over between runs. The per-run bounds are passed as environment variables
+rather than `--vars`, because changing vars invalidates the whole partial parse.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+# Constants
+RAW_SOURCE_SELECTOR = "source:raw.raw_market_data+"  # Everything fed by the raw table
+SEED_SELECTOR = "resource_type:seed"  # Reference data (e.g., the ticker mapping)
+STATE_DIR_NAME = "state"  # Manifest of the last successful build, relative to the project
+PACKAGES_DIR_NAME = "dbt_packages"
+PACKAGE_LOCK_FILE = "package-lock.yml"
+PACKAGE_LOCK_MARKER = ".package-lock.sha1"  # Hash of the lock file installed by dbt deps
+
+# Parsed manifests kept for the lifetime of the worker process
+_manifest_cache: dict[tuple, Any] = {}
+
+
+def get_state_dir(project_dir: str) -> Path:
+    """
+    Return the directory holding the manifest of the last successful build.
+
+    Args:
+        project_dir: Path to the dbt project directory
+
+    Returns:
+        Path: State directory inside the project
+    """
+    return Path(project_dir) / STATE_DIR_NAME
+
+
+@contextmanager
+def _dbt_env(env: Optional[dict[str, str]]) -> Iterator[None]:
+    """
+    Temporarily set the environment variables read by the project through env_var().
+    """
+    previous = {key: os.environ.get(key) for key in (env or {})}
+    os.environ.update(env or {})
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def run_dbt(
+    project_dir: str,
+    args: list[str],
+    env: Optional[dict[str, str]] = None,
+    manifest: Any = None,
+) -> Any:
+    """
+    Run a dbt command in the current process.
+
+    Args:
+        project_dir: Path to the dbt project directory
+        args: dbt arguments (e.g., ['build', '--select', 'my_model'])
+        env: Environment variables read by the project during the command
+        manifest: Parsed manifest to reuse instead of parsing the project again
+
+    Returns:
+        The result of the command (e.g., the Manifest for `parse`)
+
+    Raises:
+        RuntimeError: If the command fails
+    """
+    from dbt.cli.main import dbtRunner
+
+    command = [*args, "--project-dir", project_dir, "--profiles-dir", project_dir]
+    print(f"Running dbt {' '.join(command)}")
+
+    with _dbt_env(env):
+        res = dbtRunner(manifest=manifest).invoke(command)
+
+    if not res.success:
+        raise RuntimeError(f"dbt {args[0]} failed: {res.exception or 'see the dbt logs'}")
+    return res.result
+
+
+def parse_project(project_dir: str, env: Optional[dict[str, str]] = None) -> Any:
+    """
+    Parse the project once per process and environment, reusing dbt's partial parsing.
+
+    Args:
+        project_dir: Path to the dbt project directory
+        env: Environment variables read by the project while parsing
+
+    Returns:
+        Manifest: Parsed dbt manifest
+    """
+    key = (project_dir, tuple(sorted((env or {}).items())))
+    if key not in _manifest_cache:
+        _manifest_cache[key] = run_dbt(project_dir, ["parse"], env=env)
+    return _manifest_cache[key]
+
+
+def install_dbt_deps_if_needed(project_dir: str) -> bool:
+    """
+    Run `dbt deps` only when package-lock.yml changed since the last install.
+
+    Args:
+        project_dir: Path to the dbt project directory
+
+    Returns:
+        bool: True if the packages were installed, False if they were up to date
+    """
+    lock_file = Path(project_dir) / PACKAGE_LOCK_FILE
+    marker = Path(project_dir) / PACKAGES_DIR_NAME / PACKAGE_LOCK_MARKER
+    lock_hash = hashlib.sha1(lock_file.read_bytes()).hexdigest() if lock_file.exists() else ""
+
+    if lock_hash and marker.exists() and marker.read_text().strip() == lock_hash:
+        print(f"{PACKAGE_LOCK_FILE} unchanged, skipping dbt deps")
+        return False
+
+    run_dbt(project_dir, ["deps"])
+    if lock_file.exists():
+        # Hash the lock file dbt deps may have just written
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.write_text(hashlib.sha1(lock_file.read_bytes()).hexdigest())
+    return True
+
+
+def plan_dbt_build(
+    project_dir: str,
+    rows_written: int,
+    loaded_since: Optional[str] = None,
+    revised_from: Optional[dict[str, str]] = None,
+) -> Optional[dict]:
+    """
+    Build the `dbt build` arguments proportional to what changed.
+
+    When the load reports its revisions, fct_serie_tb rebuilds each ticker type from
+    its own window (or its earliest revised date) instead of from 'loaded_since', so
+    a revision of one series does not rebuild the recent history of all of them.
+
+    Args:
+        project_dir: Path to the dbt project directory
+        rows_written: Number of raw rows inserted or changed by the load
+        loaded_since: Earliest date (ISO) among the loaded rows, used to scope tests
+            and staging scans
+        revised_from: Earliest revised date (ISO) per ticker whose stored values
+            changed, or None if the load did not compare them
+
+    Returns:
+        Optional[dict]: 'args' (dbt arguments) and 'env' (environment variables for the
+            build), or None if no new rows arrived
+    """
+    if not rows_written:
+        print("No new rows loaded, skipping dbt build")
+        return None
+
+    state_dir = get_state_dir(project_dir)
+    selectors = [RAW_SOURCE_SELECTOR]
+    args = ["build"]
+
+    # Also pick up models changed since the last successful build
+    if (state_dir / "manifest.json").exists():
+        selectors.append("state:modified+")
+        args += ["--state", str(state_dir)]
+    else:
+        # First build: the seeds read by the dimensions may not be loaded yet
+        selectors.append(SEED_SELECTOR)
+
+    args += ["--select", " ".join(selectors)]
+    env = {}
+    if loaded_since:
+        env = {"DBT_TEST_SINCE_DATE": loaded_since, "DBT_RAW_START_DATE": loaded_since}
+        if revised_from is not None:
+            env["DBT_REVISED_FROM"] = json.dumps(revised_from, sort_keys=True)
+
+    return {"args": args, "env": env}
+
+
+def run_dbt_build(
+    project_dir: str,
+    args: Optional[list[str]] = None,
+    env: Optional[dict[str, str]] = None,
+    save_state: bool = True,
+) -> None:
+    """
+    Run `dbt build` in process on a cached manifest, optionally saving it as state.
+
+    Args:
+        project_dir: Path to the dbt project directory
+        args: dbt arguments (e.g., as planned by plan_dbt_build); a full build by default
+        env: Environment variables read by the project during the build
+        save_state: Copy target/manifest.json into the state directory on success
+
+    Raises:
+        RuntimeError: If parsing or the build fails
+    """
+    manifest = parse_project(project_dir, env)
+    run_dbt(project_dir, args or ["build"], env=env, manifest=manifest)
+
+    if save_state:
+        state_dir = get_state_dir(project_dir)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copy(Path(project_dir) / "target" / "manifest.json", state_dir / "manifest.json")
@@ -17,7 +17,64 @@ from dateutil.relativedelta import relativedelta
 MAX_SGS_YEARS_RANGE = 10
 
 
-def get_yahoo_finance_data(code: str, date_init: date, date_end: date) -> str:
+def split_sgs_windows(date_init: date, date_end: date) -> list[tuple[date, date]]:
+    """
+    Split a date range into consecutive windows accepted by the SGS API.
+
+    The SGS API only allows requests for up to MAX_SGS_YEARS_RANGE years of data at once.
+
+    Args:
+        date_init (date): Start date of the full range.
+        date_end (date): End date of the full range.
+
+    Returns:
+        list[tuple[date, date]]: Inclusive (start, end) windows covering the range in order.
+    """
+    windows = []
+    current_start = date_init
+
+    while current_start <= date_end:
+        # Calculate the end date for this window (either 10 years from start or the overall end)
+        current_end = min(
+            date_end,
+            current_start + relativedelta(years=MAX_SGS_YEARS_RANGE) - relativedelta(days=1),
+        )
+        windows.append((current_start, current_end))
+
+        # Update start date for next window
+        current_start = current_end + timedelta(days=1)
+
+    return windows
+
+
+def normalize_sgs_frame(df: pd.DataFrame, code: str) -> pd.DataFrame:
+    """
+    Convert raw SGS records ('data'/'valor') into the standard raw market data schema.
+
+    Args:
+        df (pd.DataFrame): Records as returned by the SGS API.
+        code (str): The SGS series code the records belong to.
+
+    Returns:
+        pd.DataFrame: Frame with 'date', 'close', 'ticker', 'source' and 'extracted_date'.
+    """
+    df = df.copy()
+
+    # Convert 'data' column to datetime format
+    df["date"] = pd.to_datetime(df["data"], format="%d/%m/%Y")
+
+    # Convert 'valor' column to numeric and divide by 100 as it's a percentage
+    df["close"] = pd.to_numeric(df["valor"], errors="coerce") / 100
+
+    # Process and standardize the data
+    df["ticker"] = str(code)
+    df["source"] = "SGS"
+    df["extracted_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    return df[["date", "close", "ticker", "source", "extracted_date"]]
+
+
+def get_yahoo_finance_frame(code: str, date_init: date, date_end: date) -> pd.DataFrame:
     """
     Fetch financial data from Yahoo Finance for a given stock code and date range.
 
@@ -27,7 +84,8 @@ def get_yahoo_finance_data(code: str, date_init: date, date_end: date) -> str:
         date_end (date): End date for data retrieval.
 
     Returns:
-        str: JSON-compatible containing the requested financial data.
+        pd.DataFrame: Records with 'date', 'close', 'ticker', 'source' and
+            'extracted_date'.
 
     Raises:
         ValueError: If date_init is after date_end
@@ -60,15 +118,34 @@ def get_yahoo_finance_data(code: str, date_init: date, date_end: date) -> str:
         df.dropna(subset=["close"], inplace=True)
 
         # Select only the required columns
-        result_df = df[["date", "close", "ticker", "source", "extracted_date"]].copy()
-
-        # Convert DataFrame to JSON-compatible dictionary
-        return result_df.to_json(orient="records", date_format="iso")
+        return df[["date", "close", "ticker", "source", "extracted_date"]].copy()
 
     except Exception as e:
         raise RuntimeError(f"Failed to fetch data from Yahoo Finance: {str(e)}")
 
 
+def get_yahoo_finance_data(code: str, date_init: date, date_end: date) -> str:
+    """
+    Fetch financial data from Yahoo Finance for a given stock code and date range.
+
+    Args:
+        code (str): The ticker symbol (e.g., '^BVSP').
+        date_init (date): Start date for data retrieval.
+        date_end (date): End date for data retrieval.
+
+    Returns:
+        str: JSON-compatible containing the requested financial data.
+
+    Raises:
+        ValueError: If date_init is after date_end
+        RuntimeError: If data cannot be fetched from Yahoo Finance.
+    """
+    df = get_yahoo_finance_frame(code, date_init, date_end)
+
+    # Convert DataFrame to JSON-compatible dictionary
+    return df.to_json(orient="records", date_format="iso")
+
+
 def get_sgs_data(code: str, date_init: date, date_end: date) -> str:
     """
     Fetch time series data from Brazilian Central Bank's SGS system.
@@ -100,16 +177,8 @@ def get_sgs_data(code: str, date_init: date, date_end: date) -> str:
     # Initialize an empty DataFrame to store all results
     full_df = pd.DataFrame()
 
-    # Calculate the number of 10-year periods needed
-    current_start = date_init
-
     try:
-        while current_start <= date_end:
-            # Calculate the end date for this chunk (either 10 years from start or the overall end date)
-            current_end = min(
-                date_end, current_start + relativedelta(years=10) - relativedelta(days=1)
-            )
-
+        for current_start, current_end in split_sgs_windows(date_init, date_end):
             print(f"Fetching chunk from {current_start} to {current_end}")
 
             # Format dates for API request
@@ -133,29 +202,12 @@ def get_sgs_data(code: str, date_init: date, date_end: date) -> str:
                 # Append to the full dataset
                 full_df = pd.concat([full_df, chunk_df], ignore_index=True)
 
-            # Update start date for next iteration
-            current_start = current_end + timedelta(days=1)
-
         # Check if we got any data
         if full_df.empty:
             return {"error": f"No data available for SGS code {code} in the specified date range"}
 
-        # Data cleaning and transformation
-        # Convert 'data' column to datetime format
-        full_df["date"] = pd.to_datetime(full_df["data"], format="%d/%m/%Y")
-
-        # Convert 'valor' column to numeric and divide by 100 as it's a percentage
-        full_df["close"] = pd.to_numeric(full_df["valor"], errors="coerce") / 100
-
-        # Process and standardize the data
-        full_df["ticker"] = code
-        full_df["source"] = "SGS"
-        full_df["extracted_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
         # Convert to dictionary/JSON format
-        result = full_df[["date", "close", "ticker", "source", "extracted_date"]].to_json(
-            orient="records", date_format="iso"
-        )
+        result = normalize_sgs_frame(full_df, code).to_json(orient="records", date_format="iso")
 
         return result
 
@@ -197,20 +249,9 @@ def get_sgs_last_data(code: str) -> str:
             return {"error": f"No data available for SGS code {code}"}
 
         # Convert to DataFrame for consistent processing
-        df = pd.DataFrame(data)
+        df = normalize_sgs_frame(pd.DataFrame(data), code)
 
-        # Convert 'valor' column to numeric and divide by 100 as it's a percentage
-        df["close"] = pd.to_numeric(df["valor"], errors="coerce") / 100
-
-        # Data processing
-        df["date"] = pd.to_datetime(df["data"], format="%d/%m/%Y")
-        df["ticker"] = code
-        df["source"] = "SGS"
-        df["extracted_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        return df[["date", "close", "ticker", "source", "extracted_date"]].to_json(
-            orient="records", date_format="iso"
-        )
+        return df.to_json(orient="records", date_format="iso")
 
     except requests.exceptions.RequestException as e:
         raise RuntimeError(f"API request error: {str(e)}")
@@ -261,3 +302,67 @@ def get_yahoo_finance_historical_data(code: str) -> str:
 
     except Exception as e:
         raise RuntimeError(f"Failed to fetch historical data from Yahoo Finance: {str(e)}")
+
+
+def get_yahoo_finance_window(
+    code: str, date_init: date, date_end: date, lookback_days: int = 10
+) -> str:
+    """
+    Fetch Yahoo Finance returns for an inclusive date window, e.g. one backfill chunk.
+
+    Daily returns are computed with pct_change, so a plain window loses the return of
+    its first day. A short lookback before the window is fetched and trimmed afterwards,
+    making consecutive windows add up to the same series as a single full download.
+
+    Args:
+        code (str): The ticker symbol (e.g., '^BVSP').
+        date_init (date): First date of the window (inclusive).
+        date_end (date): Last date of the window (inclusive).
+        lookback_days (int): Calendar days fetched before the window to seed returns.
+
+    Returns:
+        str: JSON-compatible containing the window's data (an empty list if none).
+
+    Raises:
+        ValueError: If date_init is after date_end
+        RuntimeError: If data cannot be fetched from Yahoo Finance.
+    """
+    print(f"Fetching Yahoo Finance window for {code} from {date_init} to {date_end}")
+
+    # Validate date range
+    if date_init > date_end:
+        raise ValueError("Start date cannot be after end date")
+
+    try:
+        # Download the window plus lookback (yfinance treats the end date as exclusive)
+        ticker = yf.Ticker(code)
+        df = ticker.history(
+            start=date_init - timedelta(days=lookback_days), end=date_end + timedelta(days=1)
+        )
+
+        # Windows before the ticker was listed have no data
+        if df.empty:
+            return "[]"
+
+        # Reset index to make date a column
+        df.reset_index(inplace=True)
+
+        # Calculate daily returns and remove NA rows in close column
+        df["close"] = df["Close"].pct_change()
+        df.dropna(subset=["close"], inplace=True)
+
+        # Process and standardize the data
+        df["date"] = df["Date"].dt.strftime("%Y-%m-%d")
+        df["ticker"] = code
+        df["source"] = "Yahoo Finance"
+        df["extracted_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        # Trim the lookback days
+        in_window = df["date"].between(date_init.isoformat(), date_end.isoformat())
+        result_df = df.loc[in_window, ["date", "close", "ticker", "source", "extracted_date"]]
+
+        # Convert DataFrame to JSON-compatible dictionary
+        return result_df.to_json(orient="records", date_format="iso")
+
+    except Exception as e:
+        raise RuntimeError(f"Failed to fetch data window from Yahoo Finance: {str(e)}")
@@ -0,0 +1,132 @@
+"""
+Raw Market Data Loader Module
+
+This module runs the daily fetch steps and the load step shared by the daily DAG and
+the backfill chunks: the JSON batches returned by the fetch tasks are parsed into one
+typed frame, archived as fetched, validated, and compared with the stored rows of the
+same window. Only the new and revised rows are upserted into the raw table on its
+natural key, while the tickers failing a check are quarantined. Every step records
+its metrics to the recorder of the running task.
+"""
+
+import asyncio
+from datetime import date
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+
+from libs.archive import archive_market_data
+from libs.async_financial_data import fetch_sgs_last_frames
+from libs.financial_data import get_yahoo_finance_frame
+from libs.metrics import MetricsRecorder
+from libs.raw_market_data import (
+    RAW_TABLE_NAME,
+    detect_revisions,
+    parse_market_data,
+    upsert_market_data,
+)
+from libs.validation import quarantine_market_data, validate_market_data
+
+
+def fetch_yahoo_batch(
+    ticker: str, date_init: date, date_end: date, metrics: MetricsRecorder
+) -> str:
+    """
+    Fetch a date range of one Yahoo Finance ticker.
+
+    Args:
+        ticker: Yahoo Finance ticker symbol
+        date_init: First date to fetch
+        date_end: Last date to fetch
+        metrics: Recorder of the running task
+
+    Returns:
+        str: JSON records string
+    """
+    print(f"Fetching data for {ticker}")
+    with metrics.timer("fetch", ticker=ticker):
+        df = get_yahoo_finance_frame(ticker, date_init, date_end)
+    data = df.to_json(orient="records", date_format="iso")
+    metrics.record_payload(data, len(df), ticker=ticker)
+    return data
+
+
+def fetch_sgs_batch(ticker: str, metrics: MetricsRecorder, last_n: int = 1) -> Optional[str]:
+    """
+    Fetch the latest data points of one SGS series.
+
+    Args:
+        ticker: SGS series code
+        metrics: Recorder of the running task
+        last_n: Number of most recent data points to fetch
+
+    Returns:
+        Optional[str]: JSON records string, or None if the series is empty
+    """
+    print(f"Fetching latest data for SGS series {ticker}")
+    with metrics.timer("fetch", ticker=ticker):
+        df = asyncio.run(fetch_sgs_last_frames([ticker], last_n=last_n))[ticker]
+    data = None if df.empty else df.to_json(orient="records", date_format="iso")
+    metrics.record_payload(data, len(df), ticker=ticker)
+    return data
+
+
+def load_market_batches(
+    batches: list[str],
+    engine: Engine,
+    metrics: MetricsRecorder,
+    table_name: str = RAW_TABLE_NAME,
+    ticker: Optional[str] = None,
+) -> dict:
+    """
+    Parse, archive and validate fetched JSON batches, and upsert them into the raw
+    table.
+
+    The batches are archived to the bronze Parquet archive as fetched. The rows of the
+    tickers failing a validation check go to the quarantine table instead. Rows
+    already stored with the same values are not written again.
+
+    Args:
+        batches: JSON records strings returned by the fetch tasks (empty ones are skipped)
+        engine: SQLAlchemy Engine instance
+        metrics: Recorder of the running task
+        table_name: Name of the raw table
+        ticker: Ticker the batches belong to, if they hold a single one
+
+    Returns:
+        dict: Number of 'parsed', 'inserted', 'updated' and 'quarantined' rows,
+            'loaded_since', the earliest date written (ISO format, None if nothing was
+            written), and 'revised_from', the earliest revised date (ISO) per ticker
+            whose stored values changed
+    """
+    with metrics.timer("parse", ticker=ticker):
+        df = parse_market_data([batch for batch in batches if batch])
+    parsed = len(df)
+    metrics.record("rows_parsed", parsed, ticker=ticker)
+
+    # Keep an append-only copy of the extraction, as fetched
+    with metrics.timer("archive", ticker=ticker):
+        metrics.record("rows_archived", archive_market_data(df), ticker=ticker)
+
+    # Validate the in-flight batch and set aside the tickers that failed
+    with metrics.timer("validate", ticker=ticker):
+        df, quarantined_df = validate_market_data(df)
+    quarantined = quarantine_market_data(quarantined_df, engine)
+    metrics.record("rows_quarantined", quarantined, ticker=ticker)
+
+    # Keep only new and revised rows of the re-fetched overlapping windows
+    with metrics.timer("diff", ticker=ticker):
+        df, revised_from = detect_revisions(df, engine, table_name=table_name)
+    metrics.record("rows_changed", len(df), ticker=ticker)
+    metrics.record("tickers_revised", len(revised_from), ticker=ticker)
+
+    with metrics.timer("load", ticker=ticker):
+        counts = upsert_market_data(df, engine, table_name=table_name)
+
+    metrics.record("rows_inserted", counts["inserted"], ticker=ticker)
+    metrics.record("rows_updated", counts["updated"], ticker=ticker)
+    counts["parsed"] = parsed
+    counts["quarantined"] = quarantined
+    counts["loaded_since"] = None if df.empty else df["date"].min().isoformat()
+    counts["revised_from"] = revised_from
+    return counts
@@ -0,0 +1,294 @@
+"""
+ETL Metrics Module
+
+This module records per-task and per-ticker counters and stage timings of the ETL
+tasks (rows fetched, payload bytes, fetch/parse/load seconds, ...) and sends them to
+one or more sinks when the task finishes:
+
+- PostgresMetricsSink: appends every record to the etl_metrics table, so regressions
+  can be queried per source, ticker, stage or run
+- StatsdMetricsSink: forwards records to Airflow's StatsD client, a no-op unless
+  metrics are enabled in the Airflow configuration ([metrics] statsd_on)
+- InMemoryMetricsSink: keeps records in a list, as a stand-in for tests
+
+Typical use inside a task:
+
+    with MetricsRecorder.from_context() as metrics:
+        with metrics.timer("fetch", ticker=ticker):
+            data = fetch(ticker)
+        metrics.record("payload_bytes", len(data), unit="bytes", ticker=ticker)
+"""
+
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+# Constants
+METRICS_TABLE_NAME = "etl_metrics"
+STATSD_PREFIX = "etl"
+
+
+class InMemoryMetricsSink:
+    """
+    Sink that keeps every record in memory.
+    """
+
+    def __init__(self):
+        self.records: list[dict] = []
+
+    def write(self, records: list[dict]) -> None:
+        self.records.extend(records)
+
+
+class PostgresMetricsSink:
+    """
+    Sink that appends records to the metrics table in PostgreSQL.
+
+    Args:
+        engine: SQLAlchemy Engine instance (defaults to create_postgres_engine())
+        table_name: Name of the metrics table
+        schema: Database schema name (default: 'public')
+    """
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        table_name: str = METRICS_TABLE_NAME,
+        schema: str = "public",
+    ):
+        self.engine = engine
+        self.table_name = table_name
+        self.schema = schema
+        self._table_created = False
+
+    def write(self, records: list[dict]) -> None:
+        if self.engine is None:
+            from libs.database import create_postgres_engine
+
+            self.engine = create_postgres_engine()
+
+        # Create the table on the first write only, not on every flush
+        if not self._table_created:
+            self._table_created = create_metrics_table(self.engine, self.table_name, self.schema)
+
+        with self.engine.begin() as connection:
+            connection.execute(
+                text(
+                    f"""
+                    INSERT INTO {self.schema}.{self.table_name}
+                        (dag_id, task_id, run_id, map_index, ticker, metric, value, unit,
+                         recorded_at)
+                    VALUES
+                        (:dag_id, :task_id, :run_id, :map_index, :ticker, :metric, :value,
+                         :unit, :recorded_at)
+                    """
+                ),
+                records,
+            )
+
+
+class StatsdMetricsSink:
+    """
+    Sink that forwards records to Airflow's StatsD client.
+
+    Timings are sent as timers, every other record as a gauge, tagged with the DAG,
+    task and ticker when the StatsD backend supports tags.
+
+    Args:
+        prefix: Prefix of the metric names
+    """
+
+    def __init__(self, prefix: str = STATSD_PREFIX):
+        self.prefix = prefix
+
+    def write(self, records: list[dict]) -> None:
+        from airflow.stats import Stats
+
+        for record in records:
+            name = f"{self.prefix}.{record['dag_id']}.{record['task_id']}.{record['metric']}"
+            tags = {"dag_id": record["dag_id"], "task_id": record["task_id"]}
+            if record["ticker"]:
+                tags["ticker"] = record["ticker"]
+
+            if record["unit"] == "seconds":
+                Stats.timing(name, record["value"] * 1000, tags=tags)
+            else:
+                Stats.gauge(name, record["value"], tags=tags)
+
+
+def create_metrics_table(
+    engine: Engine, table_name: str = METRICS_TABLE_NAME, schema: str = "public"
+) -> bool:
+    """
+    Create the metrics table if it doesn't exist.
+
+    Args:
+        engine: SQLAlchemy Engine instance
+        table_name: Name of the metrics table
+        schema: Database schema name (default: 'public')
+
+    Returns:
+        bool: True if the table exists after the call
+    """
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE IF NOT EXISTS {schema}.{table_name} (
+                    dag_id TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    run_id TEXT NOT NULL,
+                    map_index INTEGER NOT NULL DEFAULT -1,
+                    ticker TEXT,
+                    metric TEXT NOT NULL,
+                    value DOUBLE PRECISION NOT NULL,
+                    unit TEXT NOT NULL,
+                    recorded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+                """
+            )
+        )
+    return True
+
+
+class MetricsRecorder:
+    """
+    Collect the metrics of one task run and flush them to the sinks.
+
+    Records are buffered and written once on flush (or when leaving the `with` block),
+    so recording costs no round trip. A failing sink is reported but never fails the
+    task.
+
+    Args:
+        sinks: Sinks receiving the records
+        dag_id: DAG of the task
+        task_id: Task recording the metrics
+        run_id: DAG run of the task
+        map_index: Map index of a mapped task instance (-1 if not mapped)
+    """
+
+    def __init__(
+        self,
+        sinks: list,
+        dag_id: str = "",
+        task_id: str = "",
+        run_id: str = "",
+        map_index: int = -1,
+    ):
+        self.sinks = sinks
+        self.dag_id = dag_id
+        self.task_id = task_id
+        self.run_id = run_id
+        self.map_index = map_index
+        self.records: list[dict] = []
+
+    @classmethod
+    def from_context(
+        cls, context: Optional[dict] = None, sinks: Optional[list] = None
+    ) -> "MetricsRecorder":
+        """
+        Create a recorder for the running task instance.
+
+        Args:
+            context: Airflow task context (defaults to the current one)
+            sinks: Sinks receiving the records (defaults to Postgres and StatsD)
+
+        Returns:
+            MetricsRecorder: Recorder bound to the task instance
+        """
+        if context is None:
+            from airflow.operators.python import get_current_context
+
+            context = get_current_context()
+
+        ti = context["ti"]
+        return cls(
+            sinks if sinks is not None else [PostgresMetricsSink(), StatsdMetricsSink()],
+            dag_id=ti.dag_id,
+            task_id=ti.task_id,
+            run_id=ti.run_id,
+            map_index=ti.map_index,
+        )
+
+    def record(
+        self, metric: str, value: float, unit: str = "count", ticker: Optional[str] = None
+    ) -> None:
+        """
+        Record one value.
+
+        Args:
+            metric: Metric name (e.g., 'rows_fetched')
+            value: Metric value
+            unit: Unit of the value (e.g., 'count', 'bytes', 'seconds')
+            ticker: Ticker the value refers to, if any
+        """
+        self.records.append(
+            {
+                "dag_id": self.dag_id,
+                "task_id": self.task_id,
+                "run_id": self.run_id,
+                "map_index": self.map_index,
+                "ticker": str(ticker) if ticker is not None else None,
+                "metric": metric,
+                "value": float(value),
+                "unit": unit,
+                "recorded_at": datetime.now(timezone.utc),
+            }
+        )
+
+    @contextmanager
+    def timer(self, stage: str, ticker: Optional[str] = None) -> Iterator[None]:
+        """
+        Record the duration of a stage as '<stage>_seconds'.
+
+        Args:
+            stage: Stage name (e.g., 'fetch', 'parse', 'load')
+            ticker: Ticker the stage works on, if any
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(f"{stage}_seconds", time.perf_counter() - start, "seconds", ticker)
+
+    def record_payload(
+        self, payload: Optional[str], rows: int, ticker: Optional[str] = None
+    ) -> None:
+        """
+        Record the rows and size of a JSON records payload passed through XCom.
+
+        The rows are counted by the caller from the frame the payload was built from
+        (or parsed into), so the payload is never decoded just to be measured.
+
+        Args:
+            payload: JSON records string (None or empty when nothing was fetched)
+            rows: Number of records in the payload
+            ticker: Ticker the payload belongs to, if any
+        """
+        self.record("rows_fetched", rows, "count", ticker)
+        self.record("payload_bytes", len(payload.encode()) if payload else 0, "bytes", ticker)
+
+    def flush(self) -> None:
+        """
+        Write the buffered records to every sink.
+        """
+        if not self.records:
+            return
+
+        records, self.records = self.records, []
+        for sink in self.sinks:
+            try:
+                sink.write(records)
+            except (SQLAlchemyError, OSError, ValueError) as e:
+                print(f"Error writing metrics to {type(sink).__name__}: {e}")
+
+    def __enter__(self) -> "MetricsRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
@@ -0,0 +1,653 @@
+"""
+Raw Market Data Module
+
+This module owns the raw_market_data landing table: its DDL, the natural key used to
+deduplicate loads, the revision detection that compares re-fetched windows with the
+stored rows, the last-write-wins upsert used by the DAGs, and a one-off compaction
+routine for tables that accumulated duplicates before the key existed.
+
+The table is range-partitioned by month on `date`. Partitions follow the
+`<table>_YYYY_MM` naming of the create_year_month_partitions dbt macro, are created
+on demand by loads and ahead of time by the maintenance DAG, and can be dropped once
+their rows are captured in the warehouse fact table.
+"""
+
+import re
+from datetime import date
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from libs.database import OnConflict, bulk_upsert_dataframe, read_from_table
+
+# Constants
+RAW_TABLE_NAME = "raw_market_data"
+RAW_MARKET_DATA_COLUMNS = ["date", "close", "ticker", "source", "extracted_date"]
+RAW_MARKET_DATA_KEY = ["ticker", "date", "source"]  # Natural key of a series point
+PARTITION_SUFFIX_PATTERN = re.compile(r"_(\d{4})_(\d{2})$")  # <table>_YYYY_MM
+FACT_TABLE = "financial_s.fct_serie_tb"  # Warehouse table the raw rows are captured in
+TICKER_TYPE_TABLE = "financial_s.dim_ticker_type_tb"  # Maps raw tickers to fact keys
+
+
+def _month_start(day: date) -> date:
+    """Return the first day of the month of the given date."""
+    return day.replace(day=1)
+
+
+def is_partitioned(
+    engine: Engine, table_name: str = RAW_TABLE_NAME, schema: str = "public"
+) -> bool:
+    """
+    Check whether a table exists as a declaratively partitioned table.
+
+    Args:
+        engine: SQLAlchemy Engine instance
+        table_name: Name of the table
+        schema: Database schema name (default: 'public')
+
+    Returns:
+        bool: True if the table is partitioned
+    """
+    query = text(
+        """
+        SELECT EXISTS (
+            SELECT 1
+            FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relname = :table_name AND n.nspname = :schema
+        )
+        """
+    )
+    with engine.connect() as connection:
+        return connection.execute(query, {"table_name": table_name, "schema": schema}).scalar()
+
+
+def _create_partitioned_table(connection, table_name: str, schema: str) -> None:
+    """Create the partitioned raw table and its natural-key index on an open connection."""
+    connection.execute(
+        text(
+            f"""
+            CREATE TABLE IF NOT EXISTS {schema}.{table_name} (
+                date DATE NOT NULL,
+                close DOUBLE PRECISION,
+                ticker TEXT,
+                source TEXT,
+                extracted_date TIMESTAMP
+            ) PARTITION BY RANGE (date)
+            """
+        )
+    )
+    connection.execute(
+        text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {table_name}_natural_key_idx "
+            f"ON {schema}.{table_name} ({', '.join(RAW_MARKET_DATA_KEY)})"
+        )
+    )
+
+
+def _create_month_partitions(
+    connection, start: date, end: date, table_name: str, schema: str
+) -> int:
+    """
+    Create monthly partitions covering [start, end] on an open connection.
+
+    Concurrent loads (mapped backfill chunks, the daily load and a replay) may need the
+    same missing month at once, and CREATE TABLE IF NOT EXISTS ... PARTITION OF is not
+    safe against that race. A transaction-level advisory lock on the table serializes
+    the partition DDL until the caller's transaction commits.
+    """
+    connection.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:table))"),
+        {"table": f"{schema}.{table_name}"},
+    )
+
+    created = 0
+    month = _month_start(start)
+
+    while month <= end:
+        next_month = month + relativedelta(months=1)
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE IF NOT EXISTS {schema}.{table_name}_{month:%Y_%m}
+                PARTITION OF {schema}.{table_name}
+                FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}')
+                """
+            )
+        )
+        created += 1
+        month = next_month
+
+    return created
+
+
+def create_raw_market_data_table(
+    engine: Engine, table_name: str = RAW_TABLE_NAME, schema: str = "public"
+) -> bool:
+    """
+    Create the month-partitioned raw market data table and its natural-key unique index.
+
+    Partitions are not created here; loads create the ones they need through
+    create_month_partitions.
+
+    Args:
+        engine: SQLAlchemy Engine instance
+        table_name: Name of the raw table
+        schema: Database schema name (default: 'public')
+
+    Returns:
+        bool: True if the table and index exist after the call
+
+    Raises:
+        SQLAlchemyError: If the DDL fails
+    """
+    with engine.begin() as connection:
+        _create_partitioned_table(connection, table_name, schema)
+
+    print(f"Table {schema}.{table_name} is ready, partitioned by month on date")
+    return True
+
+
+def create_month_partitions(
+    engine: Engine,
+    start: date,
+    end: date,
+    table_name: str = RAW_TABLE_NAME,
+    schema: str = "public",
+) -> int:
+    """
+    Create the monthly partitions of the raw table covering a date range, if missing.
+
+    Args:
+        engine: SQLAlchemy Engine instance
+        start: First date that must be covered
+        end: Last date that must be covered
+        table_name: Name of the raw table
+        schema: Database schema name (default: 'public')
+
+    Returns:
+        int: Number of months covered by the range
+    """
+    with engine.begin() as connection:
+        months = _create_month_partitions(connection, start, end, table_name, schema)
+
+    print(f"Ensured {months} monthly partitions of {schema}.{table_name} from {start} to {end}")
+    return months
+
+
+def parse_market_data(batches: list[str]) -> pd.DataFrame:
+    """
+    Convert JSON batches returned by the fetch functions into one typed DataFrame.
+
+    Args:
+        batches: JSON record strings in the raw market data schema
+
+    Returns:
+        pd.DataFrame: Combined frame with 'date' as date and 'extracted_date' as timestamp
+    """
+    dfs = [df for df in (pd.read_json(batch) for batch in batches) if not df.empty]
+    if not dfs:
+        return pd.DataFrame(columns=RAW_MARKET_DATA_COLUMNS)
+
+    df = pd.concat(dfs, ignore_index=True)[RAW_MARKET_DATA_COLUMNS]
+
+    # Ensure proper data types for database compatibility (SGS codes are numeric strings)
+    df["ticker"] = df["ticker"].astype(str)
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    df["extracted_date"] = pd.to_datetime(df["extracted_date"])
+
+    return df
+
+
+def deduplicate_market_data(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep only the most recently extracted row for each natural key within a batch.
+
+    Args:
+        df: Raw market data frame
+
+    Returns:
+        pd.DataFrame: Frame with one row per (ticker, date, source)
+    """
+    return (
+        df.sort_values("extracted_date", kind="stable")
+        .drop_duplicates(subset=RAW_MARKET_DATA_KEY, keep="last")
+        .reset_index(drop=True)
+    )
+
+
+def _row_hashes(df: pd.DataFrame) -> pd.Series:
+    """Hash the natural key and value of every row, independently of the index."""
+    rows = df[[*RAW_MARKET_DATA_KEY, "close"]].astype({"ticker": str, "close": float})
+    return pd.util.hash_pandas_object(rows, index=False).set_axis(df.index)
+
+
+def detect_revisions(
+    df: pd.DataFrame, engine: Engine, table_name: str = RAW_TABLE_NAME, schema: str = "public"
+) -> tuple[pd.DataFrame, dict[str, str]]:
+    """
+    Compare a re-fetched batch with the stored rows of the same window.
+
+    Rows are compared by a hash of (ticker, date, source, close) against the rows
+    stored for the batch's tickers and date range, so only new and revised rows are
+    kept for loading.
+
+    Args:
+        df: Raw market data frame
+        engine: SQLAlchemy Engine instance
+        table_name: Name of the raw table
+        schema: Database schema name (default: 'public')
+
+    Returns:
+        tuple[pd.DataFrame, dict[str, str]]: New or revised rows, and the earliest
+            revised date (ISO) per ticker whose stored values changed
+    """
+    df = deduplicate_market_data(df[RAW_MARKET_DATA_COLUMNS])
+    if df.empty or not inspect(engine).has_table(table_name, schema=schema):
+        return df, {}
+
+    query = text(
+        f"""
+        SELECT ticker, date, source, close
+        FROM {schema}.{table_name}
+        WHERE ticker = ANY(:tickers) AND date BETWEEN :date_init AND :date_end
+        """
+    )
+    with engine.connect() as connection:
+        stored = pd.DataFrame(
+            connection.execute(
+                query,
+                {
+                    "tickers": df["ticker"].astype(str).unique().tolist(),
+                    "date_init": df["date"].min(),
+                    "date_end": df["date"].max(),
+                },
+            ).fetchall(),
+            columns=[*RAW_MARKET_DATA_KEY, "close"],
+        )
+
+    return diff_against_stored(df, stored)
+
+
+def diff_against_stored(
+    df: pd.DataFrame, stored: pd.DataFrame
+) -> tuple[pd.DataFrame, dict[str, str]]:
+    """
+    Keep the rows of a deduplicated batch that are new or differ from the stored rows.
+
+    Args:
+        df: Raw market data frame, one row per natural key
+        stored: Stored (ticker, date, source, close) rows of the batch's window
+
+    Returns:
+        tuple[pd.DataFrame, dict[str, str]]: New or revised rows, and the earliest
+            revised date (ISO) per ticker whose stored values changed
+    """
+    if stored.empty:
+        return df, {}
+
+    changed = df[~_row_hashes(df).isin(_row_hashes(stored))]
+
+    # A changed row whose key is already stored is a revision of a published value
+    stored_keys = pd.MultiIndex.from_frame(stored[RAW_MARKET_DATA_KEY].astype({"ticker": str}))
+    changed_keys = pd.MultiIndex.from_frame(changed[RAW_MARKET_DATA_KEY].astype({"ticker": str}))
+    revised = changed[changed_keys.isin(stored_keys)]
+    revised_from = {
+        str(ticker): day.isoformat()
+        for ticker, day in revised.groupby("ticker")["date"].min().items()
+    }
+
+    print(
+        f"{len(df) - len(changed)} rows unchanged, {len(changed) - len(revised)} new, "
+        f"{len(revised)} revised"
+    )
+    if revised_from:
+        print(f"Revised values from: {revised_from}")
+    return changed.reset_index(drop=True), revised_from
+
+
+def upsert_market_data(
+    df: pd.DataFrame, engine: Engine, table_name: str = RAW_TABLE_NAME, schema: str = "public"
+) -> dict[str, int]:
+    """
+    Load raw market data with load-time deduplication and last-write-wins semantics.
+
+    Rows are deduplicated within the batch, the monthly partitions they fall into are
+    created if missing, and rows are bulk upserted on the natural key (ticker, date,
+    source). An existing row is only overwritten by a row extracted at the same time
+    or later whose value differs, so re-fetching unchanged days writes nothing.
+
+    Args:
+        df: Raw market data frame
+        engine: SQLAlchemy Engine instance
+        table_name: Name of the raw table
+        schema: Database schema name (default: 'public')
+
+    Returns:
+        dict[str, int]: Number of rows 'inserted' and 'updated'
+    """
+    df = deduplicate_market_data(df[RAW_MARKET_DATA_COLUMNS])
+    if df.empty:
+        return {"inserted": 0, "updated": 0}
+
+    # Make sure every month touched by the batch has a partition
+    if is_partitioned(engine, table_name, schema):
+        create_month_partitions(engine, df["date"].min(), df["date"].max(), table_name, schema)
+    else:
+        print(f"Table {schema}.{table_name} is not partitioned yet, run the maintenance DAG")
+
+    return bulk_upsert_dataframe(
+        df=df,
+        table_name=table_name,
+        engine=engine,
+        schema=schema,
+        on_conflict=OnConflict(
+            columns=RAW_MARKET_DATA_KEY,
+            update_condition=(
+                "EXCLUDED.extracted_date >= target.extracted_date "
+                "AND EXCLUDED.close IS DISTINCT FROM target.close"
+            ),
+        ),
+    )
+
+
+def read_ticker_types(engine: Engine) -> list[dict]:
+    """
+    Read the tickers to load, with their source, from the ticker type dimension.
+
+    Args:
+        engine: SQLAlchemy Engine instance
+
+    Returns:
+        list[dict]: Records with 'ticker_type_nm' and 'is_src'
+
+    Raises:
+        ValueError: If no tickers are found in the dimension table
+    """
+    query = """
+        SELECT
+            ticker_type_nm,
+            is_src
+        FROM
+            financial_s.dim_ticker_type_tb
+    """
+    df = read_from_table(
+        table_name="dim_ticker_type_tb", engine=engine, schema="financial_s", query=query
+    )
+    if df is None or df.empty:
+        raise ValueError("No tickers found in dim_ticker_type_tb")
+    return df.to_dict(orient="records")
+
+
+def get_last_loaded_dates(
+    engine: Engine,
+    tickers: list[str],
+    source: str,
+    table_name: str = RAW_TABLE_NAME,
+    schema: str = "public",
+) -> dict[str, str]:
+    """
+    Return the most recent date already loaded for each ticker of a source.
+
+    Args:
+        engine: SQLAlchemy Engine instance
+        tickers: Tickers to look up
+        source: Source name as stored in the raw table (e.g., 'SGS')
+        table_name: Name of the raw table
+        schema: Database schema name (default: 'public')
+
+    Returns:
+        dict[str, str]: Last loaded date (ISO) per ticker; tickers without data are omitted
+    """
+    if not tickers or not inspect(engine).has_table(table_name, schema=schema):
+        return {}
+
+    query = text(
+        f"""
+        SELECT ticker, max(date) AS last_date
+        FROM {schema}.{table_name}
+        WHERE source = :source AND ticker = ANY(:tickers)
+        GROUP BY ticker
+        """
+    )
+    with engine.connect() as connection:
+        rows = connection.execute(query, {"source": source, "tickers": list(tickers)})
+        return {ticker: last_date.isoformat() for ticker, last_date in rows}
+
+
+def compact_raw_market_data(
+    engine: Engine, table_name: str = RAW_TABLE_NAME, schema: str = "public"
+) -> int:
+    """
+    Remove duplicate rows from an existing raw table and enforce the natural key.
+
+    For every (ticker, date, source) only the row with the latest extracted_date is kept.
+    This is a one-off routine for tables populated by plain appends; afterwards the
+    unique index prevents new duplicates. The table is vacuumed once compacted.
+
+    Args:
+        engine: SQLAlchemy Engine instance
+        table_name: Name of the raw table
+        schema: Database schema name (default: 'public')
+
+    Returns:
+        int: Number of duplicate rows deleted
+
+    Raises:
+        SQLAlchemyError: If the compaction fails (the transaction is rolled back)
+    """
+    # Partitioned tables always carry the unique index, so they hold no duplicates
+    if is_partitioned(engine, table_name, schema):
+        print(f"Table {schema}.{table_name} is partitioned, nothing to compact")
+        return 0
+
+    key_list = ", ".join(RAW_MARKET_DATA_KEY)
+
+    try:
+        with engine.begin() as connection:
+            result = connection.execute(
+                text(
+                    f"""
+                    DELETE FROM {schema}.{table_name} t
+                    USING (
+                        SELECT
+                            ctid,
+                            ROW_NUMBER() OVER (
+                                PARTITION BY {key_list}
+                                ORDER BY extracted_date DESC
+                            ) AS row_num
+                        FROM {schema}.{table_name}
+                    ) ranked
+                    WHERE t.ctid = ranked.ctid
+                      AND ranked.row_num > 1
+                    """
+                )
+            )
+            deleted = result.rowcount
+
+            connection.execute(
+                text(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {table_name}_natural_key_idx "
+                    f"ON {schema}.{table_name} ({key_list})"
+                )
+            )
+
+        # Reclaim the space of the deleted tuples (VACUUM cannot run inside a transaction)
+        with engine.connect() as connection:
+            connection.execution_options(isolation_level="AUTOCOMMIT")
+            connection.execute(text(f"VACUUM ANALYZE {schema}.{table_name}"))
+
+        print(f"Removed {deleted} duplicate rows from {schema}.{table_name}")
+        return deleted
+    except SQLAlchemyError as e:
+        print(f"Error compacting table {schema}.{table_name}: {e}")
+        raise
+
+
+def migrate_raw_market_data_to_partitioned(
+    engine: Engine, table_name: str = RAW_TABLE_NAME, schema: str = "public"
+) -> int:
+    """
+    Convert an existing unpartitioned raw table into the month-partitioned layout.
+
+    In one transaction the old heap is renamed, the partitioned table and the partitions
+    covering its date range are created, rows are copied keeping only the latest
+    extraction of each natural key, and the old heap is dropped. Does nothing if the
+    table is already partitioned or does not exist.
+
+    Args:
+        engine: SQLAlchemy Engine instance
+        table_name: Name of the raw table
+        schema: Database schema name (default: 'public')
+
+    Returns:
+        int: Number of rows copied into the partitioned table
+
+    Raises:
+        SQLAlchemyError: If the migration fails (the transaction is rolled back)
+    """
+    if is_partitioned(engine, table_name, schema):
+        print(f"Table {schema}.{table_name} is already partitioned")
+        return 0
+
+    legacy_table = f"{table_name}_legacy"
+    key_list = ", ".join(RAW_MARKET_DATA_KEY)
+    column_list = ", ".join(RAW_MARKET_DATA_COLUMNS)
+
+    try:
+        with engine.begin() as connection:
+            if not inspect(connection).has_table(table_name, schema=schema):
+                print(f"Table {schema}.{table_name} does not exist, nothing to migrate")
+                return 0
+
+            # Move the heap and its index out of the way
+            connection.execute(text(f"ALTER TABLE {schema}.{table_name} RENAME TO {legacy_table}"))
+            connection.execute(
+                text(
+                    f"ALTER INDEX IF EXISTS {schema}.{table_name}_natural_key_idx "
+                    f"RENAME TO {legacy_table}_natural_key_idx"
+                )
+            )
+
+            # Create the partitioned table with partitions for the existing date range
+            _create_partitioned_table(connection, table_name, schema)
+            min_date, max_date = connection.execute(
+                text(f"SELECT MIN(date), MAX(date) FROM {schema}.{legacy_table}")
+            ).one()
+            if min_date is not None:
+                _create_month_partitions(connection, min_date, max_date, table_name, schema)
+
+            # Copy rows, keeping the latest extraction of each natural key
+            copied = connection.execute(
+                text(
+                    f"""
+                    INSERT INTO {schema}.{table_name} ({column_list})
+                    SELECT DISTINCT ON ({key_list}) {column_list}
+                    FROM {schema}.{legacy_table}
+                    WHERE date IS NOT NULL
+                    ORDER BY {key_list}, extracted_date DESC
+                    """
+                )
+            ).rowcount
+
+            connection.execute(text(f"DROP TABLE {schema}.{legacy_table}"))
+
+        print(f"Migrated {copied} rows into partitioned table {schema}.{table_name}")
+        return copied
+    except SQLAlchemyError as e:
+        print(f"Error migrating table {schema}.{table_name}: {e}")
+        raise
+
+
+def drop_captured_partitions(
+    engine: Engine,
+    retention_months: int,
+    table_name: str = RAW_TABLE_NAME,
+    schema: str = "public",
+    drop: bool = True,
+) -> list[str]:
+    """
+    Detach (and optionally drop) old raw partitions already captured in the fact table.
+
+    A partition is eligible when it ends before the retention window and every one of
+    its (ticker, date) points exists in the fact table. Detaching is a metadata-only
+    operation, so cleanup needs neither bulk deletes nor vacuum.
+
+    Args:
+        engine: SQLAlchemy Engine instance
+        retention_months: Number of most recent months always kept in the raw table
+        table_name: Name of the raw table
+        schema: Database schema name (default: 'public')
+        drop: Drop detached partitions (when False they are kept as standalone tables)
+
+    Returns:
+        list[str]: Names of the partitions detached
+    """
+    cutoff = _month_start(date.today()) - relativedelta(months=retention_months)
+
+    with engine.connect() as connection:
+        partitions = (
+            connection.execute(
+                text(
+                    """
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                JOIN pg_class p ON p.oid = i.inhparent
+                JOIN pg_namespace n ON n.oid = p.relnamespace
+                WHERE p.relname = :table_name AND n.nspname = :schema
+                ORDER BY c.relname
+                """
+                ),
+                {"table_name": table_name, "schema": schema},
+            )
+            .scalars()
+            .all()
+        )
+
+    detached = []
+    for partition in partitions:
+        match = PARTITION_SUFFIX_PATTERN.search(partition)
+        if not match:
+            continue
+
+        # Only partitions ending before the retention window are eligible
+        partition_end = date(int(match.group(1)), int(match.group(2)), 1) + relativedelta(months=1)
+        if partition_end > cutoff:
+            continue
+
+        with engine.begin() as connection:
+            missing = connection.execute(
+                text(
+                    f"""
+                    SELECT COUNT(*)
+                    FROM {schema}.{partition} r
+                    WHERE NOT EXISTS (
+                        SELECT 1
+                        FROM {FACT_TABLE} f
+                        JOIN {TICKER_TYPE_TABLE} tt ON tt.ticker_type_id = f.ticker_type_id
+                        WHERE tt.ticker_type_nm = r.ticker
+                          AND f.ticker_date = r.date
+                    )
+                    """
+                )
+            ).scalar()
+
+            if missing:
+                print(f"Keeping {partition}: {missing} rows not yet captured in {FACT_TABLE}")
+                continue
+
+            connection.execute(
+                text(f"ALTER TABLE {schema}.{table_name} DETACH PARTITION {schema}.{partition}")
+            )
+            if drop:
+                connection.execute(text(f"DROP TABLE {schema}.{partition}"))
+
+        print(f"Detached{' and dropped' if drop else ''} partition {schema}.{partition}")
+        detached.append(partition)
+
+    return detached
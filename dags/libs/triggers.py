@@ -0,0 +1,166 @@
+"""
+Deferrable Publication Wait Module
+
+This module lets the daily DAG wait for the Brazilian Central Bank's SGS system to
+publish new data points without holding a worker slot. The sensor looks up the last
+date already loaded for each series, then defers to a trigger that polls the latest
+SGS data point of every series from the triggerer process. The sensor resumes once
+every series published something newer, or when the wait times out, and returns the
+series that actually have new data so only those are fetched.
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Optional
+
+from airflow.models.baseoperator import BaseOperator
+from airflow.triggers.base import BaseTrigger, TriggerEvent
+
+# Constants
+DEFAULT_POKE_INTERVAL_SECONDS = 600.0  # Time between two polls of the SGS API
+DEFAULT_WAIT_TIMEOUT = timedelta(hours=3)  # Give up waiting and go on with what was published
+
+
+class SgsPublicationTrigger(BaseTrigger):
+    """
+    Poll the latest data point of SGS series until they are newer than what was loaded.
+
+    Args:
+        last_dates (dict): Last loaded date (ISO, or None if never loaded) per series code
+        end_time (str): ISO timestamp after which the trigger stops waiting
+        poke_interval (float): Seconds between two polls
+    """
+
+    def __init__(
+        self,
+        last_dates: dict[str, Optional[str]],
+        end_time: str,
+        poke_interval: float = DEFAULT_POKE_INTERVAL_SECONDS,
+    ):
+        super().__init__()
+        self.last_dates = last_dates
+        self.end_time = end_time
+        self.poke_interval = poke_interval
+
+    def serialize(self) -> tuple[str, dict[str, Any]]:
+        return (
+            "libs.triggers.SgsPublicationTrigger",
+            {
+                "last_dates": self.last_dates,
+                "end_time": self.end_time,
+                "poke_interval": self.poke_interval,
+            },
+        )
+
+    async def _latest_date(self, client, code: str) -> Optional[date]:
+        """
+        Return the date of the latest published data point of a series, or None on error.
+        """
+        from libs.async_financial_data import SGS_DATE_FORMAT, SGS_SERIES_URL
+
+        try:
+            response = await client.get(
+                f"{SGS_SERIES_URL.format(code=code)}/ultimos/1", params={"formato": "json"}
+            )
+            response.raise_for_status()
+            records = response.json()
+        except Exception as e:
+            self.log.warning("Could not poll SGS series %s: %s", code, e)
+            return None
+
+        if not records:
+            return None
+        return datetime.strptime(records[-1]["data"], SGS_DATE_FORMAT).date()
+
+    async def run(self) -> AsyncIterator[TriggerEvent]:
+        import httpx
+
+        end_time = datetime.fromisoformat(self.end_time)
+        published = set()
+
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            while True:
+                pending = [code for code in self.last_dates if code not in published]
+                latest = await asyncio.gather(*(self._latest_date(client, c) for c in pending))
+
+                for code, latest_date in zip(pending, latest):
+                    last_loaded = self.last_dates[code]
+                    if latest_date and (
+                        last_loaded is None or latest_date > date.fromisoformat(last_loaded)
+                    ):
+                        self.log.info("SGS series %s published %s", code, latest_date)
+                        published.add(code)
+
+                if len(published) == len(self.last_dates):
+                    yield TriggerEvent({"status": "success", "published": sorted(published)})
+                    return
+
+                if datetime.now(timezone.utc) >= end_time:
+                    yield TriggerEvent({"status": "timeout", "published": sorted(published)})
+                    return
+
+                await asyncio.sleep(self.poke_interval)
+
+
+class SgsPublicationSensor(BaseOperator):
+    """
+    Wait, deferred, until SGS series publish data newer than what is loaded.
+
+    The sensor never holds a worker slot while waiting. It returns the list of series
+    with new data; on timeout it returns the series published so far (possibly none)
+    instead of failing, so the rest of the pipeline can carry on.
+
+    Args:
+        codes (list): SGS series codes to wait for (templated, accepts an XComArg)
+        raw_table_name (str): Raw table holding the loaded series
+        wait_timeout (timedelta): Maximum time to wait for publication
+        poke_interval (float): Seconds between two polls of the SGS API
+    """
+
+    template_fields = ("codes",)
+
+    def __init__(
+        self,
+        *,
+        codes: list,
+        raw_table_name: str = "raw_market_data",
+        wait_timeout: timedelta = DEFAULT_WAIT_TIMEOUT,
+        poke_interval: float = DEFAULT_POKE_INTERVAL_SECONDS,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.codes = codes
+        self.raw_table_name = raw_table_name
+        self.wait_timeout = wait_timeout
+        self.poke_interval = poke_interval
+
+    def execute(self, context) -> list:
+        from libs.database import create_postgres_engine
+        from libs.raw_market_data import get_last_loaded_dates
+
+        codes = [str(code) for code in self.codes or []]
+        if not codes:
+            print("No SGS series to wait for")
+            return []
+
+        loaded = get_last_loaded_dates(
+            create_postgres_engine(), codes, source="SGS", table_name=self.raw_table_name
+        )
+        print(f"Waiting for SGS publication after the last loaded dates: {loaded}")
+
+        self.defer(
+            trigger=SgsPublicationTrigger(
+                last_dates={code: loaded.get(code) for code in codes},
+                end_time=(datetime.now(timezone.utc) + self.wait_timeout).isoformat(),
+                poke_interval=self.poke_interval,
+            ),
+            method_name="execute_complete",
+        )
+
+    def execute_complete(self, context, event: dict) -> list:
+        published = event["published"]
+        if event["status"] == "timeout":
+            print(f"Stopped waiting for SGS publication, new data for: {published}")
+        else:
+            print(f"All SGS series published new data: {published}")
+        return published
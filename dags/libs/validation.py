@@ -0,0 +1,226 @@
+"""
+Market Data Validation Module
+
+This module checks a raw market data batch before it is loaded, using vectorized
+pandas operations on the small in-flight frame instead of scanning the warehouse with
+`dbt test` afterwards.
+
+Row checks (a failure quarantines the whole batch of the ticker):
+- null_key: missing ticker, date, source or close
+- duplicate_key: the same (ticker, date, source) extracted at the same time with
+  different values
+- non_monotonic_date: dates going backwards within a ticker, in the order fetched
+- out_of_range_return: Yahoo Finance daily returns (close holds the pct change of the
+  price) that are not above -100% or move more than the allowed daily return, and SGS
+  rates outside the allowed range
+
+Batch check (reported only, holidays make it noisy):
+- business-day gaps in daily series
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from libs.database import write_dataframe_to_table
+from libs.raw_market_data import RAW_MARKET_DATA_KEY
+
+# Constants
+QUARANTINE_TABLE_NAME = "raw_market_data_quarantine"
+MAX_ABS_DAILY_RETURN = 0.5  # Largest accepted Yahoo Finance daily return (50%)
+MAX_ABS_SGS_RATE = 1.0  # Largest accepted SGS rate per period (100%, stored as a fraction)
+MAX_GAP_BUSINESS_DAYS = 5  # Missing business days tolerated in a daily series
+BATCH_KEY = ["ticker", "source"]  # A ticker's batch, quarantined as a whole
+QUARANTINE_KEY = [*RAW_MARKET_DATA_KEY, "extracted_date"]  # One extraction of a point
+
+
+def _out_of_range_returns(
+    df: pd.DataFrame, max_abs_return: float, max_abs_sgs_rate: float
+) -> pd.Series:
+    """
+    Flag implausible daily returns and SGS rates out of range.
+    """
+    is_sgs = df["source"] == "SGS"
+    bad_return = (df["close"] <= -1) | (df["close"].abs() > max_abs_return)
+    bad_rate = df["close"].abs() > max_abs_sgs_rate
+    return (~is_sgs & bad_return) | (is_sgs & bad_rate)
+
+
+def find_business_day_gaps(
+    df: pd.DataFrame, max_gap_business_days: int = MAX_GAP_BUSINESS_DAYS
+) -> dict[str, int]:
+    """
+    Find daily series with more missing business days than tolerated.
+
+    A series counts as daily when its median step is one business day, so monthly
+    series are not reported.
+
+    Args:
+        df: Raw market data frame
+        max_gap_business_days: Missing business days tolerated between two points
+
+    Returns:
+        dict[str, int]: Largest number of missing business days per offending ticker
+    """
+    points = df.dropna(subset=["ticker", "date"]).drop_duplicates(["ticker", "date"])
+    points = points.assign(day=pd.to_datetime(points["date"]))
+    points = points.sort_values(["ticker", "day"])
+
+    previous = points.groupby("ticker")["day"].shift()
+    has_previous = previous.notna()
+    steps = pd.Series(np.nan, index=points.index)
+    steps[has_previous] = np.busday_count(
+        previous[has_previous].values.astype("datetime64[D]"),
+        points.loc[has_previous, "day"].values.astype("datetime64[D]"),
+    )
+
+    by_ticker = steps.groupby(points["ticker"])
+    daily = by_ticker.median() == 1
+    missing = by_ticker.max() - 1
+    offending = missing[daily & (missing > max_gap_business_days)]
+    return {str(ticker): int(gap) for ticker, gap in offending.items()}
+
+
+def validate_market_data(
+    df: pd.DataFrame,
+    max_abs_return: float = MAX_ABS_DAILY_RETURN,
+    max_abs_sgs_rate: float = MAX_ABS_SGS_RATE,
+    max_gap_business_days: int = MAX_GAP_BUSINESS_DAYS,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Split a batch into the rows safe to load and the ticker batches to quarantine.
+
+    Args:
+        df: Raw market data frame, in the order it was fetched
+        max_abs_return: Largest accepted Yahoo Finance daily return
+        max_abs_sgs_rate: Largest accepted SGS rate per period, as a fraction
+        max_gap_business_days: Missing business days tolerated in a daily series
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: Valid rows, and quarantined rows with a
+            'failed_checks' column listing the checks failed by the ticker's batch
+    """
+    df = df.reset_index(drop=True)
+    if df.empty:
+        return df, df.assign(failed_checks=pd.Series(dtype=str))
+
+    dates = pd.to_datetime(df["date"])
+    extractions = df.groupby([*RAW_MARKET_DATA_KEY, "extracted_date"], dropna=False)["close"]
+    checks = pd.DataFrame(
+        {
+            "null_key": df[[*RAW_MARKET_DATA_KEY, "close"]].isna().any(axis=1),
+            "duplicate_key": extractions.transform("nunique") > 1,
+            "non_monotonic_date": dates < dates.groupby([df[c] for c in BATCH_KEY]).shift(),
+            "out_of_range_return": _out_of_range_returns(df, max_abs_return, max_abs_sgs_rate),
+        }
+    )
+
+    # Quarantine every row of a ticker's batch as soon as one of its rows fails
+    batch_failures = checks.groupby([df[c] for c in BATCH_KEY], dropna=False).transform("any")
+    quarantined = batch_failures.any(axis=1)
+    failed_checks = batch_failures.apply(lambda row: ",".join(row.index[row]), axis=1)
+
+    for name, failed in checks.items():
+        if failed.any():
+            tickers = sorted(df.loc[failed, "ticker"].astype(str).unique())
+            print(f"Validation check {name} failed for {int(failed.sum())} rows: {tickers}")
+
+    gaps = find_business_day_gaps(df[~quarantined], max_gap_business_days)
+    if gaps:
+        print(f"Business-day gaps above {max_gap_business_days} days: {gaps}")
+
+    return (
+        df[~quarantined].reset_index(drop=True),
+        df[quarantined].assign(failed_checks=failed_checks[quarantined]).reset_index(drop=True),
+    )
+
+
+def _quarantine_keys(df: pd.DataFrame) -> pd.MultiIndex:
+    """
+    Build comparable (ticker, date, source, extracted_date) keys of a frame.
+    """
+    return pd.MultiIndex.from_arrays(
+        [
+            df["ticker"].astype(str),
+            pd.to_datetime(df["date"]),
+            df["source"],
+            pd.to_datetime(df["extracted_date"]),
+        ]
+    )
+
+
+def drop_quarantined_rows(df: pd.DataFrame, stored: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drop the rows of an extraction that are already in the quarantine table.
+
+    Args:
+        df: Quarantined rows as returned by validate_market_data
+        stored: Stored (ticker, date, source, extracted_date) rows of the quarantine
+
+    Returns:
+        pd.DataFrame: Rows not quarantined yet
+    """
+    if stored.empty:
+        return df
+    return df[~_quarantine_keys(df).isin(_quarantine_keys(stored))].reset_index(drop=True)
+
+
+def quarantine_market_data(
+    df: pd.DataFrame,
+    engine: Engine,
+    table_name: str = QUARANTINE_TABLE_NAME,
+    schema: str = "public",
+) -> int:
+    """
+    Append quarantined rows to the quarantine table for later inspection.
+
+    Rows of an extraction already quarantined (same natural key and extracted_date,
+    e.g. when an archived batch is replayed) are skipped, so the table keeps one row
+    per failed extraction of a point.
+
+    Args:
+        df: Quarantined rows as returned by validate_market_data
+        engine: SQLAlchemy Engine instance
+        table_name: Name of the quarantine table
+        schema: Database schema name (default: 'public')
+
+    Returns:
+        int: Number of rows quarantined
+
+    Raises:
+        ValueError: If the rows could not be written
+    """
+    if not df.empty and inspect(engine).has_table(table_name, schema=schema):
+        query = text(
+            f"""
+            SELECT ticker, date, source, extracted_date
+            FROM {schema}.{table_name}
+            WHERE ticker = ANY(:tickers) AND date BETWEEN :date_init AND :date_end
+            """
+        )
+        with engine.connect() as connection:
+            stored = pd.DataFrame(
+                connection.execute(
+                    query,
+                    {
+                        "tickers": df["ticker"].astype(str).unique().tolist(),
+                        "date_init": df["date"].min(),
+                        "date_end": df["date"].max(),
+                    },
+                ).fetchall(),
+                columns=QUARANTINE_KEY,
+            )
+        df = drop_quarantined_rows(df, stored)
+
+    if df.empty:
+        return 0
+
+    df = df.assign(quarantined_at=datetime.now())
+    if not write_dataframe_to_table(df, table_name, engine, schema=schema):
+        raise ValueError(f"Failed to quarantine {len(df)} rows into {schema}.{table_name}")
+
+    print(f"Quarantined {len(df)} rows into {schema}.{table_name}")
+    return len(df)
@@ -0,0 +1,122 @@
+"""
+DAG: Raw Market Data Maintenance
+
+This DAG runs on the first day of every month to keep the raw_market_data landing
+table small and cheap to scan.
+
+Steps:
+1. Migrate a legacy unpartitioned raw table into the month-partitioned layout,
+   keeping only the latest extraction of each (ticker, date, source)
+2. Create monthly partitions ahead of time
+3. Detach and drop partitions older than the retention window whose rows are
+   already captured in financial_s.fct_serie_tb
+
+Dropping a partition is a metadata-only operation, so retention needs neither bulk
+deletes nor vacuum.
+"""
+
+from datetime import date, timedelta
+
+from airflow.decorators import dag, task
+from airflow.utils.dates import days_ago
+
+# Constants
+RAW_TABLE_NAME = "raw_market_data"  # Raw table maintained by this DAG
+PARTITION_MONTHS_AHEAD = 3  # Months of empty partitions created ahead of time
+RAW_RETENTION_MONTHS = 24  # Most recent months always kept in the raw table
+
+default_args = {
+    "owner": "Astro",
+    "retries": 2,
+    "retry_delay": timedelta(minutes=3),
+}
+
+
+@dag(
+    default_args=default_args,
+    schedule_interval="0 3 1 * *",
+    dag_id="raw_market_data_maintenance",
+    start_date=days_ago(1),
+    tags=["financial_data", "maintenance"],
+    catchup=False,
+)
+def raw_market_data_maintenance():
+    """
+    DAG to keep the raw market data table partitioned and compact.
+    """
+
+    @task()
+    def migrate_raw_table() -> int:
+        """
+        Convert a legacy unpartitioned raw table into the month-partitioned layout.
+
+        Duplicates are removed while copying. Does nothing once the table is partitioned.
+
+        Returns:
+            int: Number of rows migrated
+        """
+        from libs.database import create_postgres_engine
+        from libs.raw_market_data import (
+            create_raw_market_data_table,
+            migrate_raw_market_data_to_partitioned,
+        )
+
+        engine = create_postgres_engine()
+        migrated = migrate_raw_market_data_to_partitioned(engine, table_name=RAW_TABLE_NAME)
+
+        # Create the table on a fresh database so the next steps have something to maintain
+        create_raw_market_data_table(engine, table_name=RAW_TABLE_NAME)
+        return migrated
+
+    @task()
+    def create_future_partitions(migrated: int) -> int:
+        """
+        Create the current and upcoming monthly partitions.
+
+        Args:
+            migrated (int): Rows migrated by the previous step (only used for ordering)
+
+        Returns:
+            int: Number of monthly partitions ensured
+        """
+        from dateutil.relativedelta import relativedelta
+
+        from libs.database import create_postgres_engine
+        from libs.raw_market_data import create_month_partitions
+
+        today = date.today()
+        return create_month_partitions(
+            create_postgres_engine(),
+            today,
+            today + relativedelta(months=PARTITION_MONTHS_AHEAD),
+            table_name=RAW_TABLE_NAME,
+        )
+
+    @task()
+    def drop_old_partitions(partitions: int) -> list:
+        """
+        Detach and drop raw partitions past retention that are captured in the fact table.
+
+        Args:
+            partitions (int): Partitions ensured by the previous step (only used for ordering)
+
+        Returns:
+            list: Names of the dropped partitions
+        """
+        from libs.database import create_postgres_engine
+        from libs.raw_market_data import drop_captured_partitions
+
+        return drop_captured_partitions(
+            create_postgres_engine(),
+            retention_months=RAW_RETENTION_MONTHS,
+            table_name=RAW_TABLE_NAME,
+        )
+
+    # DAG flow definition
+    migrated = migrate_raw_table()
+    partitions = create_future_partitions(migrated)
+    drop_old_partitions(partitions)
+
+
+# Instantiate the DAG
+raw_market_data_maintenance_dag = raw_market_data_maintenance()
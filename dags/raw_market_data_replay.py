@@ -0,0 +1,159 @@
+"""
+DAG: Raw Market Data Replay
+
+Repopulates raw_market_data from the bronze Parquet archive (see libs.archive), so
+the raw table and the warehouse can be rebuilt without calling Yahoo Finance or SGS.
+
+Steps:
+1. Create the raw table if not exists
+2. List the archived files, grouped by source and extraction month
+3. Validate every archived batch as it was validated when loaded, quarantine the
+   failures, and bulk load each group as an independent mapped task (last write wins,
+   so groups can be replayed in any order and a replay can be repeated safely)
+4. Update the raw_market_data dataset, which triggers the financial_data_transform
+   DAG, unless nothing was written
+
+Trigger with e.g. {"since": "2025-01-01", "sources": ["SGS"]} to replay part of the
+archive.
+"""
+
+from datetime import timedelta
+
+from airflow.decorators import dag, task
+from airflow.exceptions import AirflowSkipException
+from airflow.models.param import Param
+from airflow.utils.dates import days_ago
+
+from libs.datasets import RAW_MARKET_DATA_DATASET
+
+# Constants
+RAW_TABLE_NAME = "raw_market_data"  # Table repopulated from the archive
+MAX_PARALLEL_LOADS = 4  # Concurrent bulk loads into the raw table
+
+default_args = {
+    "owner": "Astro",
+    "retries": 2,
+    "retry_delay": timedelta(minutes=3),
+}
+
+
+@dag(
+    default_args=default_args,
+    schedule=None,
+    dag_id="raw_market_data_replay",
+    start_date=days_ago(1),
+    tags=["financial_data", "replay"],
+    catchup=False,
+    params={
+        "since": Param(None, type=["null", "string"], description="First extraction date"),
+        "sources": Param([], type="array", description="Sources to replay, all by default"),
+    },
+)
+def raw_market_data_replay():
+    """
+    DAG to rebuild the raw table from the bronze archive.
+    """
+
+    @task()
+    def prepare_raw_table() -> bool:
+        """
+        Create the partitioned raw table if it doesn't exist.
+
+        Returns:
+            bool: True if the table is ready
+        """
+        from libs.database import create_postgres_engine
+        from libs.raw_market_data import create_raw_market_data_table
+
+        return create_raw_market_data_table(create_postgres_engine(), table_name=RAW_TABLE_NAME)
+
+    @task()
+    def list_archive_chunks(table_ready: bool, params: dict = None) -> list:
+        """
+        List the archived files to replay, grouped by source and extraction month.
+
+        Args:
+            table_ready (bool): Flag from prepare_raw_table (only used for ordering)
+            params (dict): DAG run params
+
+        Returns:
+            list: Chunks with 'source', 'month' and 'files'
+
+        Raises:
+            ValueError: If the archive holds no matching files
+        """
+        from libs.archive import list_archive_chunks as list_chunks
+
+        chunks = list_chunks(since=params["since"], sources=params["sources"] or None)
+        if not chunks:
+            raise ValueError("No archived files match the given params")
+        return chunks
+
+    @task(max_active_tis_per_dag=MAX_PARALLEL_LOADS)
+    def replay_chunk(chunk: dict) -> dict:
+        """
+        Validate one group of archived files and bulk load it into the raw table.
+
+        Rows quarantined when they were first loaded fail validation again, so they
+        are not replayed. They are already in the quarantine table with the same
+        extracted_date, so they are not quarantined a second time either.
+
+        Args:
+            chunk (dict): Chunk with 'source', 'month' and 'files'
+
+        Returns:
+            dict: 'rows_written' and 'loaded_since' (earliest replayed date)
+        """
+        from libs.archive import read_validated_archive_files
+        from libs.database import create_postgres_engine
+        from libs.raw_market_data import upsert_market_data
+        from libs.validation import quarantine_market_data
+
+        engine = create_postgres_engine()
+        df, quarantined_df = read_validated_archive_files(chunk["files"])
+        print(f"Replaying {len(df)} {chunk['source']} rows extracted in {chunk['month']}")
+        quarantine_market_data(quarantined_df, engine)
+
+        counts = upsert_market_data(df, engine, table_name=RAW_TABLE_NAME)
+        return {
+            "rows_written": counts["inserted"] + counts["updated"],
+            "loaded_since": None if df.empty else df["date"].min().isoformat(),
+        }
+
+    @task(trigger_rule="none_failed", outlets=[RAW_MARKET_DATA_DATASET])
+    def summarize_replay(summaries: list, outlet_events=None) -> dict:
+        """
+        Report the number of rows written and update the dataset.
+
+        Args:
+            summaries (list): Load summaries of the chunks
+            outlet_events: Dataset event accessor from the task context
+
+        Returns:
+            dict: 'rows_written' and 'loaded_since' (earliest replayed date), so the
+                transform DAG restages the replayed dates even when their extractions
+                are older than the staged ones
+
+        Raises:
+            AirflowSkipException: If the replay wrote no rows
+        """
+        from libs.datasets import merge_load_summaries
+
+        merged = merge_load_summaries([s for s in summaries or [] if s["rows_written"]])
+        print(f"Replay wrote {merged['rows_written']} rows into {RAW_TABLE_NAME}")
+        if not merged["rows_written"]:
+            raise AirflowSkipException("No rows replayed, not updating the dataset")
+
+        load_summary = {k: merged[k] for k in ("rows_written", "loaded_since")}
+        outlet_events[RAW_MARKET_DATA_DATASET].extra = load_summary
+        return load_summary
+
+    # DAG flow definition
+    chunks = list_archive_chunks(prepare_raw_table())
+
+    # One mapped bulk load per chunk, then notify the transform DAG
+    summarize_replay(replay_chunk.expand(chunk=chunks))
+
+
+# Instantiate the DAG
+raw_market_data_replay_dag = raw_market_data_replay()
@@ -1,8 +1,8 @@
-{% macro create_year_month_partitions(table_relation, partition_column, months_ahead=12) %}
+{% macro create_year_month_partitions(table_relation, partition_column, months_ahead=12, start_date='1990-01-01') %}
   {%- set create_partitions %}
   do $$
   declare
-    start_date date := '1990-01-01'::date;
+    start_date date := date_trunc('month', '{{ start_date }}'::date);
     end_date date := date_trunc('month', current_date) + interval '{{ months_ahead }} month';
     interval_step interval := interval '1 month';
     current_date_mod date := start_date;
@@ -29,5 +29,5 @@
   {% endset %}
 
   {% do run_query(create_partitions) %}
-  {% do log("Created partitions for " ~ table_relation ~ " from 1990-01-01 to " ~ months_ahead ~ " months ahead", info=true) %}
+  {% do log("Created partitions for " ~ table_relation ~ " from " ~ start_date ~ " to " ~ months_ahead ~ " months ahead", info=true) %}
 {% endmacro %}
@@ -0,0 +1,78 @@
+{% macro create_index(relation, index_name, columns, include=[], method='btree') %}
+  {#- Post-hook SQL creating an index on the model if it doesn't exist yet.
+      A full refresh swaps in a new table while the replaced one still holds the
+      index name, so an index found on another table is dropped and recreated. -#}
+  DO $$
+  BEGIN
+      IF NOT EXISTS (
+          SELECT 1 FROM pg_indexes
+          WHERE schemaname = '{{ relation.schema }}'
+            AND tablename = '{{ relation.identifier }}'
+            AND indexname = '{{ index_name }}'
+      ) THEN
+          DROP INDEX IF EXISTS {{ relation.schema }}.{{ index_name }};
+          CREATE INDEX {{ index_name }} ON {{ relation }}
+          USING {{ method }} ({{ columns | join(', ') }})
+          {%- if include %} INCLUDE ({{ include | join(', ') }}){% endif %};
+      END IF;
+  END$$;
+{% endmacro %}
+
+
+{% macro check_index_only_scan(ticker_nm='CDI', days=365) %}
+  {#- dbt run-operation check_index_only_scan --args '{ticker_nm: CDI, days: 365}'
+      Explains the profitability query served by the API and fails unless every
+      srv_serie_tb partition it reads is an index-only scan and partitions outside the
+      date range are pruned. -#}
+  {%- set srv = ref('srv_serie_tb') -%}
+
+  {% set explain %}
+  EXPLAIN (FORMAT JSON)
+  SELECT
+      t.ticker_nm,
+      s.ticker_date,
+      s.month,
+      s.year,
+      s.profitability,
+      t.annual_tax
+  FROM {{ ref('dim_ticker_tb') }} t
+  JOIN {{ srv }} s ON s.ticker_type_id = t.ticker_type_id
+  WHERE t.ticker_nm = '{{ ticker_nm }}'
+    AND s.ticker_date BETWEEN current_date - {{ days }} AND current_date
+  ORDER BY s.ticker_date
+  {% endset %}
+
+  {% set plan = fromjson(run_query(explain).rows[0][0])[0]['Plan'] %}
+  {% set scans = _plan_scans(plan, srv.identifier) %}
+  {% do log(tojson(plan), info=true) %}
+
+  {% set other_scans = scans | reject('equalto', 'Index Only Scan') | list %}
+  {% if not scans or other_scans %}
+    {{ exceptions.raise_compiler_error(
+        "Expected only Index Only Scans on " ~ srv ~ ", got " ~ scans
+        ~ "; VACUUM (ANALYZE) its partitions and check the plan above"
+    ) }}
+  {% endif %}
+
+  {% set max_partitions = (days / 28) | round(0, 'ceil') | int + 1 %}
+  {% if scans | length > max_partitions %}
+    {{ exceptions.raise_compiler_error(
+        "Expected at most " ~ max_partitions ~ " partitions of " ~ srv ~ " for "
+        ~ days ~ " days, the plan reads " ~ scans | length
+    ) }}
+  {% endif %}
+  {% do log("Index Only Scan on " ~ scans | length ~ " partitions of " ~ srv, info=true) %}
+{% endmacro %}
+
+
+{% macro _plan_scans(node, identifier) %}
+  {#- Node types of the plan nodes reading `identifier` or one of its partitions -#}
+  {% set scans = [] %}
+  {% if node.get('Relation Name', '').startswith(identifier) %}
+    {% do scans.append(node['Node Type']) %}
+  {% endif %}
+  {% for child in node.get('Plans', []) %}
+    {% do scans.extend(_plan_scans(child, identifier)) %}
+  {% endfor %}
+  {{ return(scans) }}
+{% endmacro %}
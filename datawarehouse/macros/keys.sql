@@ -0,0 +1,125 @@
+{% macro next_surrogate_key(relation, key_column, order_by) %}
+  {#- Compact integer key for new dimension rows: numbered after the largest key
+      already stored, so keys of existing rows never change between runs. -#}
+  {%- if is_incremental() -%}
+    (SELECT COALESCE(MAX({{ key_column }}), 0) FROM {{ relation }})
+      + ROW_NUMBER() OVER (ORDER BY {{ order_by }})
+  {%- else -%}
+    ROW_NUMBER() OVER (ORDER BY {{ order_by }})
+  {%- endif -%}
+{% endmacro %}
+
+
+{% macro sync_identity(relation, key_column) %}
+  {#- Post-hook SQL turning the key into an identity column (so rows created outside
+      dbt, e.g. by the API, get the next key) and moving its sequence past the keys
+      inserted by dbt. -#}
+  DO $$
+  BEGIN
+      IF NOT EXISTS (
+          SELECT 1 FROM information_schema.columns
+          WHERE table_schema = '{{ relation.schema }}'
+            AND table_name = '{{ relation.identifier }}'
+            AND column_name = '{{ key_column }}'
+            AND is_identity = 'YES'
+      ) THEN
+          ALTER TABLE {{ relation }} ALTER COLUMN {{ key_column }} SET NOT NULL;
+          ALTER TABLE {{ relation }} ALTER COLUMN {{ key_column }}
+          ADD GENERATED BY DEFAULT AS IDENTITY;
+      END IF;
+
+      PERFORM setval(
+          pg_get_serial_sequence('{{ relation.schema }}.{{ relation.identifier }}', '{{ key_column }}'),
+          (SELECT COALESCE(MAX({{ key_column }}), 0) + 1 FROM {{ relation }}),
+          false
+      );
+  END$$;
+{% endmacro %}
+
+
+{% macro migrate_md5_keys() %}
+  {#- Run-operation moving a warehouse built with the md5 text keys to the integer keys
+      in place, numbering them as a full build would. A full refresh would rebuild the
+      tables from raw_market_data and lose the history its retention already dropped. -#}
+  {%- set ticker_type = ref('dim_ticker_type_tb') -%}
+  {%- set ticker = ref('dim_ticker_tb') -%}
+  {%- set key_type = run_query(
+      "select data_type from information_schema.columns"
+      ~ " where table_schema = '" ~ ticker_type.schema ~ "'"
+      ~ " and table_name = '" ~ ticker_type.identifier ~ "'"
+      ~ " and column_name = 'ticker_type_id'"
+  ) -%}
+  {% if key_type.rows | length == 0 or key_type.rows[0][0] != 'text' %}
+    {{ log("dim_ticker_type_tb has no md5 keys, nothing to migrate", info=True) }}
+    {{ return(none) }}
+  {% endif %}
+
+  {#-- Tables holding ticker_type_id, with the foreign key their post-hook creates --#}
+  {%- set referencing = [] -%}
+  {%- for model, fk_name in [
+      ('dim_ticker_tb', 'dim_ticker_fk_type'),
+      ('fct_serie_tb', 'fct_serie_fk_ticker_type'),
+      ('fct_serie_monthly_tb', 'fct_serie_monthly_fk_ticker_type'),
+      ('fct_serie_yearly_tb', 'fct_serie_yearly_fk_ticker_type'),
+      ('srv_serie_tb', none),
+  ] -%}
+    {%- set relation = load_relation(ref(model)) -%}
+    {%- if relation is not none -%}
+      {%- do referencing.append((relation, fk_name)) -%}
+    {%- endif -%}
+  {%- endfor -%}
+
+  {% set sql %}
+    CREATE TEMP TABLE ticker_type_keys ON COMMIT DROP AS
+    SELECT
+        ticker_type_id AS md5_key,
+        ROW_NUMBER() OVER (ORDER BY ticker_type_nm)::text AS new_key
+    FROM {{ ticker_type }};
+
+    CREATE TEMP TABLE ticker_keys ON COMMIT DROP AS
+    SELECT
+        ticker_id AS md5_key,
+        ROW_NUMBER() OVER (ORDER BY ticker_nm)::text AS new_key
+    FROM {{ ticker }};
+
+    {% for relation, fk_name in referencing if fk_name %}
+    ALTER TABLE {{ relation }} DROP CONSTRAINT IF EXISTS {{ fk_name }};
+    {% endfor %}
+
+    -- Numbered keys are swapped in as text first, so the primary keys and indexes
+    -- survive and only the type change below rewrites each table
+    UPDATE {{ ticker_type }} t SET ticker_type_id = k.new_key
+    FROM ticker_type_keys k WHERE t.ticker_type_id = k.md5_key;
+
+    UPDATE {{ ticker }} t SET ticker_id = k.new_key
+    FROM ticker_keys k WHERE t.ticker_id = k.md5_key;
+
+    {% for relation, fk_name in referencing %}
+    UPDATE {{ relation }} t SET ticker_type_id = k.new_key
+    FROM ticker_type_keys k WHERE t.ticker_type_id = k.md5_key;
+    {% endfor %}
+
+    ALTER TABLE {{ ticker_type }}
+        ALTER COLUMN ticker_type_id TYPE smallint USING ticker_type_id::smallint;
+    ALTER TABLE {{ ticker }}
+        ALTER COLUMN ticker_id TYPE integer USING ticker_id::integer;
+
+    {% for relation, fk_name in referencing %}
+    ALTER TABLE {{ relation }}
+        ALTER COLUMN ticker_type_id TYPE smallint USING ticker_type_id::smallint
+        {%- if relation.identifier == 'fct_serie_tb' %},
+        DROP COLUMN IF EXISTS serie_id,
+        ALTER COLUMN profitability TYPE double precision
+        {%- endif %};
+    {% if fk_name %}
+    ALTER TABLE {{ relation }} ADD CONSTRAINT {{ fk_name }}
+    FOREIGN KEY (ticker_type_id) REFERENCES {{ ticker_type }} (ticker_type_id);
+    {% endif %}
+    {% endfor %}
+  {% endset %}
+
+  {% do run_query(sql) %}
+  {% do adapter.commit() %}
+  {{ log("Migrated the md5 keys of " ~ ticker_type ~ ", " ~ ticker ~ " and "
+         ~ (referencing | length) ~ " referencing tables", info=True) }}
+{% endmacro %}
@@ -0,0 +1,122 @@
+{% materialization partitioned_incremental, adapter='postgres' %}
+  {#- Incremental model stored as a table range-partitioned by month on `partition_by`.
+      Rows of the model replace the target rows with the same unique key (delete+insert),
+      and both statements are bounded by the model's date range, so the planner only
+      touches the partitions being rebuilt. Partitions are created from the earliest
+      date in the table up to `partition_months_ahead` months ahead on every run.
+      A table built by the plain incremental materialization is migrated in place. -#}
+
+  {%- set partition_by = config.require('partition_by') -%}
+  {%- set unique_key = config.require('unique_key') -%}
+  {%- set months_ahead = config.get('partition_months_ahead', 12) -%}
+
+  {%- set existing_relation = load_cached_relation(this) -%}
+  {%- set target_relation = this.incorporate(type='table') -%}
+  {%- set temp_relation = make_temp_relation(target_relation) -%}
+  {%- set backup_relation = make_backup_relation(target_relation, 'table') -%}
+  {{ drop_relation_if_exists(load_cached_relation(backup_relation)) }}
+
+  {{ run_hooks(pre_hooks, inside_transaction=False) }}
+
+  -- `BEGIN` happens here:
+  {{ run_hooks(pre_hooks, inside_transaction=True) }}
+
+  {% do run_query(get_create_table_as_sql(True, temp_relation, sql)) %}
+  {%- set data_start, data_end = run_query(
+      "select min(" ~ partition_by ~ ")::text, max(" ~ partition_by ~ ")::text from "
+      ~ temp_relation
+  ).rows[0] -%}
+  {%- set partitions_start = data_start -%}
+
+  {% set copy_from = none %}
+  {% if existing_relation is not none and should_full_refresh() %}
+    {% do adapter.drop_relation(existing_relation) %}
+    {% set existing_relation = none %}
+  {% elif existing_relation is not none and not is_partitioned_table(existing_relation) %}
+    {#-- Keep the rows of the plain table, the model only selected its incremental window --#}
+    {% do adapter.rename_relation(existing_relation, backup_relation) %}
+    {% set copy_from = backup_relation %}
+    {% set existing_relation = none %}
+  {% endif %}
+
+  {% if existing_relation is none %}
+    {% call statement('create_partitioned') %}
+      create table {{ target_relation }} (like {{ temp_relation }})
+      partition by range ({{ partition_by }})
+    {% endcall %}
+  {% endif %}
+
+  {% if copy_from is not none %}
+    {%- set copy_start = run_query(
+        "select min(" ~ partition_by ~ ")::text from " ~ copy_from
+    ).rows[0][0] -%}
+    {% if copy_start and (not partitions_start or copy_start < partitions_start) %}
+      {% set partitions_start = copy_start %}
+    {% endif %}
+  {% endif %}
+
+  {% if partitions_start %}
+    {% do create_year_month_partitions(
+        target_relation, partition_by, months_ahead, partitions_start
+    ) %}
+  {% endif %}
+
+  {% if copy_from is not none %}
+    {% call statement('copy_existing') %}
+      insert into {{ target_relation }} select * from {{ copy_from }}
+    {% endcall %}
+    {% do adapter.drop_relation(copy_from) %}
+  {% endif %}
+
+  {% set dest_columns = adapter.get_columns_in_relation(temp_relation) %}
+  {#-- Literal bounds let the planner prune the delete to the partitions rebuilt --#}
+  {% set predicates = none %}
+  {% if data_start %}
+    {% set predicates = [
+        target_relation ~ "." ~ partition_by
+        ~ " between '" ~ data_start ~ "' and '" ~ data_end ~ "'"
+    ] %}
+  {% endif %}
+
+  {% call statement("main") %}
+    {{ get_delete_insert_merge_sql(target_relation, temp_relation, unique_key, dest_columns, predicates) }}
+  {% endcall %}
+
+  {% do persist_docs(target_relation, model) %}
+
+  {{ run_hooks(post_hooks, inside_transaction=True) }}
+
+  -- `COMMIT` happens here
+  {% do adapter.commit() %}
+
+  {{ run_hooks(post_hooks, inside_transaction=False) }}
+
+  {{ return({'relations': [target_relation]}) }}
+
+{%- endmaterialization %}
+
+
+{% macro is_partitioned_table(relation) %}
+  {%- set result = run_query(
+      "select exists (select 1 from pg_partitioned_table pt"
+      ~ " join pg_class c on c.oid = pt.partrelid"
+      ~ " join pg_namespace n on n.oid = c.relnamespace"
+      ~ " where c.relname = '" ~ relation.identifier ~ "'"
+      ~ " and n.nspname = '" ~ relation.schema ~ "')"
+  ) -%}
+  {{ return(result.rows[0][0]) }}
+{% endmacro %}
+
+
+{% macro is_incremental() %}
+  {#- dbt's is_incremental(), also true for partitioned_incremental models -#}
+  {% if not execute %}
+    {{ return(False) }}
+  {% else %}
+    {% set relation = adapter.get_relation(this.database, this.schema, this.table) %}
+    {{ return(relation is not none
+              and relation.type == 'table'
+              and model.config.materialized in ['incremental', 'partitioned_incremental']
+              and not should_full_refresh()) }}
+  {% endif %}
+{% endmacro %}
@@ -0,0 +1,109 @@
+-- models/marts/financial/aggregates/fct_serie_monthly_tb.sql
+{{
+  config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['ticker_type_id', 'period_start'],
+    post_hook=[
+      """
+      DO $$
+      BEGIN
+        IF NOT EXISTS (
+          SELECT 1 FROM pg_constraint WHERE conname = 'fct_serie_monthly_pk'
+        ) THEN
+          ALTER TABLE {{ this }} ADD CONSTRAINT fct_serie_monthly_pk
+          PRIMARY KEY (ticker_type_id, period_start);
+        END IF;
+
+        IF NOT EXISTS (
+          SELECT 1 FROM pg_constraint WHERE conname = 'fct_serie_monthly_fk_ticker_type'
+        ) THEN
+          ALTER TABLE {{ this }} ADD CONSTRAINT fct_serie_monthly_fk_ticker_type
+          FOREIGN KEY (ticker_type_id)
+          REFERENCES {{ ref('dim_ticker_type_tb') }} (ticker_type_id);
+        END IF;
+      END$$;
+      """
+    ]
+  )
+}}
+
+WITH
+{% if is_incremental() and not env_var('DBT_RAW_START_DATE', '') %}
+-- Reopen each ticker type from the month its fact lookback window starts in, so
+-- revised daily values are compounded again; the last month is always reopened
+rebuild_from AS (
+    SELECT
+        ticker_type_id,
+        date_trunc(
+            'month', MAX(period_end_date) - {{ var('fct_serie_lookback_days') }}
+        )::date AS period_start
+    FROM {{ this }}
+    GROUP BY ticker_type_id
+),
+{% endif %}
+
+daily AS (
+    SELECT
+        f.ticker_type_id,
+        date_trunc('month', f.ticker_date)::date AS period_start,
+        f.ticker_date,
+        f.profitability
+    FROM {{ ref('fct_serie_tb') }} f
+    {% if is_incremental() and env_var('DBT_RAW_START_DATE', '') %}
+    -- Only reopen the months touched by the load
+    WHERE f.ticker_date >= date_trunc('month', '{{ env_var("DBT_RAW_START_DATE") }}'::date)
+    {% elif is_incremental() %}
+    LEFT JOIN rebuild_from r
+        ON r.ticker_type_id = f.ticker_type_id
+    WHERE r.period_start IS NULL
+       OR f.ticker_date >= r.period_start
+    {% endif %}
+),
+
+periods AS (
+    SELECT
+        ticker_type_id,
+        period_start,
+        MAX(ticker_date) AS period_end_date,
+        COUNT(*)::smallint AS trading_days,
+        EXP(SUM(LN(1 + profitability))) - 1 AS period_return
+    FROM daily
+    GROUP BY ticker_type_id, period_start
+),
+
+anchors AS (
+    -- Index at the end of the last month kept, which the reopened months compound on
+    {% if is_incremental() %}
+    SELECT DISTINCT ON (m.ticker_type_id)
+        m.ticker_type_id,
+        m.cumulative_index
+    FROM {{ this }} m
+    INNER JOIN (
+        SELECT ticker_type_id, MIN(period_start) AS period_start
+        FROM periods
+        GROUP BY ticker_type_id
+    ) p
+        ON p.ticker_type_id = m.ticker_type_id
+       AND m.period_start < p.period_start
+    ORDER BY m.ticker_type_id, m.period_start DESC
+    {% else %}
+    SELECT NULL::smallint AS ticker_type_id, NULL::double precision AS cumulative_index
+    WHERE FALSE
+    {% endif %}
+)
+
+SELECT
+    p.ticker_type_id,
+    p.period_start,
+    p.period_end_date,
+    p.trading_days,
+    p.period_return::double precision AS period_return,
+    (
+        COALESCE(a.cumulative_index, 1) * EXP(SUM(LN(1 + p.period_return)) OVER (
+            PARTITION BY p.ticker_type_id ORDER BY p.period_start
+        ))
+    )::double precision AS cumulative_index
+FROM periods p
+LEFT JOIN anchors a
+    ON a.ticker_type_id = p.ticker_type_id
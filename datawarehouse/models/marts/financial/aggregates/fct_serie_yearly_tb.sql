@@ -0,0 +1,76 @@
+-- models/marts/financial/aggregates/fct_serie_yearly_tb.sql
+{{
+  config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['ticker_type_id', 'period_start'],
+    post_hook=[
+      """
+      DO $$
+      BEGIN
+        IF NOT EXISTS (
+          SELECT 1 FROM pg_constraint WHERE conname = 'fct_serie_yearly_pk'
+        ) THEN
+          ALTER TABLE {{ this }} ADD CONSTRAINT fct_serie_yearly_pk
+          PRIMARY KEY (ticker_type_id, period_start);
+        END IF;
+
+        IF NOT EXISTS (
+          SELECT 1 FROM pg_constraint WHERE conname = 'fct_serie_yearly_fk_ticker_type'
+        ) THEN
+          ALTER TABLE {{ this }} ADD CONSTRAINT fct_serie_yearly_fk_ticker_type
+          FOREIGN KEY (ticker_type_id)
+          REFERENCES {{ ref('dim_ticker_type_tb') }} (ticker_type_id);
+        END IF;
+      END$$;
+      """
+    ]
+  )
+}}
+
+WITH
+{% if is_incremental() and not env_var('DBT_RAW_START_DATE', '') %}
+-- Reopen each ticker type from the year its fact lookback window starts in
+rebuild_from AS (
+    SELECT
+        ticker_type_id,
+        date_trunc(
+            'year', MAX(period_end_date) - {{ var('fct_serie_lookback_days') }}
+        )::date AS period_start
+    FROM {{ this }}
+    GROUP BY ticker_type_id
+),
+{% endif %}
+
+months AS (
+    SELECT
+        m.ticker_type_id,
+        date_trunc('year', m.period_start)::date AS period_start,
+        m.period_start AS month_start,
+        m.period_end_date,
+        m.trading_days,
+        m.period_return,
+        m.cumulative_index
+    FROM {{ ref('fct_serie_monthly_tb') }} m
+    {% if is_incremental() and env_var('DBT_RAW_START_DATE', '') %}
+    -- Only reopen the years touched by the load
+    WHERE m.period_start >= date_trunc('year', '{{ env_var("DBT_RAW_START_DATE") }}'::date)
+    {% elif is_incremental() %}
+    LEFT JOIN rebuild_from r
+        ON r.ticker_type_id = m.ticker_type_id
+    WHERE r.period_start IS NULL
+       OR m.period_start >= r.period_start
+    {% endif %}
+)
+
+-- Years compound their months; the index at the end of a year is the one of its
+-- last month, so no anchor is needed
+SELECT
+    ticker_type_id,
+    period_start,
+    MAX(period_end_date) AS period_end_date,
+    SUM(trading_days)::smallint AS trading_days,
+    (EXP(SUM(LN(1 + period_return))) - 1)::double precision AS period_return,
+    (ARRAY_AGG(cumulative_index ORDER BY month_start DESC))[1] AS cumulative_index
+FROM months
+GROUP BY ticker_type_id, period_start
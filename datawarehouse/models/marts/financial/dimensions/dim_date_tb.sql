@@ -20,11 +20,17 @@
 
 WITH distinct_dates AS (
     SELECT DISTINCT
-        ticker_date
-    FROM {{ ref('vw_stg_raw_market_data') }}
-    WHERE ticker_date IS NOT NULL
+        s.ticker_date
+    FROM {{ ref('stg_raw_market_data') }} s
+    WHERE s.ticker_date IS NOT NULL
+    {% if is_incremental() and env_var('DBT_RAW_START_DATE', '') %}
+      AND s.ticker_date >= '{{ env_var("DBT_RAW_START_DATE") }}'::date
+    {% endif %}
     {% if is_incremental() %}
-      AND ticker_date > (SELECT MAX(ticker_date) FROM {{ this }})
+      -- Anti-join instead of a max-date filter so backfilled history gets its dates too
+      AND NOT EXISTS (
+          SELECT 1 FROM {{ this }} d WHERE d.ticker_date = s.ticker_date
+      )
     {% endif %}
 )
 
@@ -24,30 +24,35 @@
               CREATE INDEX ON {{ this }} (ticker_nm);
           END IF;
       END$$;
-      """
+      """,
+      "{{ create_index(this, 'dim_ticker_type_id_idx', ['ticker_type_id']) }}",
+      "{{ sync_identity(this, 'ticker_id') }}"
     ]
   )
 }}
 
-WITH ticker_with_type AS (
-    SELECT DISTINCT
-        CASE
-            WHEN t.ticker_type_nm = '^BVSP' THEN 'Ibovespa'
-            WHEN t.ticker_type_nm = '12' THEN 'CDI'
-        END AS ticker_nm,
-        t.ticker_type_id
-    FROM {{ ref('vw_stg_raw_market_data') }} s
-    INNER JOIN {{ ref('dim_ticker_type_tb') }} t
-        ON s.ticker_type_nm = t.ticker_type_nm
-    WHERE s.ticker_type_nm IS NOT NULL
+-- Names come from the ticker_mapping seed, so onboarding a series needs no SQL change;
+-- ticker types missing from the seed are named after the raw ticker
+WITH new_ticker_types AS (
+    SELECT
+        COALESCE(m.ticker_nm, tt.ticker_type_nm) AS ticker_nm,
+        tt.ticker_type_id
+    FROM {{ ref('dim_ticker_type_tb') }} tt
+    LEFT JOIN {{ ref('ticker_mapping') }} m
+        ON m.ticker_type_nm = tt.ticker_type_nm
+    {% if is_incremental() %}
+    -- Anti-join on the indexed type key: only ticker types without a ticker yet
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM {{ this }} d
+        WHERE d.ticker_type_id = tt.ticker_type_id
+    )
+    {% endif %}
 )
 
 SELECT
-    {{ dbt_utils.generate_surrogate_key(['ticker_nm']) }} AS ticker_id,
+    ({{ next_surrogate_key(this, 'ticker_id', 'ticker_nm') }})::integer AS ticker_id,
     ticker_nm,
     ticker_type_id,
     NULL::numeric AS annual_tax
-FROM ticker_with_type
-{% if is_incremental() %}
-WHERE ticker_nm NOT IN (SELECT ticker_nm FROM {{ this }})
-{% endif %}
+FROM new_ticker_types
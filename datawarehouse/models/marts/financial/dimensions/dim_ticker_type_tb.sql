@@ -13,7 +13,8 @@
               CREATE INDEX ON {{ this }} (ticker_type_nm);
           END IF;
       END$$;
-      """
+      """,
+      "{{ sync_identity(this, 'ticker_type_id') }}"
     ]
 ) }}
 
@@ -22,17 +23,24 @@ WITH distinct_ticker_types AS (
     SELECT DISTINCT
         ticker_type_nm,
         is_src
-    FROM {{ ref('vw_stg_raw_market_data') }}
+    FROM {{ ref('stg_raw_market_data') }} s
     WHERE ticker_type_nm IS NOT NULL
-    
     {% if is_incremental() %}
-    -- Only process ticker types not already in our table
-    AND ticker_type_nm NOT IN (SELECT ticker_type_nm FROM {{ this }})
+    {% if env_var('DBT_RAW_START_DATE', '') %}
+    -- New ticker types can only come with the rows just loaded
+    AND ticker_date >= '{{ env_var("DBT_RAW_START_DATE") }}'::date
+    {% endif %}
+    -- Anti-join on the indexed name: only ticker types not already in our table
+    AND NOT EXISTS (
+        SELECT 1
+        FROM {{ this }} d
+        WHERE d.ticker_type_nm = s.ticker_type_nm
+    )
     {% endif %}
 )
 
 SELECT
-    {{ dbt_utils.generate_surrogate_key(['ticker_type_nm']) }} AS ticker_type_id,
+    ({{ next_surrogate_key(this, 'ticker_type_id', 'ticker_type_nm') }})::smallint AS ticker_type_id,
     ticker_type_nm,
     is_src
 FROM distinct_ticker_types
\ No newline at end of file
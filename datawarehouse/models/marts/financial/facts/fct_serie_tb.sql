@@ -1,16 +1,20 @@
 -- models/marts/financial/facts/fct_serie_tb.sql
 {{
   config(
-    materialized='incremental',
+    materialized='partitioned_incremental',
+    partition_by='ticker_date',
     unique_key=['ticker_date', 'ticker_type_id'],
     post_hook=[
       """
       DO $$
       BEGIN
+        -- Keyed by ticker and date (the partition key must be part of the primary key);
+        -- profitability is included so the API query is an index-only scan
         IF NOT EXISTS (
           SELECT 1 FROM pg_constraint WHERE conname = 'fct_serie_pk'
         ) THEN
-          ALTER TABLE {{ this }} ADD CONSTRAINT fct_serie_pk PRIMARY KEY (serie_id);
+          ALTER TABLE {{ this }} ADD CONSTRAINT fct_serie_pk
+          PRIMARY KEY (ticker_type_id, ticker_date) INCLUDE (profitability);
         END IF;
 
         IF NOT EXISTS (
@@ -28,19 +32,15 @@
           FOREIGN KEY (ticker_date)
           REFERENCES {{ ref('dim_date_tb') }} (ticker_date);
         END IF;
-
-        IF NOT EXISTS (
-          SELECT 1 FROM pg_constraint WHERE conname = 'fct_serie_unique_ticker_date_type'
-        ) THEN
-          ALTER TABLE {{ this }} ADD CONSTRAINT fct_serie_unique_ticker_date_type
-          UNIQUE (ticker_date, ticker_type_id);
-        END IF;
       END$$;
-      """
+      """,
+      "{{ create_index(this, 'fct_serie_date_brin', ['ticker_date'], method='brin') }}"
     ]
   )
 }}
 
+{% set revised_from = fromjson(env_var('DBT_REVISED_FROM', 'null')) %}
+
 WITH ticker_mapping AS (
     SELECT
         t.ticker_type_id,
@@ -48,27 +48,71 @@ WITH ticker_mapping AS (
     FROM {{ ref('dim_ticker_type_tb') }} t
 ),
 
+{% if is_incremental() %}
+-- High-water mark per ticker type, moved back by a lookback window so that values
+-- revised by the sources after publication are reprocessed
+watermarks AS (
+    SELECT
+        ticker_type_id,
+        MAX(ticker_date) - {{ var('fct_serie_lookback_days') }} AS window_start
+    FROM {{ this }}
+    GROUP BY ticker_type_id
+),
+{% endif %}
+
+{% if is_incremental() and revised_from is not none %}
+-- Earliest revised date of each ticker whose stored values the load changed
+revisions AS (
+    {% if revised_from %}
+    SELECT ticker_type_nm, revised_from::date AS revised_from
+    FROM (VALUES
+        {% for ticker, day in revised_from | dictsort %}
+        ('{{ ticker }}', '{{ day }}'){{ "," if not loop.last }}
+        {% endfor %}
+    ) AS r (ticker_type_nm, revised_from)
+    {% else %}
+    SELECT NULL::text AS ticker_type_nm, NULL::date AS revised_from
+    WHERE FALSE
+    {% endif %}
+),
+{% endif %}
+
 series_data AS (
     SELECT
         s.ticker_date,
         tm.ticker_type_id,
         s.profitability
-    FROM {{ ref('vw_stg_raw_market_data') }} s
+    FROM {{ ref('stg_raw_market_data') }} s
     INNER JOIN ticker_mapping tm
         ON s.ticker_type_nm = tm.ticker_type_nm
 
-    {% if is_incremental() %}
-    WHERE NOT EXISTS (
-        SELECT 1 FROM {{ this }}
-        WHERE {{ this }}.ticker_date = s.ticker_date
-          AND {{ this }}.ticker_type_id = tm.ticker_type_id
-    )
+    {% if is_incremental() and revised_from is not none %}
+    -- The load reported its revisions: new rows fall in each ticker type's window, so
+    -- only reach further back for the ticker types whose stored values were revised
+    LEFT JOIN watermarks w
+        ON w.ticker_type_id = tm.ticker_type_id
+    LEFT JOIN revisions r
+        ON r.ticker_type_nm = s.ticker_type_nm
+    WHERE w.window_start IS NULL
+       OR s.ticker_date >= LEAST(w.window_start, r.revised_from)
+    {% elif is_incremental() and env_var('DBT_RAW_START_DATE', '') %}
+    -- Only rebuild the dates touched by the load
+    WHERE s.ticker_date >= '{{ env_var("DBT_RAW_START_DATE") }}'::date
+    {% elif is_incremental() %}
+    -- Without a load bound, only read each ticker type from its window onwards;
+    -- ticker types without rows yet are read in full
+    LEFT JOIN watermarks w
+        ON w.ticker_type_id = tm.ticker_type_id
+    WHERE w.window_start IS NULL
+       OR s.ticker_date >= w.window_start
     {% endif %}
 )
 
+-- Incremental runs replace the rows of the window (delete+insert on the unique key)
+-- in the monthly partitions it spans, so their cost follows the size of the window
+-- rather than of the table
 SELECT
-    {{ dbt_utils.generate_surrogate_key(['ticker_date', 'ticker_type_id']) }} AS serie_id,
     ticker_date,
     ticker_type_id,
-    profitability::numeric AS profitability
-FROM series_data
\ No newline at end of file
+    profitability::double precision AS profitability
+FROM series_data
@@ -0,0 +1,67 @@
+-- models/marts/financial/serving/srv_serie_tb.sql
+{{
+  config(
+    materialized='partitioned_incremental',
+    partition_by='ticker_date',
+    unique_key=['ticker_date', 'ticker_type_id'],
+    post_hook=[
+      """
+      DO $$
+      BEGIN
+        -- Covers the API profitability query: one index range scan per partition,
+        -- answered from the index alone
+        IF NOT EXISTS (
+          SELECT 1 FROM pg_constraint WHERE conname = 'srv_serie_pk'
+        ) THEN
+          ALTER TABLE {{ this }} ADD CONSTRAINT srv_serie_pk
+          PRIMARY KEY (ticker_type_id, ticker_date) INCLUDE (month, year, profitability);
+        END IF;
+      END$$;
+      """
+    ]
+  )
+}}
+
+-- Serving copy of fct_serie_tb with the date attributes the API needs, so requests
+-- only look up the ticker and range-scan this table instead of joining four tables
+
+WITH
+{% if is_incremental() and not env_var('DBT_RAW_START_DATE', '') %}
+-- Same window as fct_serie_tb: each ticker type from its lookback window onwards
+watermarks AS (
+    SELECT
+        ticker_type_id,
+        MAX(ticker_date) - {{ var('fct_serie_lookback_days') }} AS window_start
+    FROM {{ this }}
+    GROUP BY ticker_type_id
+),
+{% endif %}
+
+series_data AS (
+    SELECT
+        f.ticker_type_id,
+        f.ticker_date,
+        f.profitability
+    FROM {{ ref('fct_serie_tb') }} f
+    {% if is_incremental() and env_var('DBT_RAW_START_DATE', '') %}
+    WHERE f.ticker_date >= '{{ env_var("DBT_RAW_START_DATE") }}'::date
+    {% elif is_incremental() %}
+    LEFT JOIN watermarks w
+        ON w.ticker_type_id = f.ticker_type_id
+    WHERE w.window_start IS NULL
+       OR f.ticker_date >= w.window_start
+    {% endif %}
+)
+
+-- Rows are inserted in (ticker_type_id, ticker_date) order, so each monthly partition
+-- is stored clustered by ticker
+SELECT
+    s.ticker_type_id,
+    s.ticker_date,
+    d.month::smallint AS month,
+    d.year::smallint AS year,
+    s.profitability
+FROM series_data s
+INNER JOIN {{ ref('dim_date_tb') }} d
+    ON d.ticker_date = s.ticker_date
+ORDER BY s.ticker_type_id, s.ticker_date
@@ -0,0 +1,66 @@
+-- models/staging/financial/stg_raw_market_data.sql
+{{
+  config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['ticker_type_nm', 'ticker_date'],
+    post_hook=[
+      """
+      DO $$
+      BEGIN
+          IF NOT EXISTS (
+              SELECT 1 FROM pg_constraint WHERE conname = 'stg_raw_market_data_pk'
+          ) THEN
+              ALTER TABLE {{ this }}
+              ADD CONSTRAINT stg_raw_market_data_pk PRIMARY KEY (ticker_type_nm, ticker_date);
+          END IF;
+      END$$;
+      """,
+      "{{ create_index(this, 'stg_raw_market_data_date_brin', ['ticker_date'], method='brin') }}"
+    ]
+  )
+}}
+
+WITH source_data AS (
+    SELECT
+        ticker,
+        date,
+        close,
+        source,
+        extracted_date
+    FROM {{ source('raw', 'raw_market_data') }}
+    {% if is_incremental() and env_var('DBT_RAW_START_DATE', '') %}
+    -- Restrict the scan to recent monthly partitions of the raw table (a first or full
+    -- refresh build always reads the whole table)
+    WHERE date >= '{{ env_var("DBT_RAW_START_DATE") }}'::date
+    {% elif is_incremental() %}
+    -- Without a load bound, only read rows extracted after the last staged extraction
+    WHERE extracted_date > (SELECT MAX(extracted_date) FROM {{ this }})
+    {% endif %}
+),
+
+cleaned_data AS (
+    SELECT DISTINCT ON (ticker, date)
+        ticker AS ticker_type_nm,
+        date AS ticker_date,
+        close AS profitability,
+        CASE
+            WHEN source = 'Yahoo Finance' THEN False
+            ELSE True
+        END AS is_src,
+        extracted_date
+    FROM source_data
+    WHERE ticker IS NOT NULL
+      AND date IS NOT NULL
+    ORDER BY ticker, date, extracted_date DESC
+)
+
+-- Incremental runs replace the staged rows of the keys read (delete+insert), so the
+-- raw table is deduplicated once per run and the marts read this compact table
+SELECT
+    ticker_type_nm,
+    ticker_date,
+    profitability,
+    is_src,
+    extracted_date
+FROM cleaned_data
@@ -0,0 +1,374 @@
+"""
+Warehouse Scale Test
+
+Generates synthetic raw_market_data at a configurable scale in a scratch database, runs
+a full and then an incremental dbt build on it, and reports per-model runtime, rows and
+table/index sizes, so the model that stops scaling shows up before production does.
+
+The data goes through the same code paths as the DAGs: batches are bulk upserted with
+upsert_market_data (last write wins on the natural key), and the incremental build
+selects everything fed by the raw table with the load bound the transform DAG passes.
+Each extraction after the first re-fetches the trailing revision window of every ticker
+with a later extracted_date and some revised values, as the daily update does.
+
+Run it where dbt and the DAG libraries are installed (e.g., the Airflow container),
+with the usual POSTGRES_* variables pointing at a local server:
+
+    python datawarehouse/scripts/run_scale_test.py --tickers 1000 --years 30 --extractions 3
+
+The scratch database (icatu_scale_test by default) is created if missing and its raw
+table and warehouse schema are recreated on every run, so the first build is a full one
+(--full-refresh skips the models that keep history); the configured POSTGRES_DB is never
+written to.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]  # dbt project
+sys.path.insert(0, str(PROJECT_DIR.parent / "dags"))
+
+from libs.database import create_database, create_postgres_engine  # noqa: E402
+from libs.dbt import RAW_SOURCE_SELECTOR, run_dbt  # noqa: E402
+from libs.raw_market_data import (  # noqa: E402
+    RAW_TABLE_NAME,
+    create_raw_market_data_table,
+    upsert_market_data,
+)
+
+# Constants
+DEFAULT_DATABASE = "icatu_scale_test"
+TICKERS_PER_BATCH = 200  # Tickers generated and upserted per batch
+SGS_SHARE = 0.1  # Share of the tickers generated as SGS rate series
+REVISION_DAYS = 30  # Trailing business days re-fetched by each extra extraction
+REVISED_SHARE = 0.02  # Share of the re-fetched values that come back revised
+INCREMENTAL_DAYS = 5  # Business days appended before the incremental build
+BYTES_PER_UNIT = 1024  # Step between the size units of the report (B, kB, MB, ...)
+
+
+def _ticker_names(n_tickers: int) -> list[tuple[str, str]]:
+    """Return (ticker, source) pairs, SGS series codes first."""
+    n_sgs = int(round(n_tickers * SGS_SHARE))
+    sgs = [(str(100_000 + i), "SGS") for i in range(n_sgs)]
+    yahoo = [(f"SCALE{i:05d}.SA", "Yahoo Finance") for i in range(n_tickers - n_sgs)]
+    return sgs + yahoo
+
+
+def generate_market_data(
+    tickers: list[tuple[str, str]],
+    days: pd.DatetimeIndex,
+    extracted_date: pd.Timestamp,
+    rng: np.random.Generator,
+) -> pd.DataFrame:
+    """
+    Generate one extraction of daily series in the raw market data schema.
+
+    Yahoo Finance tickers get daily returns of a volatile index, SGS tickers a slowly
+    moving daily rate, both as the fraction stored in close.
+
+    Args:
+        tickers: (ticker, source) pairs
+        days: Business days of the series
+        extracted_date: Extraction timestamp of every row
+        rng: Random generator
+
+    Returns:
+        pd.DataFrame: Frame with the raw market data columns
+    """
+    n_days = len(days)
+    is_sgs = np.array([source == "SGS" for _, source in tickers])
+
+    returns = rng.normal(0.0004, 0.015, size=(len(tickers), n_days)).clip(-0.2, 0.2)
+    rates = 0.0004 + rng.normal(0, 0.000001, size=(len(tickers), n_days)).cumsum(axis=1)
+    close = np.where(is_sgs[:, None], np.abs(rates), returns)
+
+    return pd.DataFrame(
+        {
+            "date": np.tile(days.date, len(tickers)),
+            "close": close.ravel(),
+            "ticker": np.repeat([ticker for ticker, _ in tickers], n_days),
+            "source": np.repeat([source for _, source in tickers], n_days),
+            "extracted_date": extracted_date,
+        }
+    )
+
+
+def _revise(df: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+    """Perturb a share of the values of a re-fetched window."""
+    revised = rng.random(len(df)) < REVISED_SHARE
+    return df.assign(close=np.where(revised, df["close"] * 1.01, df["close"]))
+
+
+def load_history(
+    engine: Engine,
+    tickers: list[tuple[str, str]],
+    days: pd.DatetimeIndex,
+    extractions: int,
+    rng: np.random.Generator,
+) -> int:
+    """
+    Load the full history of every ticker, then re-fetch its revision window.
+
+    Args:
+        engine: SQLAlchemy Engine of the scratch database
+        tickers: (ticker, source) pairs
+        days: Business days of the history
+        extractions: Number of extractions of the revision window (1 = history only)
+        rng: Random generator
+
+    Returns:
+        int: Number of raw rows written (inserted or updated)
+    """
+    first_extraction = pd.Timestamp(days[-1]) + pd.Timedelta(hours=20)
+    written = 0
+
+    for start in range(0, len(tickers), TICKERS_PER_BATCH):
+        batch = tickers[start : start + TICKERS_PER_BATCH]
+        df = generate_market_data(batch, days, first_extraction, rng)
+        counts = upsert_market_data(df, engine, table_name=RAW_TABLE_NAME)
+        written += counts["inserted"] + counts["updated"]
+
+        window = df[df["date"] >= days[-REVISION_DAYS].date()]
+        for extraction in range(1, extractions):
+            refetch = _revise(window, rng).assign(
+                extracted_date=first_extraction + pd.Timedelta(minutes=extraction)
+            )
+            counts = upsert_market_data(refetch, engine, table_name=RAW_TABLE_NAME)
+            written += counts["inserted"] + counts["updated"]
+
+    return written
+
+
+def load_increment(
+    engine: Engine,
+    tickers: list[tuple[str, str]],
+    history_days: pd.DatetimeIndex,
+    new_days: pd.DatetimeIndex,
+    rng: np.random.Generator,
+) -> dict:
+    """
+    Load the next business days of every ticker with its re-fetched revision window.
+
+    Args:
+        engine: SQLAlchemy Engine of the scratch database
+        tickers: (ticker, source) pairs
+        history_days: Business days already loaded
+        new_days: Business days to append
+        rng: Random generator
+
+    Returns:
+        dict: 'rows_written' and 'loaded_since' (earliest date in the load, ISO)
+    """
+    days = history_days[-REVISION_DAYS:].append(new_days)
+    extracted_date = pd.Timestamp(new_days[-1]) + pd.Timedelta(hours=20)
+    written = 0
+
+    for start in range(0, len(tickers), TICKERS_PER_BATCH):
+        batch = tickers[start : start + TICKERS_PER_BATCH]
+        df = generate_market_data(batch, days, extracted_date, rng)
+        # Re-fetched days mostly come back unchanged, so keep the stored values
+        old = df["date"] < new_days[0].date()
+        stored = pd.read_sql(
+            text(
+                f"SELECT ticker, date, close FROM {RAW_TABLE_NAME} "
+                "WHERE date >= :since AND ticker = ANY(:tickers)"
+            ),
+            engine,
+            params={"since": days[0].date(), "tickers": [ticker for ticker, _ in batch]},
+        )
+        df = pd.concat(
+            [
+                _revise(df[old].drop(columns="close").merge(stored, on=["ticker", "date"]), rng),
+                df[~old],
+            ]
+        )
+        counts = upsert_market_data(df, engine, table_name=RAW_TABLE_NAME)
+        written += counts["inserted"] + counts["updated"]
+
+    return {"rows_written": written, "loaded_since": days[0].date().isoformat()}
+
+
+def relation_stats(engine: Engine, relation: str) -> dict:
+    """
+    Count the rows of a table and measure it with its partitions and indexes.
+
+    Args:
+        engine: SQLAlchemy Engine of the scratch database
+        relation: Schema-qualified table name
+
+    Returns:
+        dict: 'rows', 'table_bytes' and 'index_bytes'
+    """
+    sizes = text(
+        """
+        WITH relations AS (
+            SELECT to_regclass(:relation) AS relid
+            UNION ALL
+            SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(:relation)
+        )
+        SELECT
+            COALESCE(SUM(pg_table_size(relid)), 0),
+            COALESCE(SUM(pg_indexes_size(relid)), 0)
+        FROM relations
+        """
+    )
+    with engine.connect() as connection:
+        rows = connection.execute(text(f"SELECT COUNT(*) FROM {relation}")).scalar()
+        table_bytes, index_bytes = connection.execute(sizes, {"relation": relation}).one()
+
+    return {"rows": rows, "table_bytes": int(table_bytes), "index_bytes": int(index_bytes)}
+
+
+def run_build(engine: Engine, args: list[str], env: Optional[dict] = None) -> list[dict]:
+    """
+    Run a dbt build and collect the runtime, rows and sizes of every model and seed.
+
+    Args:
+        engine: SQLAlchemy Engine of the scratch database
+        args: dbt arguments
+        env: Environment variables read by the project during the build
+
+    Returns:
+        list[dict]: One entry per node with 'name', 'type', 'status' and 'seconds',
+            plus the relation_stats of models and seeds
+    """
+    result = run_dbt(str(PROJECT_DIR), args, env=env)
+
+    nodes = []
+    for node_result in result.results:
+        node = node_result.node
+        entry = {
+            "name": node.name,
+            "type": str(node.resource_type),
+            "status": str(node_result.status),
+            "seconds": round(node_result.execution_time, 2),
+        }
+        if entry["type"] in ("model", "seed"):
+            entry.update(relation_stats(engine, f"{node.schema}.{node.alias}"))
+        nodes.append(entry)
+    return nodes
+
+
+def _size(n_bytes: Optional[int]) -> str:
+    """Format a byte count for the report."""
+    if n_bytes is None:
+        return ""
+    for unit in ("B", "kB", "MB", "GB"):
+        if n_bytes < BYTES_PER_UNIT:
+            return f"{n_bytes:.0f} {unit}"
+        n_bytes /= BYTES_PER_UNIT
+    return f"{n_bytes:.1f} TB"
+
+
+def print_report(phase: str, load_seconds: float, nodes: list[dict]) -> None:
+    """Print the models of a build, slowest first, followed by the test time."""
+    print(f"\n== {phase}: load {load_seconds:.1f}s ==")
+    print(f"{'model':<28}{'status':>10}{'seconds':>10}{'rows':>14}{'table':>10}{'indexes':>10}")
+
+    relations = [n for n in nodes if "rows" in n]
+    for n in sorted(relations, key=lambda n: n["seconds"], reverse=True):
+        print(
+            f"{n['name']:<28}{n['status']:>10}{n['seconds']:>10.2f}{n['rows']:>14,}"
+            f"{_size(n['table_bytes']):>10}{_size(n['index_bytes']):>10}"
+        )
+
+    tests = [n for n in nodes if n["type"] == "test"]
+    print(f"{len(tests)} tests in {sum(n['seconds'] for n in tests):.2f}s")
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--tickers", type=int, default=10, help="Number of series")
+    parser.add_argument("--years", type=int, default=30, help="Years of daily history")
+    parser.add_argument(
+        "--extractions",
+        type=int,
+        default=2,
+        help="Extractions of each ticker's revision window (1 = history only)",
+    )
+    parser.add_argument("--database", default=DEFAULT_DATABASE, help="Scratch database")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", type=Path, help="Write the report as JSON to this path")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Load the generated history, build, load an increment and build again."""
+    args = parse_args()
+    if args.database == os.getenv("POSTGRES_DB"):
+        raise SystemExit(f"Refusing to run on the configured database {args.database}")
+
+    engine = create_postgres_engine(database="postgres")
+    with engine.connect() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": args.database}
+        ).scalar()
+    if not exists and not create_database(args.database):
+        raise SystemExit(f"Could not create the database {args.database}")
+
+    # dbt (profiles.yml) and create_postgres_engine both read POSTGRES_DB
+    os.environ["POSTGRES_DB"] = args.database
+    engine = create_postgres_engine()
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS public.{RAW_TABLE_NAME} CASCADE"))
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {os.environ['POSTGRES_SCHEMA']} CASCADE"))
+    create_raw_market_data_table(engine, table_name=RAW_TABLE_NAME)
+
+    rng = np.random.default_rng(args.seed)
+    tickers = _ticker_names(args.tickers)
+    end = pd.Timestamp(date.today())
+    days = pd.bdate_range(end=end, periods=args.years * 252 + INCREMENTAL_DAYS)
+    history_days, new_days = days[:-INCREMENTAL_DAYS], days[-INCREMENTAL_DAYS:]
+
+    started = time.perf_counter()
+    rows = load_history(engine, tickers, history_days, args.extractions, rng)
+    load_seconds = time.perf_counter() - started
+    print(f"Loaded {rows} raw rows for {len(tickers)} tickers in {load_seconds:.1f}s")
+
+    report = {
+        "tickers": args.tickers,
+        "years": args.years,
+        "extractions": args.extractions,
+        "raw_rows": rows,
+        "phases": [],
+    }
+
+    full = run_build(engine, ["build"])
+    report["phases"].append({"phase": "full", "load_seconds": load_seconds, "nodes": full})
+    print_report("full build", load_seconds, full)
+
+    # Daily-update-sized load, built like the transform DAG does
+    started = time.perf_counter()
+    summary = load_increment(engine, tickers, history_days, new_days, rng)
+    load_seconds = time.perf_counter() - started
+    since = summary["loaded_since"]
+
+    incremental = run_build(
+        engine,
+        ["build", "--select", RAW_SOURCE_SELECTOR],
+        env={"DBT_RAW_START_DATE": since, "DBT_TEST_SINCE_DATE": since},
+    )
+    report["phases"].append(
+        {"phase": "incremental", "load_seconds": load_seconds, "nodes": incremental, **summary}
+    )
+    print_report("incremental build", load_seconds, incremental)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, default=str))
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
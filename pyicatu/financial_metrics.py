@@ -7,15 +7,28 @@ for different financial instruments.
 """
 
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, timedelta
+from typing import Optional
 
 import numpy as np
 import pandas as pd
 
-from pyicatu.models.financial.queries import get_profitability_df
+from pyicatu.models.financial.queries import (
+    BUSINESS_DAYS_PER_YEAR,
+    get_cumulative_profitability_sql_df,
+    get_period_returns_df,
+    get_profitability_df,
+)
 
 # Constants
-BUSINESS_DAYS_PER_YEAR = 252  # Standard number of business days in a financial year
+MIN_MONTHS_FOR_MARTS = 3  # Shorter ranges are cheaper to compound from daily rows
+FIRST_DAY_LOOKAHEAD_DAYS = 7  # Calendar days searched for the first trading day
+COMPUTE_ENGINES = ("pandas", "sql")  # Where returns are compounded
+
+
+def _month_start(day: date) -> date:
+    """Return the first day of the month of the given date."""
+    return day.replace(day=1)
 
 
 @dataclass
@@ -26,8 +39,27 @@ class FinancialMetrics:
     This class provides methods to retrieve financial data and calculate
     performance metrics such as daily returns, cumulative returns, and
     monthly performance indicators.
+
+    Attributes:
+        use_marts: Read monthly returns from the pre-aggregated monthly mart when the
+            range is long enough and the ticker has no annual tax
+        compute_engine: Default place where returns are compounded: 'pandas' (daily
+            rows are fetched and compounded here) or 'sql' (compounded in PostgreSQL,
+            only the final rows are fetched)
     """
 
+    use_marts: bool = True
+    compute_engine: str = "pandas"
+
+    def _resolve_engine(self, compute_engine: Optional[str]) -> str:
+        """Return the compute engine of a call, validating it."""
+        compute_engine = compute_engine or self.compute_engine
+        if compute_engine not in COMPUTE_ENGINES:
+            raise ValueError(
+                f"Unknown compute engine '{compute_engine}', expected one of {COMPUTE_ENGINES}"
+            )
+        return compute_engine
+
     def fetch_profitability(self, ticker: str, init_date: date, end_date: date) -> pd.DataFrame:
         """
         Fetch and calculate adjusted daily returns for a ticker.
@@ -70,7 +102,11 @@ class FinancialMetrics:
         return df
 
     def get_cumulative_profitability(
-        self, ticker: str, init_date: date, end_date: date
+        self,
+        ticker: str,
+        init_date: date,
+        end_date: date,
+        compute_engine: Optional[str] = None,
     ) -> dict[str, float]:
         """
         Calculate cumulative profitability between dates.
@@ -79,10 +115,16 @@ class FinancialMetrics:
             ticker: Financial instrument identifier
             init_date: Start date (datetime.date)
             end_date: End date (datetime.date)
+            compute_engine: 'pandas' or 'sql' (defaults to self.compute_engine)
 
         Returns:
             dict[str, float]: Cumulative return as decimal
         """
+        # Compound inside PostgreSQL and only fetch the results
+        if self._resolve_engine(compute_engine) == "sql":
+            df = get_cumulative_profitability_sql_df(ticker, init_date, end_date)
+            return df.to_dict(orient="records") if not df.empty else 0.0
+
         # Get adjusted profitability data
         df = self.fetch_profitability(ticker, init_date, end_date)
 
@@ -99,7 +141,11 @@ class FinancialMetrics:
         return df.to_dict(orient="records")
 
     def get_monthly_cumulative_profitability(
-        self, ticker: str, init_date: date, end_date: date
+        self,
+        ticker: str,
+        init_date: date,
+        end_date: date,
+        compute_engine: Optional[str] = None,
     ) -> list[dict[str, float]]:
         """
         Calculate cumulative monthly returns between two dates.
@@ -108,6 +154,7 @@ class FinancialMetrics:
             ticker: Financial instrument identifier
             init_date: Start date (datetime.date)
             end_date: End date (datetime.date)
+            compute_engine: 'pandas' or 'sql' (defaults to self.compute_engine)
 
         Returns:
             List[Dict[str, float]]: DataFrame with monthly returns:
@@ -115,6 +162,18 @@ class FinancialMetrics:
                 - month: Month of the return (1-12)
                 - adjusted_profitability: Monthly compounded return as decimal
         """
+        # Compound inside PostgreSQL and only fetch the month-end rows
+        if self._resolve_engine(compute_engine) == "sql":
+            df = get_cumulative_profitability_sql_df(ticker, init_date, end_date, monthly=True)
+            return df.to_dict(orient="records")
+
+        # Long ranges are read from the monthly mart (about 12 rows per year)
+        months = (end_date.year - init_date.year) * 12 + end_date.month - init_date.month
+        if self.use_marts and months >= MIN_MONTHS_FOR_MARTS:
+            monthly = self._monthly_profitability_from_marts(ticker, init_date, end_date)
+            if monthly is not None:
+                return monthly
+
         # Get adjusted profitability data
         df = self.fetch_profitability(ticker, init_date, end_date)
 
@@ -133,3 +192,87 @@ class FinancialMetrics:
         )
 
         return monthly_cumulative.to_dict(orient="records")
+
+    def _monthly_profitability_from_marts(
+        self, ticker: str, init_date: date, end_date: date
+    ) -> Optional[list[dict[str, float]]]:
+        """
+        Calculate cumulative monthly returns from the monthly mart.
+
+        The index of a day is the index at the end of the previous month compounded
+        with the days of its month up to it, so only the daily rows of the first and
+        last months are read. Returns are ratios of indexes, starting from the first
+        trading day on or after init_date, as in the daily calculation.
+
+        Args:
+            ticker: Financial instrument identifier
+            init_date: Start date (datetime.date)
+            end_date: End date (datetime.date)
+
+        Returns:
+            Optional[List[Dict[str, float]]]: Monthly returns, or None when the mart
+                cannot be used (no rows, a ticker with an annual tax, or a month
+                without rows before the first or last month)
+        """
+        periods = get_period_returns_df(
+            ticker, _month_start(init_date) - timedelta(days=1), end_date, "monthly"
+        )
+        if periods.empty or periods["annual_tax"].notnull().any():
+            return None
+        month_index = dict(zip(periods["period_start"].dt.date, periods["cumulative_index"]))
+        # The first month of the series compounds from 1
+        series_starts = set(periods["series_start"].dt.date)
+
+        def index_at(daily: pd.DataFrame, day: date) -> Optional[float]:
+            month = _month_start(day)
+            previous = month_index.get(_month_start(month - timedelta(days=1)))
+            if previous is None:
+                # After a whole month without rows the index the month starts from
+                # is not in the range read
+                if month not in series_starts:
+                    return None
+                previous = 1.0
+            dates = daily["ticker_date"].dt.date
+            days = daily[(dates >= month) & (dates <= day)]
+            return previous * float((1 + days["profitability"]).prod())
+
+        # Base of the returns: the first trading day on or after init_date
+        lookahead = init_date + timedelta(days=FIRST_DAY_LOOKAHEAD_DAYS)
+        head = get_profitability_df(ticker, _month_start(init_date), lookahead)
+        first_days = head.loc[head["ticker_date"].dt.date >= init_date, "ticker_date"]
+        if first_days.empty:
+            return None
+        first_day = first_days.iloc[0].date()
+        if _month_start(first_day) >= _month_start(end_date):
+            return None
+        base = index_at(head, first_day)
+        if base is None:
+            return None
+
+        # Closed months straight from the mart
+        monthly = [
+            {
+                "year": int(row.year),
+                "month": int(row.month),
+                "cumulative_return": row.cumulative_index / base - 1,
+            }
+            for row in periods.itertuples()
+            if _month_start(first_day) <= row.period_start.date() < _month_start(end_date)
+        ]
+
+        # Last month up to end_date from its daily rows
+        tail = get_profitability_df(ticker, _month_start(end_date), end_date)
+        if not tail.empty:
+            last_day = tail["ticker_date"].iloc[-1].date()
+            last_index = index_at(tail, last_day)
+            if last_index is None:
+                return None
+            monthly.append(
+                {
+                    "year": last_day.year,
+                    "month": last_day.month,
+                    "cumulative_return": last_index / base - 1,
+                }
+            )
+
+        return monthly
@@ -14,6 +14,13 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from pyicatu.utils.database import create_postgres_engine
 
+# Constants
+BUSINESS_DAYS_PER_YEAR = 252  # Standard number of business days in a financial year
+PERIOD_TABLES = {  # Mart read for each period of get_period_returns_df
+    "monthly": "financial_s.fct_serie_monthly_tb",
+    "yearly": "financial_s.fct_serie_yearly_tb",
+}
+
 
 def get_profitability_df(
     ticker: str, init_date: date, end_date: date, engine: Optional[Engine] = None
@@ -21,6 +28,9 @@ def get_profitability_df(
     """
     Get raw profitability data for a financial ticker between dates.
 
+    Reads the pre-joined srv_serie_tb serving table, so the date range is an
+    index-only scan of its covering primary key.
+
     Args:
         ticker: Financial instrument identifier (e.g., 'CDI', 'Ibovespa')
         init_date: Start date (datetime.date)
@@ -39,21 +49,19 @@ def get_profitability_df(
     Raises:
         SQLAlchemyError: For database connection or query issues
     """
-    query = f"""
+    query = """
         SELECT
             t.ticker_nm,
-            d.ticker_date,
-            d.month,
-            d.year,
+            s.ticker_date,
+            s.month,
+            s.year,
             s.profitability,
             t.annual_tax
-        FROM financial_s.fct_serie_tb s
-        JOIN financial_s.dim_ticker_type_tb tt ON s.ticker_type_id = tt.ticker_type_id
-        JOIN financial_s.dim_date_tb d ON d.ticker_date = s.ticker_date
-        JOIN financial_s.dim_ticker_tb t ON t.ticker_type_id = tt.ticker_type_id
-        WHERE t.ticker_nm = '{ticker}'
-          AND d.ticker_date BETWEEN '{str(init_date)}' AND '{str(end_date)}'
-        ORDER BY d.ticker_date
+        FROM financial_s.dim_ticker_tb t
+        JOIN financial_s.srv_serie_tb s ON s.ticker_type_id = t.ticker_type_id
+        WHERE t.ticker_nm = %(ticker)s
+          AND s.ticker_date BETWEEN %(init_date)s AND %(end_date)s
+        ORDER BY s.ticker_date
     """
     # Use provided engine or create a new one
     db_engine = engine or create_postgres_engine()
@@ -70,3 +78,174 @@ def get_profitability_df(
             )
     except SQLAlchemyError as e:
         raise ValueError(f"Query execution failed: {e}") from e
+
+
+def get_period_returns_df(
+    ticker: str,
+    init_date: date,
+    end_date: date,
+    period: str = "monthly",
+    engine: Optional[Engine] = None,
+) -> pd.DataFrame:
+    """
+    Get pre-aggregated period returns for a financial ticker between dates.
+
+    Reads the monthly or yearly mart, so a year costs 12 (or 1) rows instead of one
+    row per trading day. Periods starting from init_date's period up to end_date's
+    period are returned.
+
+    Args:
+        ticker: Financial instrument identifier (e.g., 'CDI', 'Ibovespa')
+        init_date: Start date (datetime.date)
+        end_date: End date (datetime.date)
+        period: 'monthly' or 'yearly'
+        engine: Optional SQLAlchemy engine; creates a new one if not provided
+
+    Returns:
+        pd.DataFrame: Query results with columns:
+            - ticker_nm: Asset name
+            - period_start: First day of the period
+            - period_end_date: Last date with data in the period
+            - year: Year of the period
+            - month: Month of the period
+            - period_return: Compounded return over the period
+            - cumulative_index: Growth of 1 since the series start, at the period end
+            - series_start: First period of the ticker type, even when before init_date
+            - annual_tax: Annual tax rate
+
+    Raises:
+        ValueError: If the period is unknown or the query fails
+    """
+    if period not in PERIOD_TABLES:
+        raise ValueError(f"Unknown period '{period}', expected one of {list(PERIOD_TABLES)}")
+
+    trunc = "month" if period == "monthly" else "year"
+    query = f"""
+        SELECT
+            t.ticker_nm,
+            p.period_start,
+            p.period_end_date,
+            EXTRACT(YEAR FROM p.period_start)::integer AS year,
+            EXTRACT(MONTH FROM p.period_start)::integer AS month,
+            p.period_return,
+            p.cumulative_index,
+            (
+                SELECT MIN(s.period_start)
+                FROM {PERIOD_TABLES[period]} s
+                WHERE s.ticker_type_id = p.ticker_type_id
+            ) AS series_start,
+            t.annual_tax
+        FROM {PERIOD_TABLES[period]} p
+        JOIN financial_s.dim_ticker_tb t ON t.ticker_type_id = p.ticker_type_id
+        WHERE t.ticker_nm = %(ticker)s
+          AND p.period_start BETWEEN date_trunc('{trunc}', %(init_date)s::date)
+                                 AND date_trunc('{trunc}', %(end_date)s::date)
+        ORDER BY p.period_start
+    """
+    db_engine = engine or create_postgres_engine()
+
+    try:
+        with db_engine.connect() as connection:
+            raw_conn = connection.connection
+            return pd.read_sql(
+                query,
+                raw_conn,
+                parse_dates=["period_start", "period_end_date", "series_start"],
+                params={"ticker": ticker, "init_date": init_date, "end_date": end_date},
+            )
+    except SQLAlchemyError as e:
+        raise ValueError(f"Query execution failed: {e}") from e
+
+
+def get_cumulative_profitability_sql_df(
+    ticker: str,
+    init_date: date,
+    end_date: date,
+    monthly: bool = False,
+    engine: Optional[Engine] = None,
+) -> pd.DataFrame:
+    """
+    Get cumulative profitability for a financial ticker compounded inside PostgreSQL.
+
+    Daily returns are adjusted by the daily equivalent of the ticker's annual tax and
+    compounded with an `exp(sum(ln(1 + r)))` window, the first day being the base (its
+    return counts as 0). Only the final rows cross the wire: one per day, or the last
+    day of each month when `monthly` is set.
+
+    Args:
+        ticker: Financial instrument identifier (e.g., 'CDI', 'Ibovespa')
+        init_date: Start date (datetime.date)
+        end_date: End date (datetime.date)
+        monthly: Return the cumulative return at the last day of each month only
+        engine: Optional SQLAlchemy engine; creates a new one if not provided
+
+    Returns:
+        pd.DataFrame: Query results with columns:
+            - ticker_date, cumulative_return (daily)
+            - year, month, cumulative_return (monthly)
+
+    Raises:
+        ValueError: If the query fails
+    """
+    if monthly:
+        final = """
+            SELECT DISTINCT ON (year, month)
+                year,
+                month,
+                cumulative_return
+            FROM cumulative
+            ORDER BY year, month, ticker_date DESC
+        """
+    else:
+        final = """
+            SELECT ticker_date, cumulative_return
+            FROM cumulative
+            ORDER BY ticker_date
+        """
+
+    query = f"""
+        WITH daily AS (
+            SELECT
+                s.ticker_date,
+                s.month,
+                s.year,
+                s.profitability + COALESCE(
+                    POWER(1 + t.annual_tax::double precision, 1.0 / %(business_days)s) - 1, 0
+                ) AS adjusted_profitability,
+                ROW_NUMBER() OVER (ORDER BY s.ticker_date) AS day_number
+            FROM financial_s.dim_ticker_tb t
+            JOIN financial_s.srv_serie_tb s ON s.ticker_type_id = t.ticker_type_id
+            WHERE t.ticker_nm = %(ticker)s
+              AND s.ticker_date BETWEEN %(init_date)s AND %(end_date)s
+        ),
+
+        cumulative AS (
+            SELECT
+                ticker_date,
+                month,
+                year,
+                EXP(SUM(LN(1 + CASE WHEN day_number = 1 THEN 0 ELSE adjusted_profitability END))
+                    OVER (ORDER BY ticker_date)) - 1 AS cumulative_return
+            FROM daily
+        )
+
+        {final}
+    """
+    db_engine = engine or create_postgres_engine()
+
+    try:
+        with db_engine.connect() as connection:
+            raw_conn = connection.connection
+            return pd.read_sql(
+                query,
+                raw_conn,
+                parse_dates=None if monthly else ["ticker_date"],
+                params={
+                    "ticker": ticker,
+                    "init_date": init_date,
+                    "end_date": end_date,
+                    "business_days": BUSINESS_DAYS_PER_YEAR,
+                },
+            )
+    except SQLAlchemyError as e:
+        raise ValueError(f"Query execution failed: {e}") from e
@@ -0,0 +1,9 @@
+"""Make the DAG helper libraries importable as `libs`, as they are inside the Airflow image."""
+
+import sys
+from pathlib import Path
+
+DAGS_FOLDER = Path(__file__).resolve().parents[2] / "dags"
+
+if str(DAGS_FOLDER) not in sys.path:
+    sys.path.insert(0, str(DAGS_FOLDER))
@@ -0,0 +1,59 @@
+"""Bronze archive tests. Replaying the archive must reproduce the original loads, so
+rows quarantined at load time must not be replayed."""
+
+from datetime import datetime
+
+import pandas as pd
+
+from libs.archive import archive_market_data, list_archive_chunks, read_validated_archive_files
+
+
+def make_extraction(ticker: str, closes: list, extracted_date: datetime) -> pd.DataFrame:
+    """Build one Yahoo Finance extraction of consecutive business days."""
+    return pd.DataFrame(
+        {
+            "date": pd.bdate_range("2025-01-06", periods=len(closes)).date,
+            "close": closes,
+            "ticker": ticker,
+            "source": "Yahoo Finance",
+            "extracted_date": extracted_date,
+        }
+    )
+
+
+def replay(archive_dir) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Read every archived chunk back as the replay DAG does."""
+    files = [f for chunk in list_archive_chunks(archive_dir) for f in chunk["files"]]
+    return read_validated_archive_files(files, archive_dir)
+
+
+def test_quarantined_rows_are_not_replayed(tmp_path):
+    """
+    test if a ticker batch that failed validation when loaded is quarantined on replay
+    """
+    extracted = datetime(2025, 1, 10, 20)
+    good = make_extraction("^BVSP", [0.01, 0.02, 0.03], extracted)
+    bad = make_extraction("PETR4.SA", [0.01, 0.9, 0.03], extracted)
+    archive_market_data(pd.concat([good, bad]), writer_id="daily", archive_dir=tmp_path)
+
+    valid, quarantined = replay(tmp_path)
+
+    assert set(valid["ticker"]) == {"^BVSP"}
+    assert len(valid) == len(good)
+    assert set(quarantined["ticker"]) == {"PETR4.SA"}
+    assert set(quarantined["failed_checks"]) == {"out_of_range_return"}
+
+
+def test_overlapping_extractions_are_validated_separately(tmp_path):
+    """
+    test if re-fetched windows of different extractions are not seen as dates going back
+    """
+    first = make_extraction("^BVSP", [0.01, 0.02, 0.03], datetime(2025, 1, 8, 20))
+    second = make_extraction("^BVSP", [0.01, 0.02, 0.03, 0.04], datetime(2025, 1, 9, 20))
+    archive_market_data(first, writer_id="run-1", archive_dir=tmp_path)
+    archive_market_data(second, writer_id="run-2", archive_dir=tmp_path)
+
+    valid, quarantined = replay(tmp_path)
+
+    assert len(valid) == len(first) + len(second)
+    assert quarantined.empty
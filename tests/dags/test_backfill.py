@@ -0,0 +1,70 @@
+"""Backfill chunking tests. Each ticker's history must be split into contiguous chunks
+that cover the whole range exactly once."""
+
+from datetime import date, timedelta
+
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from libs.backfill import plan_backfill_chunks
+
+TICKERS = [{"ticker_type_nm": "^BVSP", "is_src": False}, {"ticker_type_nm": 12, "is_src": True}]
+
+
+def test_chunks_cover_the_range_contiguously():
+    """
+    test if every ticker's chunks start at the first date, end at the last and do not overlap
+    """
+    date_init, date_end = date(2020, 1, 15), date(2021, 3, 10)
+    chunks = plan_backfill_chunks(TICKERS, date_init, date_end, chunk_months=6)
+
+    for ticker in ("^BVSP", "12"):
+        ticker_chunks = [c for c in chunks if c["ticker"] == ticker]
+        assert ticker_chunks[0]["chunk_start"] == date_init.isoformat()
+        assert ticker_chunks[-1]["chunk_end"] == date_end.isoformat()
+        for chunk, following in zip(ticker_chunks, ticker_chunks[1:]):
+            next_day = date.fromisoformat(chunk["chunk_end"]) + timedelta(days=1)
+            assert following["chunk_start"] == next_day.isoformat()
+
+
+def test_chunk_length_and_fields():
+    """
+    test if chunks span the requested months and carry the ticker as a string
+    """
+    chunks = plan_backfill_chunks(TICKERS[1:], date(2020, 1, 1), date(2020, 12, 31), 3)
+
+    assert [(c["chunk_start"], c["chunk_end"]) for c in chunks] == [
+        ("2020-01-01", "2020-03-31"),
+        ("2020-04-01", "2020-06-30"),
+        ("2020-07-01", "2020-09-30"),
+        ("2020-10-01", "2020-12-31"),
+    ]
+    assert all(c["ticker"] == "12" and c["is_src"] is True for c in chunks)
+    assert all(c["source"] == "SGS" for c in chunks)
+
+
+def test_open_ended_last_chunk_keeps_its_full_length():
+    """
+    test if an open-ended backfill reaches today with a last chunk that doesn't end today
+    """
+    date_init = date.today() - timedelta(days=400)
+    chunks = plan_backfill_chunks(TICKERS[:1], date_init, None, chunk_months=6)
+
+    last = chunks[-1]
+    assert date.fromisoformat(last["chunk_start"]) <= date.today()
+    assert date.fromisoformat(last["chunk_end"]) == (
+        date.fromisoformat(last["chunk_start"]) + relativedelta(months=6) - timedelta(days=1)
+    )
+    assert last["source"] == "Yahoo Finance"
+
+
+@pytest.mark.parametrize(
+    "date_init,date_end,chunk_months",
+    [(date(2021, 1, 1), date(2020, 1, 1), 12), (date(2020, 1, 1), date(2021, 1, 1), 0)],
+)
+def test_invalid_plan_is_rejected(date_init, date_end, chunk_months):
+    """
+    test if an inverted range or an empty chunk length raises
+    """
+    with pytest.raises(ValueError):
+        plan_backfill_chunks(TICKERS, date_init, date_end, chunk_months)
@@ -0,0 +1,86 @@
+"""DAG parse-time budget test. The scheduler re-parses every DAG file continuously, so this test fails if a DAG file takes too long to import or pulls heavy libraries in at module level instead of inside task bodies."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+DAGS_FOLDER = Path(__file__).resolve().parents[2] / "dags"
+
+PARSE_TIME_BUDGET_SECONDS = 2.0  # Import time of one DAG file, Airflow itself excluded
+IMPORT_COUNT_BUDGET = 60  # Modules a DAG file may add on top of Airflow itself
+
+# Libraries that must only be imported inside task bodies
+HEAVY_MODULES = {
+    "dbt",
+    "httpx",
+    "numpy",
+    "pandas",
+    "psycopg2",
+    "pyarrow",
+    "yfinance",
+}
+
+# Runs in a fresh interpreter: preload what every DAG file needs from Airflow, then
+# time the import of the DAG file and report the modules it added
+PARSE_SCRIPT = """
+import importlib.util, json, sys, time
+
+import airflow
+import airflow.datasets
+import airflow.decorators
+import airflow.exceptions
+import airflow.models
+import airflow.models.param
+import airflow.utils.dates
+
+dags_folder, path = sys.argv[1], sys.argv[2]
+sys.path.insert(0, dags_folder)
+before = set(sys.modules)
+
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("parse_budget_dag", path)
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+elapsed = time.perf_counter() - start
+
+print(json.dumps({"seconds": elapsed, "modules": sorted(set(sys.modules) - before)}))
+"""
+
+
+def get_dag_files():
+    """
+    Generate the DAG files at the top of the dags folder
+    """
+    return sorted(DAGS_FOLDER.glob("*.py"))
+
+
+def parse_dag_file(path):
+    """
+    Import a DAG file in a subprocess and return its parse time and new modules
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", PARSE_SCRIPT, str(DAGS_FOLDER), str(path)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("path", get_dag_files(), ids=[p.name for p in get_dag_files()])
+def test_dag_parse_budget(path):
+    """
+    test if a DAG file parses within budget without importing heavy libraries
+    """
+    stats = parse_dag_file(path)
+
+    heavy = sorted({name.split(".")[0] for name in stats["modules"]} & HEAVY_MODULES)
+    assert not heavy, f"{path.name} imports {heavy} at module level, move them into tasks"
+    assert len(stats["modules"]) <= IMPORT_COUNT_BUDGET, (
+        f"{path.name} imports {len(stats['modules'])} modules, budget is {IMPORT_COUNT_BUDGET}"
+    )
+    assert stats["seconds"] <= PARSE_TIME_BUDGET_SECONDS, (
+        f"{path.name} took {stats['seconds']:.2f}s to parse, budget is {PARSE_TIME_BUDGET_SECONDS}s"
+    )
@@ -0,0 +1,38 @@
+"""Dataset-triggered DAGs test. A DAG scheduled on a dataset must queue its runs, since
+events from the daily, backfill and replay DAGs would otherwise start overlapping dbt
+builds on the same tables."""
+
+import logging
+
+import pytest
+from airflow.models import DagBag
+from airflow.timetables.simple import DatasetTriggeredTimetable
+
+
+def get_dataset_dags():
+    """
+    Generate a tuple of dag_id, <DAG objects> for the dataset-triggered DAGs in the DagBag
+    """
+    logger = logging.getLogger("airflow")
+    old_value = logger.disabled
+    logger.disabled = True
+    try:
+        dag_bag = DagBag(include_examples=False)
+    finally:
+        logger.disabled = old_value
+
+    return [
+        (dag_id, dag)
+        for dag_id, dag in dag_bag.dags.items()
+        if isinstance(dag.timetable, DatasetTriggeredTimetable)
+    ]
+
+
+@pytest.mark.parametrize("dag_id,dag", get_dataset_dags(), ids=[x[0] for x in get_dataset_dags()])
+def test_dataset_dag_runs_one_at_a_time(dag_id, dag):
+    """
+    test if a dataset-triggered DAG queues its runs instead of overlapping them
+    """
+    assert dag.max_active_runs == 1, (
+        f"{dag_id} is dataset-triggered and must have max_active_runs=1."
+    )
@@ -0,0 +1,77 @@
+"""Load summary tests. The transform DAG merges the summaries of every dataset event
+received since its previous run."""
+
+from libs.datasets import merge_load_summaries
+
+
+def test_merge_sums_rows_and_keeps_the_earliest_date():
+    """
+    test if merged summaries add up the rows and start at the earliest loaded date
+    """
+    merged = merge_load_summaries(
+        [
+            {"rows_written": 3, "loaded_since": "2025-01-06"},
+            {"rows_written": 5, "loaded_since": "2024-12-30"},
+        ]
+    )
+
+    assert merged == {"rows_written": 8, "loaded_since": "2024-12-30", "revised_from": None}
+
+
+def test_merge_keeps_the_earliest_revision_per_ticker():
+    """
+    test if merged summaries keep the earliest revised date of each ticker
+    """
+    merged = merge_load_summaries(
+        [
+            {"rows_written": 2, "loaded_since": "2025-01-02", "revised_from": {"12": "2025-01-03"}},
+            {"rows_written": 1, "loaded_since": "2025-01-06", "revised_from": {"12": "2025-01-02"}},
+            {"rows_written": 1, "loaded_since": "2025-01-06", "revised_from": {"11": "2025-01-06"}},
+        ]
+    )
+
+    assert merged["revised_from"] == {"12": "2025-01-02", "11": "2025-01-06"}
+
+
+def test_merge_with_a_load_without_revisions_drops_them():
+    """
+    test if a summary that doesn't report its revisions falls back to loaded_since
+    """
+    merged = merge_load_summaries(
+        [
+            {"rows_written": 2, "loaded_since": "2025-01-02", "revised_from": {"12": "2025-01-03"}},
+            {"rows_written": 9, "loaded_since": "2024-01-02"},
+        ]
+    )
+
+    assert merged["revised_from"] is None
+    assert merged["loaded_since"] == "2024-01-02"
+
+
+def test_merge_of_an_unbounded_load_is_unbounded():
+    """
+    test if one summary without a start date makes the merged build unbounded
+    """
+    merged = merge_load_summaries(
+        [{"rows_written": 3, "loaded_since": "2025-01-06"}, {"rows_written": 1}]
+    )
+
+    assert merged["loaded_since"] is None
+
+
+def test_merge_of_a_summary_without_rows_counts_as_a_load():
+    """
+    test if an event created by hand, without a summary, still triggers a build
+    """
+    assert merge_load_summaries([{}])["rows_written"] == 1
+
+
+def test_merge_of_no_summary():
+    """
+    test if no summary means nothing was written
+    """
+    assert merge_load_summaries([]) == {
+        "rows_written": 0,
+        "loaded_since": None,
+        "revised_from": None,
+    }
@@ -0,0 +1,89 @@
+"""dbt build planning tests. The planned build must be proportional to what was loaded
+and scoped to the load's earliest date."""
+
+import json
+
+from libs.dbt import RAW_SOURCE_SELECTOR, SEED_SELECTOR, get_state_dir, plan_dbt_build
+
+
+def selected(plan: dict) -> list[str]:
+    """Return the selectors of a planned build."""
+    args = plan["args"]
+    return args[args.index("--select") + 1].split()
+
+
+def test_no_rows_skips_the_build(tmp_path):
+    """
+    test if a load without new rows plans no build
+    """
+    assert plan_dbt_build(str(tmp_path), rows_written=0, loaded_since="2025-01-06") is None
+
+
+def test_first_build_selects_the_raw_source_and_the_seeds(tmp_path):
+    """
+    test if a build without saved state also loads the seeds
+    """
+    plan = plan_dbt_build(str(tmp_path), rows_written=10, loaded_since="2025-01-06")
+
+    assert plan["args"][0] == "build"
+    assert selected(plan) == [RAW_SOURCE_SELECTOR, SEED_SELECTOR]
+    assert "--state" not in plan["args"]
+
+
+def test_build_with_state_selects_modified_nodes(tmp_path):
+    """
+    test if a saved manifest adds the nodes changed since the last build
+    """
+    state_dir = get_state_dir(str(tmp_path))
+    state_dir.mkdir()
+    (state_dir / "manifest.json").write_text("{}")
+
+    plan = plan_dbt_build(str(tmp_path), rows_written=10, loaded_since="2025-01-06")
+
+    assert selected(plan) == [RAW_SOURCE_SELECTOR, "state:modified+"]
+    assert plan["args"][plan["args"].index("--state") + 1] == str(state_dir)
+
+
+def test_build_is_bounded_by_the_loaded_date(tmp_path):
+    """
+    test if the loaded date bounds the staging scans and the tests
+    """
+    plan = plan_dbt_build(str(tmp_path), rows_written=10, loaded_since="2025-01-06")
+
+    assert plan["env"] == {
+        "DBT_RAW_START_DATE": "2025-01-06",
+        "DBT_TEST_SINCE_DATE": "2025-01-06",
+    }
+
+
+def test_build_passes_the_revised_dates_per_ticker(tmp_path):
+    """
+    test if the revised dates of a load are passed on to the fact window
+    """
+    plan = plan_dbt_build(
+        str(tmp_path),
+        rows_written=10,
+        loaded_since="2025-01-03",
+        revised_from={"12": "2025-01-03"},
+    )
+
+    assert plan["env"]["DBT_RAW_START_DATE"] == "2025-01-03"
+    assert json.loads(plan["env"]["DBT_REVISED_FROM"]) == {"12": "2025-01-03"}
+
+
+def test_build_without_revised_dates_uses_the_loaded_date(tmp_path):
+    """
+    test if a load that didn't compare its rows sets no revised dates
+    """
+    plan = plan_dbt_build(str(tmp_path), rows_written=10, loaded_since="2025-01-03")
+
+    assert "DBT_REVISED_FROM" not in plan["env"]
+
+
+def test_unbounded_load_builds_everything_downstream(tmp_path):
+    """
+    test if a load without a start date sets no bound
+    """
+    plan = plan_dbt_build(str(tmp_path), rows_written=10, loaded_since=None)
+
+    assert plan["env"] == {}
@@ -0,0 +1,47 @@
+"""SGS window tests. Long SGS requests must be split into contiguous windows the API
+accepts."""
+
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+
+from libs.financial_data import MAX_SGS_YEARS_RANGE, split_sgs_windows
+
+
+def test_short_range_is_one_window():
+    """
+    test if a range shorter than the API limit is requested at once
+    """
+    assert split_sgs_windows(date(2024, 1, 1), date(2024, 6, 30)) == [
+        (date(2024, 1, 1), date(2024, 6, 30))
+    ]
+
+
+def test_single_day_range():
+    """
+    test if a one-day range gives one window
+    """
+    day = date(2024, 1, 2)
+    assert split_sgs_windows(day, day) == [(day, day)]
+
+
+def test_long_range_windows_are_contiguous_and_within_the_limit():
+    """
+    test if a long range is covered by contiguous windows no longer than the API limit
+    """
+    date_init, date_end = date(2000, 3, 15), date(2025, 7, 1)
+    windows = split_sgs_windows(date_init, date_end)
+
+    assert windows[0][0] == date_init
+    assert windows[-1][1] == date_end
+    for (_, end), (next_start, _) in zip(windows, windows[1:]):
+        assert next_start == end + timedelta(days=1)
+    for start, end in windows:
+        assert end < start + relativedelta(years=MAX_SGS_YEARS_RANGE)
+
+
+def test_empty_range_has_no_window():
+    """
+    test if a range ending before it starts gives no window
+    """
+    assert split_sgs_windows(date(2024, 2, 1), date(2024, 1, 1)) == []
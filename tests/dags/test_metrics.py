@@ -0,0 +1,136 @@
+"""ETL metrics tests. Records are buffered per task run and written to every sink on
+flush, without a failing sink ever failing the task."""
+
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import libs.metrics
+from libs.metrics import (
+    InMemoryMetricsSink,
+    MetricsRecorder,
+    PostgresMetricsSink,
+    StatsdMetricsSink,
+)
+
+
+class FailingSink:
+    def write(self, records):
+        raise OSError("sink unavailable")
+
+
+def make_recorder(*sinks):
+    return MetricsRecorder(
+        list(sinks), dag_id="daily", task_id="load", run_id="manual__1", map_index=2
+    )
+
+
+def test_records_are_buffered_until_flush():
+    """
+    test if records carry the task instance fields and only reach the sink on flush
+    """
+    sink = InMemoryMetricsSink()
+    metrics = make_recorder(sink)
+
+    metrics.record("rows_inserted", 3, ticker=12)
+    assert sink.records == []
+
+    metrics.flush()
+    [record] = sink.records
+    assert record["dag_id"] == "daily"
+    assert record["task_id"] == "load"
+    assert record["run_id"] == "manual__1"
+    assert record["map_index"] == 2
+    assert record["ticker"] == "12"
+    assert (record["metric"], record["value"], record["unit"]) == ("rows_inserted", 3.0, "count")
+
+
+def test_timer_records_the_stage_duration():
+    """
+    test if a timed stage is recorded in seconds, even when the stage raises
+    """
+    sink = InMemoryMetricsSink()
+    with make_recorder(sink) as metrics:
+        with metrics.timer("fetch", ticker="^BVSP"):
+            pass
+        try:
+            with metrics.timer("load"):
+                raise RuntimeError("load failed")
+        except RuntimeError:
+            pass
+
+    assert [(r["metric"], r["unit"], r["ticker"]) for r in sink.records] == [
+        ("fetch_seconds", "seconds", "^BVSP"),
+        ("load_seconds", "seconds", None),
+    ]
+    assert all(r["value"] >= 0 for r in sink.records)
+
+
+def test_record_payload_uses_the_given_row_count():
+    """
+    test if a payload is recorded with the caller's row count and its encoded size
+    """
+    sink = InMemoryMetricsSink()
+    with make_recorder(sink) as metrics:
+        metrics.record_payload('[{"close":"ç"}]', 1, ticker="12")
+        metrics.record_payload(None, 0, ticker="11")
+
+    assert [(r["metric"], r["value"], r["ticker"]) for r in sink.records] == [
+        ("rows_fetched", 1.0, "12"),
+        ("payload_bytes", 16.0, "12"),
+        ("rows_fetched", 0.0, "11"),
+        ("payload_bytes", 0.0, "11"),
+    ]
+
+
+def test_failing_sink_does_not_fail_the_flush():
+    """
+    test if a sink raising on write is skipped and the other sinks still get the records
+    """
+    sink = InMemoryMetricsSink()
+    metrics = make_recorder(FailingSink(), sink)
+
+    metrics.record("rows_inserted", 1)
+    metrics.flush()
+
+    assert len(sink.records) == 1
+    assert metrics.records == []
+
+
+def test_statsd_sink_sends_seconds_as_timers(monkeypatch):
+    """
+    test if durations are sent as millisecond timers and other units as gauges
+    """
+    stats = MagicMock()
+    monkeypatch.setitem(sys.modules, "airflow.stats", SimpleNamespace(Stats=stats))
+    sink = InMemoryMetricsSink()
+    with make_recorder(sink) as metrics:
+        metrics.record("fetch_seconds", 1.5, "seconds", ticker="12")
+        metrics.record("payload_bytes", 10, "bytes")
+
+    StatsdMetricsSink().write(sink.records)
+
+    stats.timing.assert_called_once_with(
+        "etl.daily.load.fetch_seconds",
+        1500.0,
+        tags={"dag_id": "daily", "task_id": "load", "ticker": "12"},
+    )
+    stats.gauge.assert_called_once_with(
+        "etl.daily.load.payload_bytes", 10.0, tags={"dag_id": "daily", "task_id": "load"}
+    )
+
+
+def test_postgres_sink_creates_its_table_once(monkeypatch):
+    """
+    test if the metrics table is created on the first write only
+    """
+    create_table = MagicMock(return_value=True)
+    monkeypatch.setattr(libs.metrics, "create_metrics_table", create_table)
+    sink = PostgresMetricsSink(engine=MagicMock())
+    records = [{"metric": "rows_inserted"}]
+
+    sink.write(records)
+    sink.write(records)
+
+    create_table.assert_called_once_with(sink.engine, "etl_metrics", "public")
+    assert sink.engine.begin.call_count == 2
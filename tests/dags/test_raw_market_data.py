@@ -0,0 +1,91 @@
+"""Raw market data tests. Batches are deduplicated on the natural key, and only rows
+that are new or differ from the stored window are kept for loading."""
+
+from datetime import date, datetime
+
+import pandas as pd
+
+from libs.raw_market_data import deduplicate_market_data, diff_against_stored
+
+
+def make_rows(rows: list[tuple], extracted_date: datetime = datetime(2025, 1, 10)) -> pd.DataFrame:
+    """Build raw rows from (ticker, date, close) tuples."""
+    return pd.DataFrame(
+        {
+            "date": [day for _, day, _ in rows],
+            "close": [close for _, _, close in rows],
+            "ticker": [ticker for ticker, _, _ in rows],
+            "source": "SGS",
+            "extracted_date": extracted_date,
+        }
+    )
+
+
+def stored_rows(rows: list[tuple]) -> pd.DataFrame:
+    """Build stored (ticker, date, source, close) rows."""
+    return make_rows(rows)[["ticker", "date", "source", "close"]]
+
+
+def test_deduplicate_keeps_the_latest_extraction():
+    """
+    test if the most recently extracted row wins for a repeated key
+    """
+    older = make_rows([("12", date(2025, 1, 2), 0.1)], datetime(2025, 1, 2))
+    newer = make_rows([("12", date(2025, 1, 2), 0.2)], datetime(2025, 1, 3))
+
+    deduplicated = deduplicate_market_data(pd.concat([newer, older]))
+
+    assert deduplicated["close"].tolist() == [0.2]
+
+
+def test_diff_keeps_new_and_revised_rows():
+    """
+    test if unchanged rows are dropped and revised rows report their earliest date
+    """
+    stored = stored_rows(
+        [
+            ("12", date(2025, 1, 2), 0.1),
+            ("12", date(2025, 1, 3), 0.1),
+            ("433", date(2025, 1, 2), 0.5),
+        ]
+    )
+    batch = make_rows(
+        [
+            ("12", date(2025, 1, 2), 0.1),  # unchanged
+            ("12", date(2025, 1, 3), 0.2),  # revised
+            ("12", date(2025, 1, 6), 0.1),  # new
+            ("433", date(2025, 1, 2), 0.5),  # unchanged
+        ]
+    )
+
+    changed, revised_from = diff_against_stored(batch, stored)
+
+    assert list(zip(changed["ticker"], changed["date"])) == [
+        ("12", date(2025, 1, 3)),
+        ("12", date(2025, 1, 6)),
+    ]
+    assert revised_from == {"12": "2025-01-03"}
+
+
+def test_diff_without_stored_rows_keeps_everything():
+    """
+    test if a batch for an empty window is loaded as is
+    """
+    batch = make_rows([("12", date(2025, 1, 2), 0.1)])
+
+    changed, revised_from = diff_against_stored(batch, stored_rows([]))
+
+    assert changed.equals(batch)
+    assert revised_from == {}
+
+
+def test_diff_matches_numeric_and_string_tickers():
+    """
+    test if SGS codes stored as text match codes parsed as numbers
+    """
+    stored = stored_rows([("12", date(2025, 1, 2), 0.1)])
+    batch = make_rows([(12, date(2025, 1, 2), 0.1)])
+
+    changed, _ = diff_against_stored(batch, stored)
+
+    assert changed.empty
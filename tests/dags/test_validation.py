@@ -0,0 +1,163 @@
+"""Validation tests. Small in-flight batches go through validate_market_data, and each
+check must quarantine the whole batch of the offending ticker only."""
+
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from libs.validation import drop_quarantined_rows, find_business_day_gaps, validate_market_data
+
+EXTRACTED = datetime(2025, 1, 10, 20)
+
+
+def make_batch(ticker: str, source: str, closes: list, start: str = "2025-01-06") -> pd.DataFrame:
+    """Build a batch of consecutive business days for one ticker."""
+    days = pd.bdate_range(start, periods=len(closes)).date
+    return pd.DataFrame(
+        {
+            "date": days,
+            "close": closes,
+            "ticker": ticker,
+            "source": source,
+            "extracted_date": EXTRACTED,
+        }
+    )
+
+
+def test_valid_batch_is_kept():
+    """
+    test if a clean batch passes every check
+    """
+    df = pd.concat(
+        [
+            make_batch("^BVSP", "Yahoo Finance", [0.01, -0.02, 0.003]),
+            make_batch("12", "SGS", [0.0004] * 3),
+        ]
+    )
+    valid, quarantined = validate_market_data(df)
+
+    assert len(valid) == len(df)
+    assert quarantined.empty
+    assert "failed_checks" in quarantined
+
+
+@pytest.mark.parametrize(
+    "bad_batch,check",
+    [
+        (make_batch("^BVSP", "Yahoo Finance", [0.01, None, 0.02]), "null_key"),
+        (make_batch("^BVSP", "Yahoo Finance", [0.01, 0.6, 0.02]), "out_of_range_return"),
+        (make_batch("^BVSP", "Yahoo Finance", [0.01, -1.0, 0.02]), "out_of_range_return"),
+        (make_batch("12", "SGS", [0.0004, 1.5, 0.0004]), "out_of_range_return"),
+    ],
+)
+def test_failed_check_quarantines_the_ticker_batch(bad_batch, check):
+    """
+    test if a failed row check quarantines every row of its ticker and no other ticker
+    """
+    good = make_batch("433", "SGS", [0.004, 0.005, 0.006])
+    valid, quarantined = validate_market_data(pd.concat([bad_batch, good]))
+
+    assert set(quarantined["ticker"]) == set(bad_batch["ticker"])
+    assert len(quarantined) == len(bad_batch)
+    assert (quarantined["failed_checks"] == check).all()
+    assert valid["ticker"].tolist() == good["ticker"].tolist()
+
+
+def test_sgs_rate_threshold_is_per_source():
+    """
+    test if a rate above the Yahoo Finance daily return limit is accepted for SGS
+    """
+    batch = make_batch("12", "SGS", [0.6, 0.6])
+    valid, quarantined = validate_market_data(batch)
+
+    assert len(valid) == len(batch)
+    assert quarantined.empty
+
+
+def test_duplicate_key_with_different_values_is_quarantined():
+    """
+    test if one key extracted at the same time with two values fails duplicate_key
+    """
+    batch = make_batch("^BVSP", "Yahoo Finance", [0.01, 0.02]).iloc[[0, 0, 1]]
+    batch.iloc[1, batch.columns.get_loc("close")] = 0.03
+    valid, quarantined = validate_market_data(batch)
+
+    assert valid.empty
+    assert set(quarantined["failed_checks"]) == {"duplicate_key"}
+
+
+def test_identical_duplicate_is_not_flagged():
+    """
+    test if the same key fetched twice with the same value is not a duplicate_key failure
+    """
+    batch = make_batch("^BVSP", "Yahoo Finance", [0.01, 0.02]).iloc[[0, 0, 1]]
+    valid, quarantined = validate_market_data(batch)
+
+    assert len(valid) == len(batch)
+    assert quarantined.empty
+
+
+def test_non_monotonic_date_is_quarantined():
+    """
+    test if dates going backwards within a ticker, in fetch order, fail non_monotonic_date
+    """
+    batch = make_batch("^BVSP", "Yahoo Finance", [0.01, 0.02, 0.03]).iloc[[0, 2, 1]]
+    valid, quarantined = validate_market_data(batch)
+
+    assert valid.empty
+    assert set(quarantined["failed_checks"]) == {"non_monotonic_date"}
+
+
+def test_several_failed_checks_are_listed():
+    """
+    test if failed_checks lists every check failed by the ticker's batch
+    """
+    batch = make_batch("^BVSP", "Yahoo Finance", [None, 0.9])
+    _, quarantined = validate_market_data(batch)
+
+    assert set(quarantined["failed_checks"]) == {"null_key,out_of_range_return"}
+
+
+def test_business_day_gaps_of_daily_series():
+    """
+    test if a daily series missing more business days than tolerated is reported
+    """
+    days = list(pd.bdate_range("2025-01-01", periods=20).date)
+    gapped = days[:5] + days[15:]
+    df = pd.DataFrame({"ticker": "^BVSP", "date": gapped})
+
+    assert find_business_day_gaps(df, max_gap_business_days=5) == {"^BVSP": 10}
+    assert find_business_day_gaps(df, max_gap_business_days=10) == {}
+
+
+def test_business_day_gaps_ignore_monthly_series():
+    """
+    test if monthly series are not reported as gaps
+    """
+    df = pd.DataFrame({"ticker": "433", "date": [date(2025, m, 1) for m in range(1, 7)]})
+
+    assert find_business_day_gaps(df) == {}
+
+
+def test_already_quarantined_extraction_is_dropped():
+    """
+    test if rows stored in the quarantine with the same key and extraction are dropped
+    """
+    batch = make_batch("12", "SGS", [0.5, 0.6])
+    stored = batch.loc[[0], ["ticker", "date", "source", "extracted_date"]]
+    stored = stored.assign(date=pd.to_datetime(stored["date"]))
+
+    pending = drop_quarantined_rows(batch, stored)
+
+    assert pending["date"].tolist() == [batch["date"][1]]
+
+
+def test_new_extraction_of_a_quarantined_point_is_kept():
+    """
+    test if a later extraction of a quarantined point is quarantined again
+    """
+    batch = make_batch("12", "SGS", [0.5])
+    stored = batch[["ticker", "date", "source"]].assign(extracted_date=datetime(2025, 1, 9))
+
+    assert len(drop_quarantined_rows(batch, stored)) == 1
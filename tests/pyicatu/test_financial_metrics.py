@@ -0,0 +1,121 @@
+"""Monthly return tests. Long ranges are read from the monthly mart and must match the
+returns compounded from the daily rows."""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pyicatu import financial_metrics
+from pyicatu.financial_metrics import FinancialMetrics
+
+TICKER = "Ibovespa"
+
+
+def make_series(start: str, end: str, gaps: tuple = ()) -> pd.DataFrame:
+    """Build the daily serving rows of a ticker, without the business days in gaps."""
+    days = pd.bdate_range(start, end)
+    for gap_start, gap_end in gaps:
+        days = days[(days < gap_start) | (days > gap_end)]
+    returns = np.random.default_rng(0).normal(0.0005, 0.01, len(days))
+    return pd.DataFrame(
+        {
+            "ticker_nm": TICKER,
+            "ticker_date": days,
+            "month": days.month,
+            "year": days.year,
+            "profitability": returns,
+            "annual_tax": None,
+        }
+    )
+
+
+def make_monthly_mart(daily: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate the daily rows as fct_serie_monthly_tb does, indexed from the series start."""
+    months = daily.groupby(daily["ticker_date"].dt.to_period("M"))
+    mart = pd.DataFrame(
+        {
+            "period_start": months["ticker_date"].first().dt.to_period("M").dt.start_time,
+            "period_end_date": months["ticker_date"].last(),
+            "period_return": months["profitability"].apply(lambda r: (1 + r).prod() - 1),
+        }
+    ).reset_index(drop=True)
+    mart["cumulative_index"] = (1 + mart["period_return"]).cumprod()
+    mart["series_start"] = mart["period_start"].min()
+    mart["year"] = mart["period_start"].dt.year
+    mart["month"] = mart["period_start"].dt.month
+    mart["ticker_nm"] = TICKER
+    mart["annual_tax"] = None
+    return mart
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """Answer the daily and monthly queries from a synthetic series."""
+
+    def install(daily: pd.DataFrame) -> None:
+        mart = make_monthly_mart(daily)
+
+        def get_profitability_df(ticker, init_date, end_date, engine=None):
+            dates = daily["ticker_date"].dt.date
+            return daily[(dates >= init_date) & (dates <= end_date)].reset_index(drop=True)
+
+        def get_period_returns_df(ticker, init_date, end_date, period="monthly", engine=None):
+            starts = mart["period_start"].dt.date
+            in_range = (starts >= init_date.replace(day=1)) & (starts <= end_date.replace(day=1))
+            return mart[in_range].reset_index(drop=True)
+
+        monkeypatch.setattr(financial_metrics, "get_profitability_df", get_profitability_df)
+        monkeypatch.setattr(financial_metrics, "get_period_returns_df", get_period_returns_df)
+
+    return install
+
+
+def assert_same_monthly_returns(init_date: date, end_date: date) -> None:
+    """Compare the mart and daily calculations over a range."""
+    from_marts = FinancialMetrics().get_monthly_cumulative_profitability(
+        TICKER, init_date, end_date
+    )
+    from_daily = FinancialMetrics(use_marts=False).get_monthly_cumulative_profitability(
+        TICKER, init_date, end_date
+    )
+
+    assert [(r["year"], r["month"]) for r in from_marts] == [
+        (r["year"], r["month"]) for r in from_daily
+    ]
+    assert [r["cumulative_return"] for r in from_marts] == pytest.approx(
+        [r["cumulative_return"] for r in from_daily], abs=1e-12
+    )
+
+
+@pytest.mark.parametrize(
+    "init_date,end_date",
+    [
+        (date(2020, 3, 11), date(2021, 5, 12)),  # starts mid-month, partial last month
+        (date(2020, 2, 1), date(2020, 12, 31)),  # first trading day after a weekend
+        (date(2020, 1, 15), date(2020, 6, 30)),  # starts on the series' first day
+        (date(2019, 12, 20), date(2020, 8, 5)),  # starts before the series
+    ],
+)
+def test_marts_match_daily_returns(serve, init_date, end_date):
+    """
+    test if monthly returns read from the mart match the ones compounded daily
+    """
+    serve(make_series("2020-01-15", "2021-12-31"))
+
+    assert_same_monthly_returns(init_date, end_date)
+
+
+def test_marts_are_not_used_after_a_month_without_rows(serve):
+    """
+    test if a range starting after a month without rows falls back to the daily rows
+    """
+    serve(make_series("2020-01-15", "2021-12-31", gaps=(("2020-06-01", "2020-06-30"),)))
+    metrics = FinancialMetrics()
+
+    assert (
+        metrics._monthly_profitability_from_marts(TICKER, date(2020, 7, 10), date(2020, 12, 15))
+        is None
+    )
+    assert_same_monthly_returns(date(2020, 7, 10), date(2020, 12, 15))